@@ -0,0 +1,248 @@
+"""
+LegalMind AI - ANN Recall/Latency Benchmark
+Compares ChromaStore.query (HNSW) against exact brute-force search over a grid
+of HNSW parameters and collection sizes.
+
+Reports recall@k, p50/p95 query latency, index build time and on-disk index size.
+
+Usage:
+    uv run benchmarks/ann_benchmark.py --sizes 1000 10000 50000
+    uv run benchmarks/ann_benchmark.py --doc data/contract.pdf --m 8 16 32 --search-ef 10 50 100
+    uv run benchmarks/ann_benchmark.py --sizes 20000 --json ann_results.json
+"""
+import argparse
+import itertools
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import (
+    EMBEDDING_DIMENSION,
+    TOP_K_RESULTS,
+    HNSW_M,
+    HNSW_CONSTRUCTION_EF,
+    HNSW_SEARCH_EF,
+)
+from src.ingestion import TextChunk
+
+
+console = Console()
+
+# Questions used as queries when benchmarking a real document
+REAL_QUERIES = [
+    "What are the termination conditions?",
+    "Who is liable for damages?",
+    "What are the payment terms?",
+    "How is confidential information protected?",
+    "Does the agreement renew automatically?",
+    "What are the indemnification obligations?",
+    "How are disputes resolved?",
+    "What is the governing law?",
+    "What service levels does the provider guarantee?",
+    "Who owns the intellectual property?",
+]
+
+
+# === Datasets ===
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalizes rows so that dot product equals cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def synthetic_dataset(
+    size: int,
+    n_queries: int,
+    dim: int = EMBEDDING_DIMENSION,
+    n_clusters: int = 64,
+    seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Generates clustered unit vectors that mimic the structure of text embeddings.
+    
+    Queries are jittered copies of random corpus points so that every query
+    has a meaningful neighborhood.
+    
+    Returns:
+        Tuple of (corpus, queries) as float32 arrays.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = rng.integers(0, n_clusters, size=size)
+    corpus = _normalize(centers[labels] + 0.6 * rng.normal(size=(size, dim)))
+    
+    picks = rng.integers(0, size, size=n_queries)
+    queries = _normalize(corpus[picks] + 0.3 * rng.normal(size=(n_queries, dim)) / np.sqrt(dim))
+    return corpus.astype(np.float32), queries.astype(np.float32)
+
+
+def document_dataset(doc_path: str, n_queries: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Embeds the chunks of a real document plus a set of legal questions.
+    
+    The built-in questions are topped up with jittered chunk embeddings
+    until n_queries queries are available.
+    
+    Returns:
+        Tuple of (corpus, queries) as float32 arrays.
+    """
+    from src.ingestion import load_document, chunk_documents
+    from src.vectorstore import embed_texts
+    
+    chunks = chunk_documents(load_document(doc_path))
+    corpus = _normalize(np.asarray(embed_texts([c.content for c in chunks])))
+    queries = _normalize(np.asarray(embed_texts(REAL_QUERIES[:n_queries])))
+    
+    missing = n_queries - len(queries)
+    if missing > 0:
+        rng = np.random.default_rng(seed)
+        picks = rng.integers(0, len(corpus), size=missing)
+        noise = 0.3 * rng.normal(size=(missing, corpus.shape[1])) / np.sqrt(corpus.shape[1])
+        queries = np.vstack([queries, _normalize(corpus[picks] + noise)])
+    
+    return corpus.astype(np.float32), queries.astype(np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> list[set[int]]:
+    """Brute-force cosine top-k; the ground truth for recall."""
+    sims = queries @ corpus.T
+    k = min(k, corpus.shape[0])
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+# === Benchmark ===
+
+def run_config(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    truth: list[set[int]],
+    k: int,
+    m: int,
+    construction_ef: int,
+    search_ef: int
+) -> dict:
+    """Builds one index in a temporary directory and measures it."""
+    from src.vectorstore import ChromaStore
+    
+    persist_dir = Path(tempfile.mkdtemp(prefix="ann_bench_"))
+    try:
+        store = ChromaStore(
+            collection_name="ann_benchmark",
+            persist_dir=persist_dir,
+            hnsw_m=m,
+            hnsw_construction_ef=construction_ef,
+            hnsw_search_ef=search_ef
+        )
+        chunks = [
+            TextChunk(content=f"vector {i}", chunk_index=i, page_number=1, source="benchmark")
+            for i in range(len(corpus))
+        ]
+        batch_size = store.client.get_max_batch_size()
+        
+        start = time.perf_counter()
+        for i in range(0, len(chunks), batch_size):
+            store.add_documents(chunks[i:i + batch_size], corpus[i:i + batch_size].tolist())
+        build_s = time.perf_counter() - start
+        
+        latencies = []
+        recalls = []
+        for query, expected in zip(queries.tolist(), truth):
+            start = time.perf_counter()
+            results = store.query(query, k=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = {r.chunk_index for r in results}
+            recalls.append(len(found & expected) / len(expected))
+        
+        return {
+            "size": len(corpus),
+            "m": m,
+            "construction_ef": construction_ef,
+            "search_ef": search_ef,
+            f"recall@{k}": float(np.mean(recalls)),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "build_s": build_s,
+            "index_mb": store.disk_usage() / 1e6,
+        }
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+
+
+def print_results(rows: list[dict], k: int, title: str) -> None:
+    """Renders benchmark rows as a table."""
+    table = Table(title=title)
+    for column in ["size", "M", "constr_ef", "search_ef", f"recall@{k}", "p50 ms", "p95 ms",
+                   "build s", "index MB"]:
+        table.add_column(column, justify="right")
+    
+    for row in rows:
+        table.add_row(
+            str(row["size"]),
+            str(row["m"]),
+            str(row["construction_ef"]),
+            str(row["search_ef"]),
+            f"{row[f'recall@{k}']:.3f}",
+            f"{row['p50_ms']:.2f}",
+            f"{row['p95_ms']:.2f}",
+            f"{row['build_s']:.2f}",
+            f"{row['index_mb']:.1f}",
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW recall/latency benchmark for ChromaStore")
+    parser.add_argument("--doc", type=str, help="Benchmark on the chunks of a real document")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Synthetic collection sizes")
+    parser.add_argument("--queries", type=int, default=100, help="Number of queries per config")
+    parser.add_argument("-k", type=int, default=TOP_K_RESULTS, help="Results per query")
+    parser.add_argument("--m", type=int, nargs="+", default=[HNSW_M])
+    parser.add_argument("--construction-ef", type=int, nargs="+", default=[HNSW_CONSTRUCTION_EF])
+    parser.add_argument("--search-ef", type=int, nargs="+", default=[HNSW_SEARCH_EF, 50, 100])
+    parser.add_argument("--json", type=str, help="Write results to this JSON file")
+    
+    args = parser.parse_args()
+    
+    if args.doc:
+        corpus, queries = document_dataset(args.doc, args.queries)
+        datasets = [(f"document: {Path(args.doc).name}", corpus, queries)]
+    else:
+        datasets = []
+        for size in args.sizes:
+            corpus, queries = synthetic_dataset(size, args.queries)
+            datasets.append((f"synthetic: {size} vectors", corpus, queries))
+    
+    grid = list(itertools.product(args.m, args.construction_ef, args.search_ef))
+    rows = []
+    
+    for label, corpus, queries in datasets:
+        truth = exact_top_k(corpus, queries, args.k)
+        console.print(f"\n📐 {label} — {len(grid)} configurations")
+        dataset_rows = []
+        for m, construction_ef, search_ef in grid:
+            row = run_config(corpus, queries, truth, args.k, m, construction_ef, search_ef)
+            row["dataset"] = label
+            dataset_rows.append(row)
+        print_results(dataset_rows, args.k, label)
+        rows.extend(dataset_rows)
+    
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=2))
+        console.print(f"\n💾 Results written to [cyan]{args.json}[/cyan]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+LegalMind AI - Context Compression Evaluation
+Measures how much the extractive context compressor shrinks specialist prompts
+and whether the evidence needed to answer survives.
+
+For each labelled query the retrieved top-k is packed twice, as-is and
+compressed. Reports the compression ratio, prompt tokens, and evidence recall
+(the operative clause text is still in the context). With --live, both
+prompts are also sent to the configured LLM to compare latency and how close
+the two answers are (cosine similarity of their embeddings).
+
+Usage:
+    uv run benchmarks/context_compression.py                      # Sample contract
+    uv run benchmarks/context_compression.py --max-sentences 4 8 12
+    uv run benchmarks/context_compression.py --live               # Also call the LLM
+"""
+import argparse
+import json
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import CONTEXT_TOKEN_BUDGETS, CONTEXT_COMPRESSION_MIN_SIMILARITY, validate_config
+from src.agents import retrieve_chunks, pack_context, compress_results
+from src.llm import invoke_llm
+from src.orchestrator.graph import _general_qa_prompt
+from src.vectorstore import embed_texts, embed_single
+from rerank_eval import QUERIES, load_queries, build_store
+
+
+console = Console()
+
+
+def _answer(query: str, context: str) -> tuple[str, float]:
+    start = time.perf_counter()
+    answer = invoke_llm(_general_qa_prompt({"query": query, "context": context}), use_cache=False)
+    return answer, (time.perf_counter() - start) * 1000
+
+
+def evaluate(store, queries: list[tuple[str, str]], max_sentences: int, min_similarity: float, live: bool) -> dict:
+    """Packs every query's context with and without compression and compares them."""
+    budget = CONTEXT_TOKEN_BUDGETS["GENERAL_QA"]
+    rows = []
+    for query, pattern in queries:
+        pattern = re.compile(pattern, re.I)
+        results = retrieve_chunks(query, store=store, use_cache=False)
+        full = pack_context(results, budget)
+        
+        start = time.perf_counter()
+        compressed = compress_results(query, results, max_sentences, min_similarity)
+        compress_ms = (time.perf_counter() - start) * 1000
+        packed = pack_context(compressed.results, budget)
+        
+        row = {
+            "query": query,
+            "ratio": compressed.ratio,
+            "tokens_full": full.tokens_used,
+            "tokens_compressed": packed.tokens_used,
+            "evidence_full": bool(pattern.search(full.text)),
+            "evidence_compressed": bool(pattern.search(packed.text)),
+            "compress_ms": compress_ms,
+        }
+        if live:
+            answer_full, row["llm_ms_full"] = _answer(query, full.text)
+            answer_compressed, row["llm_ms_compressed"] = _answer(query, packed.text)
+            a, b = np.asarray(embed_texts([answer_full, answer_compressed]), dtype=np.float32)
+            row["answer_similarity"] = float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-12))
+        rows.append(row)
+    
+    def mean(key: str) -> float | None:
+        return statistics.mean(r[key] for r in rows) if key in rows[0] else None
+    
+    return {
+        "max_sentences": max_sentences,
+        "compression_ratio": mean("ratio"),
+        "tokens_full": mean("tokens_full"),
+        "tokens_compressed": mean("tokens_compressed"),
+        "evidence_recall_full": mean("evidence_full"),
+        "evidence_recall_compressed": mean("evidence_compressed"),
+        "compress_ms": mean("compress_ms"),
+        "llm_ms_full": mean("llm_ms_full"),
+        "llm_ms_compressed": mean("llm_ms_compressed"),
+        "answer_similarity": mean("answer_similarity"),
+        "rows": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extractive context compression: tokens vs. evidence")
+    parser.add_argument("--doc", type=str, default="data/sample_contract.txt")
+    parser.add_argument("--queries", type=str, help="TSV file of '<regex>\\t<query>' lines")
+    parser.add_argument("--max-sentences", type=int, nargs="+", default=[4, 8, 12])
+    parser.add_argument("--min-similarity", type=float, default=CONTEXT_COMPRESSION_MIN_SIMILARITY)
+    parser.add_argument("--live", action="store_true", help="Also answer both prompts with the LLM")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    if args.live:
+        validate_config()
+    queries = load_queries(args.queries) if args.queries else QUERIES
+    embed_single("warm up")  # Load the embedding model outside the timings
+    
+    persist_dir = Path(tempfile.mkdtemp(prefix="compression_eval_"))
+    try:
+        store = build_store(args.doc, persist_dir)
+        reports = [evaluate(store, queries, n, args.min_similarity, args.live) for n in args.max_sentences]
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+    
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    
+    table = Table(title=f"{len(queries)} queries · GENERAL_QA budget")
+    columns = ["max sentences", "kept chars", "tokens (full → compressed)", "evidence recall", "compress ms"]
+    if args.live:
+        columns += ["LLM ms (full → compressed)", "answer similarity"]
+    for column in columns:
+        table.add_column(column)
+    for r in reports:
+        row = [
+            str(r["max_sentences"]),
+            f"{r['compression_ratio']:.0%}",
+            f"{r['tokens_full']:.0f} → {r['tokens_compressed']:.0f}",
+            f"{r['evidence_recall_full']:.0%} → {r['evidence_recall_compressed']:.0%}",
+            f"{r['compress_ms']:.1f}",
+        ]
+        if args.live:
+            row += [f"{r['llm_ms_full']:.0f} → {r['llm_ms_compressed']:.0f}", f"{r['answer_similarity']:.3f}"]
+        table.add_row(*row)
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+LegalMind AI - LLM Client Overhead Benchmark
+Measures the per-call cost of constructing a fresh chat model versus reusing
+the pooled client returned by get_llm().
+
+Usage:
+    uv run benchmarks/llm_client_overhead.py                 # Construction cost only (no network)
+    uv run benchmarks/llm_client_overhead.py --live --calls 10  # Real round trips (needs API key)
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import LLM_PROVIDER, LLM_MODEL, validate_config
+from src.llm import get_llm, clear_llm_cache
+
+
+console = Console()
+
+LIVE_PROMPT = "Reply with the single word: OK"
+
+
+def _timed(fn, n: int) -> list[float]:
+    """Runs fn n times and returns per-call latencies in milliseconds."""
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _row(table: Table, label: str, latencies: list[float]) -> None:
+    table.add_row(
+        label,
+        f"{statistics.mean(latencies):.3f}",
+        f"{statistics.median(latencies):.3f}",
+        f"{max(latencies):.3f}",
+    )
+
+
+def _fresh_llm():
+    """A newly built client, as if none were cached (the previous one is closed)."""
+    clear_llm_cache()
+    return get_llm()
+
+
+def bench_construction(n: int) -> tuple[list[float], list[float]]:
+    """Fresh construction per call vs. cached lookup."""
+    # Warm imports and populate the cache so neither variant is charged for module loading
+    clear_llm_cache()
+    get_llm()
+    
+    fresh = _timed(_fresh_llm, n)
+    pooled = _timed(get_llm, n)
+    return fresh, pooled
+
+
+def bench_live(n: int) -> tuple[list[float], list[float]]:
+    """Full round trips with a fresh client per call vs. the pooled client."""
+    fresh = _timed(lambda: _fresh_llm().invoke(LIVE_PROMPT), n)
+    
+    clear_llm_cache()
+    get_llm().invoke(LIVE_PROMPT)  # Open the pooled connection once
+    pooled = _timed(lambda: get_llm().invoke(LIVE_PROMPT), n)
+    return fresh, pooled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-call overhead of LLM client construction")
+    parser.add_argument("--calls", type=int, default=50, help="Calls per variant")
+    parser.add_argument("--live", action="store_true", help="Also measure real provider round trips")
+    args = parser.parse_args()
+    
+    console.print(f"\n⚙️  Provider: [cyan]{LLM_PROVIDER}[/cyan]  Model: [cyan]{LLM_MODEL}[/cyan]")
+    
+    table = Table(title="Per-call latency (ms)")
+    for column in ["variant", "mean", "p50", "max"]:
+        table.add_column(column, justify="right")
+    
+    fresh, pooled = bench_construction(args.calls)
+    _row(table, "construct fresh client", fresh)
+    _row(table, "get_llm() (cached)", pooled)
+    saved = statistics.mean(fresh) - statistics.mean(pooled)
+    
+    if args.live:
+        validate_config()
+        live_fresh, live_pooled = bench_live(args.calls)
+        _row(table, "invoke, fresh client", live_fresh)
+        _row(table, "invoke, pooled client", live_pooled)
+        live_saved = statistics.mean(live_fresh) - statistics.mean(live_pooled)
+    
+    console.print(table)
+    console.print(f"\n💡 Client construction saved per call: [green]{saved:.2f} ms[/green]")
+    if args.live:
+        console.print(f"💡 End-to-end saved per call (incl. connection reuse): "
+                      f"[green]{live_saved:.2f} ms[/green]")
+
+
+if __name__ == "__main__":
+    main()
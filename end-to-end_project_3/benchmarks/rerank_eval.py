@@ -0,0 +1,198 @@
+"""
+LegalMind AI - Re-ranking Evaluation
+Measures what the cross-encoder re-ranking stage buys over bi-encoder top-k on
+a labelled query set, and what it costs, across a range of latency budgets.
+
+A chunk counts as relevant when it contains the operative text of the clause
+a query asks about. Reports precision@k, hit@1 and MRR, mean added latency,
+and precision gained per millisecond of re-ranking.
+
+Usage:
+    uv run benchmarks/rerank_eval.py                                  # Sample contract
+    uv run benchmarks/rerank_eval.py --doc data/contract.pdf --queries my_queries.tsv
+    uv run benchmarks/rerank_eval.py --budgets 0 10 25 50 100 200 --fetch-k 50
+"""
+import argparse
+import json
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import TOP_K_RESULTS, RERANK_FETCH_K, RERANK_BATCH_SIZE
+from src.ingestion import DocumentPage, load_document, chunk_documents
+from src.vectorstore import ChromaStore, embed_texts, embed_single
+from src.agents.reranker import rerank_candidates, get_reranker_model, pair_score_cache
+
+
+console = Console()
+
+# (query, regex matching the operative text) for data/sample_contract.txt
+QUERIES = [
+    ("How much notice is needed to end the contract without cause?", r"Termination for Convenience"),
+    ("When can a party terminate immediately?", r"Termination for Cause"),
+    ("Does the agreement renew on its own?", r"automatically renew"),
+    ("When do invoices have to be paid?", r"due and payable within"),
+    ("What happens if we pay late?", r"Late payments shall accrue"),
+    ("Can the provider raise its prices?", r"increase fees"),
+    ("Who owns the software built for the client?", r"Client shall own"),
+    ("How long does confidentiality last after the contract ends?", r"survive termination"),
+    ("What is the maximum liability of each party?", r"TOTAL AGGREGATE LIABILITY"),
+    ("Are consequential damages excluded?", r"CONSEQUENTIAL"),
+    ("Is there a cap on indemnification?", r"INDEMNIFICATION OBLIGATIONS SHALL EXCEED"),
+    ("Which state's law applies?", r"laws of the State"),
+    ("How are disputes resolved?", r"binding arbitration"),
+    ("What uptime does the provider guarantee?", r"uptime"),
+    ("How long is the warranty on deliverables?", r"conform to the specifications"),
+]
+
+
+def load_queries(path: str) -> list[tuple[str, str]]:
+    """Reads "<regex>\\t<query>" lines."""
+    rows = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            pattern, query = line.split("\t", 1)
+            rows.append((query.strip(), pattern.strip()))
+    return rows
+
+
+def build_store(doc_path: str, persist_dir: Path) -> ChromaStore:
+    """Ingests one document into a throwaway collection."""
+    path = Path(doc_path)
+    if path.suffix.lower() == ".txt":
+        # The loader only handles PDF/DOCX; plain text is one page
+        pages = [DocumentPage(content=path.read_text(encoding="utf-8"), page_number=1, source=path.name)]
+    else:
+        pages = load_document(path)
+    chunks = chunk_documents(pages)
+    store = ChromaStore(collection_name="rerank_eval", persist_dir=persist_dir)
+    store.add_documents(chunks, embed_texts([c.content for c in chunks]))
+    return store
+
+
+def _quality(ranked: list, pattern: re.Pattern, k: int) -> dict:
+    relevant = [bool(pattern.search(r.content)) for r in ranked]
+    first = next((i for i, hit in enumerate(relevant) if hit), None)
+    return {
+        "precision": sum(relevant[:k]) / k,
+        "hit1": float(bool(relevant[:1] and relevant[0])),
+        "mrr": 1 / (first + 1) if first is not None else 0.0,
+    }
+
+
+def evaluate(
+    store: ChromaStore,
+    queries: list[tuple[str, str]],
+    budgets: list[float],
+    k: int,
+    fetch_k: int,
+    batch_size: int
+) -> dict:
+    """Scores bi-encoder top-k and re-ranked top-k at every budget (cold pair cache)."""
+    rows = {"bi-encoder": []}
+    rows.update({budget: [] for budget in budgets})
+    
+    for query, pattern in queries:
+        pattern = re.compile(pattern, re.I)
+        start = time.perf_counter()
+        candidates = store.query(embed_single(query), k=fetch_k)
+        retrieve_ms = (time.perf_counter() - start) * 1000
+        rows["bi-encoder"].append({**_quality(candidates, pattern, k), "ms": 0.0, "retrieve_ms": retrieve_ms})
+        
+        for budget in budgets:
+            pair_score_cache.clear()
+            outcome = rerank_candidates(query, candidates, budget_ms=budget, batch_size=batch_size, use_cache=False)
+            rows[budget].append({
+                **_quality(outcome.results, pattern, k),
+                "ms": outcome.elapsed_ms,
+                "reranked": outcome.reranked / max(len(candidates), 1),
+            })
+    
+    baseline = rows["bi-encoder"]
+    base_precision = statistics.mean(r["precision"] for r in baseline)
+    report = []
+    for name, results in rows.items():
+        precision = statistics.mean(r["precision"] for r in results)
+        ms = statistics.mean(r["ms"] for r in results)
+        report.append({
+            "stage": name if name == "bi-encoder" else f"rerank @{name:g} ms",
+            "budget_ms": None if name == "bi-encoder" else name,
+            f"precision@{k}": precision,
+            "hit@1": statistics.mean(r["hit1"] for r in results),
+            "mrr": statistics.mean(r["mrr"] for r in results),
+            "added_ms_mean": ms,
+            "added_ms_max": max(r["ms"] for r in results),
+            "reranked_share": statistics.mean(r.get("reranked", 0.0) for r in results),
+            "precision_gain_per_ms": (precision - base_precision) / ms if ms > 0 else None,
+        })
+    return {
+        "queries": len(queries),
+        "k": k,
+        "fetch_k": fetch_k,
+        "retrieve_ms_mean": statistics.mean(r["retrieve_ms"] for r in baseline),
+        "stages": report,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-encoder re-ranking: precision vs. latency")
+    parser.add_argument("--doc", type=str, default="data/sample_contract.txt")
+    parser.add_argument("--queries", type=str, help="TSV file of '<regex>\\t<query>' lines")
+    parser.add_argument("--budgets", type=float, nargs="+", default=[10, 25, 50, 100, 200, 1000])
+    parser.add_argument("--k", type=int, default=TOP_K_RESULTS)
+    parser.add_argument("--fetch-k", type=int, default=RERANK_FETCH_K)
+    parser.add_argument("--batch-size", type=int, default=RERANK_BATCH_SIZE)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    queries = load_queries(args.queries) if args.queries else QUERIES
+    
+    # Load both models outside the timings
+    embed_single("warm up")
+    get_reranker_model()
+    
+    persist_dir = Path(tempfile.mkdtemp(prefix="rerank_eval_"))
+    try:
+        store = build_store(args.doc, persist_dir)
+        # One unbudgeted batch primes the per-pair time estimate used by the budget check
+        warm = store.query(embed_single("warm up"), k=args.batch_size)
+        rerank_candidates("warm up", warm, budget_ms=float("inf"), batch_size=args.batch_size, use_cache=False)
+        report = evaluate(store, queries, args.budgets, args.k, args.fetch_k, args.batch_size)
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    
+    k = report["k"]
+    table = Table(title=f"{report['queries']} queries · top-{k} of {report['fetch_k']} candidates")
+    for column in ["stage", f"P@{k}", "hit@1", "MRR", "added ms (mean/max)", "re-ranked", "ΔP@k per ms"]:
+        table.add_column(column)
+    for s in report["stages"]:
+        gain = s["precision_gain_per_ms"]
+        table.add_row(
+            s["stage"],
+            f"{s[f'precision@{k}']:.3f}",
+            f"{s['hit@1']:.2f}",
+            f"{s['mrr']:.3f}",
+            f"{s['added_ms_mean']:.1f} / {s['added_ms_max']:.1f}",
+            f"{s['reranked_share']:.0%}",
+            "-" if gain is None else f"{gain:+.5f}"
+        )
+    console.print(table)
+    console.print(f"⏱️  Bi-encoder retrieval: {report['retrieve_ms_mean']:.1f} ms per query")
+
+
+if __name__ == "__main__":
+    main()
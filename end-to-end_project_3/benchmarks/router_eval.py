@@ -0,0 +1,153 @@
+"""
+LegalMind AI - Router Evaluation
+Compares the local fast router against the LLM router on a labelled query set:
+fast-path hit rate, agreement with the LLM, accuracy and per-query latency.
+
+Usage:
+    uv run benchmarks/router_eval.py                          # Built-in query set
+    uv run benchmarks/router_eval.py --queries my_queries.tsv  # "<ROUTE>\t<query>" per line
+    uv run benchmarks/router_eval.py --min-margin 0.03 --min-similarity 0.4
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import FAST_ROUTER_MIN_SIMILARITY, FAST_ROUTER_MIN_MARGIN, validate_config
+from src.agents import fast_route, llm_route_query
+from src.vectorstore import embed_single
+
+
+console = Console()
+
+# Held-out queries (not among the router prototypes)
+QUERIES = [
+    ("CLAUSE_SEARCH", "How can either party end this agreement?"),
+    ("CLAUSE_SEARCH", "What is the notice period for cancellation?"),
+    ("CLAUSE_SEARCH", "Is there an indemnification clause?"),
+    ("CLAUSE_SEARCH", "When are invoices due?"),
+    ("CLAUSE_SEARCH", "What law governs disputes?"),
+    ("CLAUSE_SEARCH", "Does the contract renew automatically?"),
+    ("RISK_ANALYSIS", "What are the biggest risks for the client?"),
+    ("RISK_ANALYSIS", "Anything unfair in this contract?"),
+    ("RISK_ANALYSIS", "Should I be concerned about any terms?"),
+    ("RISK_ANALYSIS", "What could go wrong if I sign this?"),
+    ("RISK_ANALYSIS", "Which obligations are dangerous for us?"),
+    ("RISK_ANALYSIS", "Is the liability cap a problem for me?"),
+    ("SUMMARIZE", "Summarize the agreement for my manager"),
+    ("SUMMARIZE", "Give me the gist of this document"),
+    ("SUMMARIZE", "What is this document about in a few sentences?"),
+    ("SUMMARIZE", "Can you give a quick overview?"),
+    ("SUMMARIZE", "Explain this contract to a non-lawyer"),
+    ("SUMMARIZE", "Key takeaways?"),
+    ("GENERAL_QA", "Who is the service provider?"),
+    ("GENERAL_QA", "What date was this signed?"),
+    ("GENERAL_QA", "What is the total contract value?"),
+    ("GENERAL_QA", "Which services are included?"),
+    ("GENERAL_QA", "Who should I contact at the vendor?"),
+    ("GENERAL_QA", "How many licenses are we buying?"),
+]
+
+
+def load_queries(path: str) -> list[tuple[str, str]]:
+    """Reads "<ROUTE>\\t<query>" lines."""
+    rows = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            label, query = line.split("\t", 1)
+            rows.append((label.strip().upper(), query.strip()))
+    return rows
+
+
+def evaluate(queries: list[tuple[str, str]], min_similarity: float, min_margin: float) -> dict:
+    """Runs both routers on every query and aggregates the comparison."""
+    rows = []
+    for label, query in queries:
+        start = time.perf_counter()
+        decision = fast_route(query, embed_single(query), min_similarity, min_margin)
+        fast_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        llm = llm_route_query(query)
+        llm_ms = (time.perf_counter() - start) * 1000
+        
+        # What route_query would return, and what it would cost
+        routed = decision.route if decision.confident else llm
+        rows.append({
+            "query": query,
+            "label": label,
+            "fast": decision.route,
+            "method": decision.method,
+            "confident": decision.confident,
+            "similarity": round(decision.similarity, 3),
+            "margin": round(decision.confidence, 3),
+            "llm": llm,
+            "routed": routed,
+            "fast_ms": fast_ms,
+            "llm_ms": llm_ms,
+            "routed_ms": fast_ms if decision.confident else fast_ms + llm_ms,
+        })
+    
+    confident = [r for r in rows if r["confident"]]
+    
+    def share(items: list[dict], predicate) -> float:
+        return sum(map(predicate, items)) / len(items) if items else 0.0
+    
+    return {
+        "queries": len(rows),
+        "fast_path_hit_rate": share(rows, lambda r: r["confident"]),
+        "agreement_on_fast_path": share(confident, lambda r: r["fast"] == r["llm"]),
+        "accuracy_llm": share(rows, lambda r: r["llm"] == r["label"]),
+        "accuracy_fast_path_only": share(confident, lambda r: r["fast"] == r["label"]),
+        "accuracy_routed": share(rows, lambda r: r["routed"] == r["label"]),
+        "latency_ms_llm_mean": statistics.mean(r["llm_ms"] for r in rows),
+        "latency_ms_routed_mean": statistics.mean(r["routed_ms"] for r in rows),
+        "rows": rows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast router vs. LLM router")
+    parser.add_argument("--queries", type=str, help="TSV file of '<ROUTE>\\t<query>' lines")
+    parser.add_argument("--min-similarity", type=float, default=FAST_ROUTER_MIN_SIMILARITY)
+    parser.add_argument("--min-margin", type=float, default=FAST_ROUTER_MIN_MARGIN)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+    
+    validate_config()
+    queries = load_queries(args.queries) if args.queries else QUERIES
+    embed_single("warm up")  # Load the embedding model outside the timings
+    report = evaluate(queries, args.min_similarity, args.min_margin)
+    
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    
+    table = Table(title="Per-query routing")
+    for column in ["query", "label", "fast", "method", "sim", "margin", "llm", "routed"]:
+        table.add_column(column)
+    for r in report["rows"]:
+        style = "green" if r["confident"] else "dim"
+        table.add_row(r["query"], r["label"], f"[{style}]{r['fast']}[/{style}]", r["method"],
+                      f"{r['similarity']:.2f}", f"{r['margin']:.2f}", r["llm"], r["routed"])
+    console.print(table)
+    
+    console.print(f"\n⚡ Fast-path hit rate: [green]{report['fast_path_hit_rate']:.0%}[/green]"
+                  f"  · agreement with LLM on fast path: {report['agreement_on_fast_path']:.0%}")
+    console.print(f"🎯 Accuracy  LLM: {report['accuracy_llm']:.0%}"
+                  f"  · fast path only: {report['accuracy_fast_path_only']:.0%}"
+                  f"  · routed: {report['accuracy_routed']:.0%}")
+    console.print(f"⏱️  Mean routing latency  LLM: {report['latency_ms_llm_mean']:.1f} ms"
+                  f"  · routed: [green]{report['latency_ms_routed_mean']:.1f} ms[/green]")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,12 +16,84 @@ CHROMA_PERSIST_DIR = PROJECT_ROOT / ".chroma_db"
 
 # === LLM Configuration ===
 # Supports both OpenAI and Google Gemini
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # "openai" or "gemini"
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")  # "openai", "gemini" or "fake" (offline)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 
 # Model selection based on provider
-LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-flash" if LLM_PROVIDER == "gemini" else "gpt-4o-mini")
+_DEFAULT_MODELS = {"gemini": "gemini-1.5-flash", "openai": "gpt-4o-mini", "fake": "fake-legal"}
+LLM_MODEL = os.getenv("LLM_MODEL", _DEFAULT_MODELS.get(LLM_PROVIDER, "gpt-4o-mini"))
+LLM_TEMPERATURE = 0.1  # Low for consistent outputs
+
+# === Fake Provider (LLM_PROVIDER=fake) ===
+# Deterministic offline responses with simulated latency for load tests
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "800"))  # Mean time to first token
+FAKE_LLM_LATENCY_DIST = os.getenv("FAKE_LLM_LATENCY_DIST", "lognormal")  # fixed | normal | lognormal
+FAKE_LLM_LATENCY_SIGMA = float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.3"))  # Relative spread
+FAKE_LLM_TOKENS_PER_S = float(os.getenv("FAKE_LLM_TOKENS_PER_S", "80"))  # Generation speed
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "0"))
+
+# === LLM Connection Pool ===
+# Clients are cached per (provider, model, temperature) and reuse HTTP connections
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "20"))  # Max open connections per client
+LLM_KEEPALIVE_S = float(os.getenv("LLM_KEEPALIVE_S", "30"))  # Idle connection lifetime
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "60"))  # Per-request timeout
+LLM_CONNECT_TIMEOUT_S = float(os.getenv("LLM_CONNECT_TIMEOUT_S", "5"))
+
+# === LLM Rate Limiting ===
+# Per-provider quotas; calls queue client-side instead of failing with 429s
+LLM_RATE_LIMITS = {
+    "openai": {
+        "rpm": float(os.getenv("OPENAI_RPM", "500")),  # Requests per minute
+        "tpm": float(os.getenv("OPENAI_TPM", "200000")),  # Tokens per minute
+    },
+    "gemini": {
+        "rpm": float(os.getenv("GEMINI_RPM", "15")),
+        "tpm": float(os.getenv("GEMINI_TPM", "1000000")),
+    },
+}
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "8"))  # In-flight calls per provider
+LLM_EXPECTED_COMPLETION_TOKENS = 500  # Reserved per call until actual usage is known
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE_S = 1.0  # First retry waits up to this long (full jitter)
+LLM_BACKOFF_MAX_S = 60.0
+
+# === LLM Metrics ===
+# USD per 1M tokens, used to estimate spend per call (unknown models cost 0)
+LLM_PRICES_PER_1M = {
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+    "gpt-4o": {"input": 2.50, "output": 10.00},
+    "gemini-1.5-flash": {"input": 0.075, "output": 0.30},
+    "gemini-1.5-pro": {"input": 1.25, "output": 5.00},
+}
+LLM_LATENCY_BUCKETS_S = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # Histogram bounds
+
+# === LLM Response Cache ===
+# Identical prompts (same provider, model, temperature) are answered from disk.
+# Set LLM_CACHE_ENABLED=false for deterministic latency benchmarks. Off by default
+# for the fake provider, whose load tests must not measure cache hits; if enabled,
+# its responses go to a separate file so they never mix with real ones.
+_LLM_CACHE_DEFAULT = "false" if LLM_PROVIDER == "fake" else "true"
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", _LLM_CACHE_DEFAULT).lower() == "true"
+_LLM_CACHE_FILE = "responses-fake.sqlite3" if LLM_PROVIDER == "fake" else "responses.sqlite3"
+LLM_CACHE_PATH = PROJECT_ROOT / ".llm_cache" / _LLM_CACHE_FILE
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))  # One week
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+# === Document Artifacts ===
+# Per-document results (summaries, risk reports, ...) keyed by content hash
+ARTIFACT_STORE_PATH = PROJECT_ROOT / ".artifacts" / "artifacts.sqlite3"
+
+# === Document Summaries ===
+# Map-reduce summarization: chunk groups are summarized in parallel, then merged
+SUMMARY_PRECOMPUTE_ON_INGEST = os.getenv("SUMMARY_PRECOMPUTE_ON_INGEST", "true").lower() == "true"
+SUMMARY_SECTION_TOKENS = 2000  # Max document tokens per map call
+SUMMARY_REDUCE_TOKENS = 3000  # Max section-summary tokens per reduce call
+
+# === Background Analysis ===
+# Worker pool that builds per-document artifacts (risk report, summary) after ingest
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "2"))  # Concurrent documents/artifacts
+RISK_PRECOMPUTE_ON_INGEST = os.getenv("RISK_PRECOMPUTE_ON_INGEST", "true").lower() == "true"
 
 # === Embedding Configuration ===
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
@@ -31,12 +103,84 @@ EMBEDDING_DIMENSION = 384
 CHUNK_SIZE = 500  # Characters per chunk
 CHUNK_OVERLAP = 50  # Overlap between chunks
 
+# === Clause Tagging ===
+# Chunks are tagged with clause types at ingest; clause queries filter on the tags.
+# A tag is set when prototype similarity (+ boost if a lexical cue matches) clears the threshold.
+CLAUSE_TAG_THRESHOLD = float(os.getenv("CLAUSE_TAG_THRESHOLD", "0.45"))
+CLAUSE_TAG_LEXICAL_BOOST = 0.2
+CLAUSE_FILTER_ENABLED = os.getenv("CLAUSE_FILTER_ENABLED", "true").lower() == "true"
+STANDARD_CLAUSE_TYPES = ["termination", "liability", "payment", "confidentiality", "indemnification"]  # Clause sheet
+
 # === Retrieval Configuration ===
 TOP_K_RESULTS = 5  # Number of chunks to retrieve
 
+# === Vector Store Maintenance ===
+COMPACTION_INTERVAL_S = int(os.getenv("COMPACTION_INTERVAL_S", "600"))  # Background check period
+COMPACTION_MIN_RECLAIMABLE_MB = 16  # Only VACUUM when at least this much is free
+
+# === Vector Index (HNSW) Configuration ===
+# M and construction_ef are fixed when a collection is first created;
+# search_ef trades query latency for recall.
+HNSW_SPACE = "cosine"
+HNSW_M = int(os.getenv("HNSW_M", "16"))  # Graph neighbors per node
+HNSW_CONSTRUCTION_EF = int(os.getenv("HNSW_CONSTRUCTION_EF", "100"))  # Build-time beam width
+HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "10"))  # Query-time beam width
+
+# === Retrieval Diversification (MMR) ===
+MMR_ENABLED = os.getenv("MMR_ENABLED", "true").lower() == "true"
+MMR_FETCH_K = 20  # Candidates over-fetched before diversification
+MMR_LAMBDA = 0.7  # 1.0 = pure relevance, 0.0 = pure diversity
+
+# === Re-ranking (Cross-Encoder) ===
+# Over-fetched candidates are re-scored against the query by a small CPU cross-encoder.
+# Scoring stops when the latency budget would be exceeded; unscored candidates keep
+# their bi-encoder order.
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_FETCH_K = 50  # Candidates over-fetched for re-ranking
+RERANK_BATCH_SIZE = 16  # Pairs per cross-encoder forward pass
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))  # Scoring time per query
+RERANK_CACHE_SIZE = 4096  # Cached (query, chunk) pair scores (LRU)
+
+# === Context Budget ===
+# Max tokens of retrieved context packed into each specialist prompt
+CONTEXT_TOKEN_BUDGETS = {
+    "CLAUSE_SEARCH": 1200,
+    "RISK_ANALYSIS": 2500,
+    "SUMMARIZE": 3000,
+    "GENERAL_QA": 1500,
+}
+DEFAULT_CONTEXT_TOKEN_BUDGET = 1500
+
+# === Context Compression ===
+# Retrieved chunks are cut down to the sentences most similar to the query before
+# packing; whole-document routes (risk report, summary) are never compressed.
+# Opt-in until answer quality is measured (benchmarks/context_compression.py --live).
+CONTEXT_COMPRESSION_ENABLED = os.getenv("CONTEXT_COMPRESSION_ENABLED", "false").lower() == "true"
+CONTEXT_COMPRESSION_ROUTES = ("CLAUSE_SEARCH", "GENERAL_QA")
+CONTEXT_COMPRESSION_MAX_SENTENCES = int(os.getenv("CONTEXT_COMPRESSION_MAX_SENTENCES", "8"))  # Kept per query
+CONTEXT_COMPRESSION_MIN_SIMILARITY = float(os.getenv("CONTEXT_COMPRESSION_MIN_SIMILARITY", "0.25"))
+CONTEXT_COMPRESSION_CACHE_SIZE = 1024  # Chunks whose sentence embeddings are cached (LRU)
+
+# === Retrieval Cache ===
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+RETRIEVAL_CACHE_SIZE = 256  # Cached queries (LRU)
+RETRIEVAL_CACHE_THRESHOLD = float(os.getenv("RETRIEVAL_CACHE_THRESHOLD", "0.92"))  # Min cosine similarity
+
+# === Fast Router ===
+# Keyword rules + embedding prototypes classify most queries without an LLM call;
+# the LLM router is only consulted below these confidence thresholds.
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "true").lower() == "true"
+FAST_ROUTER_MIN_SIMILARITY = float(os.getenv("FAST_ROUTER_MIN_SIMILARITY", "0.45"))  # Best prototype cosine
+FAST_ROUTER_MIN_MARGIN = float(os.getenv("FAST_ROUTER_MIN_MARGIN", "0.05"))  # Lead over the runner-up route
+FAST_ROUTER_SHADOW_RATE = float(os.getenv("FAST_ROUTER_SHADOW_RATE", "0"))  # Fraction also sent to the LLM to measure agreement
+
+# === Bulk Queries ===
+AGENT_MAX_CONCURRENT = int(os.getenv("AGENT_MAX_CONCURRENT", "8"))  # Graph runs in flight in run_agent_many
+
 # === Validation ===
 def validate_config():
-    """Validates that required API keys are present."""
+    """Validates that required API keys are present (the fake provider needs none)."""
     if LLM_PROVIDER == "openai" and not OPENAI_API_KEY:
         raise EnvironmentError("OPENAI_API_KEY not set. Add to .env file.")
     if LLM_PROVIDER == "gemini" and not GOOGLE_API_KEY:
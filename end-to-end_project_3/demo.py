@@ -5,21 +5,30 @@ Interactive CLI for analyzing legal documents.
 Usage:
     uv run demo.py --doc data/sample_contract.pdf --query "What are the termination conditions?"
     uv run demo.py --ingest data/sample_contract.pdf  # Just ingest, no query
+    uv run demo.py --clauses sample_contract.pdf  # Clause sheet for an ingested document
+    uv run demo.py -q "What are the risks?" --metrics prometheus  # Dump LLM metrics after the run
+    uv run demo.py --batch questions.txt --source contract.pdf  # One query per line, run concurrently
 """
 import argparse
 import sys
+import time
 from pathlib import Path
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.progress import Progress
+from rich.table import Table
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import validate_config
-from src.ingestion import load_document, chunk_documents
+from src.ingestion import load_document, chunk_documents, tag_chunks
 from src.vectorstore import embed_texts, ChromaStore
-from src.orchestrator import run_agent
+from src.orchestrator import stream_agent, run_agent_many, get_agent_context
+from src.agents import analyze_clauses, analysis_pool, default_precompute_kinds
+from src.storage import get_artifact_store, content_hash
+from src.llm import get_llm_metrics
 
 
 console = Console()
@@ -43,24 +52,113 @@ def ingest_document(doc_path: str) -> int:
         embeddings = embed_texts(texts)
         progress.update(task, completed=1)
     
-    # Store
+    # Tag clause types from the same embeddings (no extra model calls)
+    tag_chunks(chunks, embeddings)
+    tagged = sum(1 for c in chunks if c.clause_types)
+    console.print(f"   Tagged {tagged} chunks with clause types")
+    
+    # Store (replaces any earlier version of the same document)
     store = ChromaStore()
-    store.add_documents(chunks, embeddings)
+    store.upsert_documents(chunks, embeddings)
     console.print(f"   ✅ Stored in vector database ({store.count()} total chunks)")
     
+    # Record the new version so artifacts of the previous one are not served
+    source = chunks[0].source if chunks else Path(doc_path).name
+    get_artifact_store().set_document(source, content_hash(texts))
+    
+    # Risk report and summary are built in the background; queries about this
+    # version wait for (rather than duplicate) an in-flight job
+    if chunks:
+        kinds = default_precompute_kinds()
+        if kinds:
+            analysis_pool.submit(source, kinds, store)
+            console.print(f"   ⏳ Precomputing {', '.join(k.replace('_', ' ') for k in kinds)} in the background")
+    
     return len(chunks)
 
 
-def query_document(query: str) -> None:
-    """Runs a query against the ingested documents."""
+def wait_for_precompute() -> None:
+    """Blocks until background document analyses are stored (before exiting)."""
+    if not analysis_pool.pending():
+        return
+    start = time.perf_counter()
+    with console.status("Precomputing document analyses..."):
+        analysis_pool.shutdown(wait=True)
+    console.print(f"   📝 Risk report / summary cached ({time.perf_counter() - start:.1f}s)")
+
+
+def query_document(query: str, source: str | None = None) -> None:
+    """Runs a query against the ingested documents, rendering tokens and risks as they stream."""
     console.print(f"\n🔍 Query: [yellow]{query}[/yellow]\n")
     
-    with Progress() as progress:
-        task = progress.add_task("Analyzing...", total=1)
-        response = run_agent(query)
-        progress.update(task, completed=1)
+    start = time.perf_counter()
+    first_token_s = None
+    streamed = ""
+    
+    with Live(Panel("[dim]Analyzing...[/dim]", border_style="yellow"), console=console) as live:
+        for kind, payload in stream_agent(query, source):
+            if kind == "response":
+                live.update(Panel(payload, title="LegalMind AI Response", border_style="green"))
+                continue
+            if kind == "token":
+                streamed += payload
+            elif kind == "risk":
+                streamed += f"• [bold]{payload.risk_title}[/bold] ({payload.severity})\n"
+            elif kind == "clause_field":
+                name, value = payload
+                value = ", ".join(value) if isinstance(value, list) else value
+                streamed += f"[bold]{name.replace('_', ' ').title()}:[/bold] {value}\n"
+            if first_token_s is None:
+                first_token_s = time.perf_counter() - start
+            live.update(Panel(streamed, title="LegalMind AI Response", border_style="yellow"))
+    
+    total_s = time.perf_counter() - start
+    # Cached answers deliver everything at once
+    first_token_s = total_s if first_token_s is None else first_token_s
+    console.print(f"[dim]⏱️  First token: {first_token_s:.2f}s · Total: {total_s:.2f}s[/dim]")
+
+
+def query_batch(path: str, source: str | None = None) -> None:
+    """Runs every query in a file concurrently, printing each result as it completes."""
+    queries = [line.strip() for line in Path(path).read_text(encoding="utf-8").splitlines() if line.strip()]
+    console.print(f"\n📋 Running {len(queries)} queries from [cyan]{path}[/cyan]")
     
-    console.print(Panel(response, title="LegalMind AI Response", border_style="green"))
+    start = time.perf_counter()
+    failed = 0
+    for result in run_agent_many(queries, source=source):
+        title = f"{result.query} · {result.elapsed_ms / 1000:.2f}s"
+        if len(result.indices) > 1:
+            title += f" · ×{len(result.indices)}"
+        if result.ok:
+            console.print(Panel(result.response, title=title, border_style="green"))
+        else:
+            failed += 1
+            console.print(Panel(f"[red]{result.error}[/red]", title=title, border_style="red"))
+    
+    console.print(f"[dim]⏱️  {len(queries)} queries ({failed} failed) in {time.perf_counter() - start:.2f}s[/dim]")
+
+
+def print_clause_sheet(source: str) -> None:
+    """Extracts the standard clauses of an ingested document concurrently."""
+    start = time.perf_counter()
+    with console.status(f"Extracting clauses from {source}..."):
+        sheet = analyze_clauses(source)
+    
+    table = Table(title=f"Clause sheet: {source}", show_lines=True)
+    for column in ["Clause", "Summary", "Key terms", "Pages"]:
+        table.add_column(column)
+    for clause_type, info in sheet.items():
+        table.add_row(clause_type.replace("_", " ").title(), info.summary,
+                      ", ".join(info.key_terms) or "N/A", info.page_reference)
+    console.print(table)
+    console.print(f"[dim]⏱️  {time.perf_counter() - start:.2f}s[/dim]")
+
+
+def print_llm_metrics(fmt: str) -> None:
+    """Prints per-node LLM latency, token and cost metrics collected this run."""
+    metrics = get_llm_metrics()
+    console.print(f"\n📈 LLM metrics ({fmt}):")
+    console.print(metrics.to_json() if fmt == "json" else metrics.to_prometheus(), markup=False)
 
 
 def main():
@@ -68,7 +166,19 @@ def main():
     parser.add_argument("--doc", type=str, help="Path to document (PDF/DOCX)")
     parser.add_argument("--ingest", type=str, help="Ingest document without querying")
     parser.add_argument("--query", "-q", type=str, help="Query to ask about the document")
+    parser.add_argument("--batch", type=str, metavar="FILE",
+                        help="Run every query in a file (one per line) concurrently")
+    parser.add_argument("--source", type=str, metavar="SOURCE",
+                        help="Restrict queries to one ingested document (by file name)")
     parser.add_argument("--clear", action="store_true", help="Clear the vector database")
+    parser.add_argument("--delete", type=str, metavar="SOURCE",
+                        help="Remove one document (by file name) from the vector database")
+    parser.add_argument("--compact", action="store_true",
+                        help="Reclaim disk space in the vector database")
+    parser.add_argument("--clauses", type=str, metavar="SOURCE",
+                        help="Print a clause sheet (standard clause types) for an ingested document")
+    parser.add_argument("--metrics", choices=["json", "prometheus"],
+                        help="Print LLM latency/token/cost metrics per agent after querying")
     
     args = parser.parse_args()
     
@@ -89,29 +199,62 @@ def main():
     if args.clear:
         store = ChromaStore()
         store.clear()
+        get_artifact_store().clear()
         console.print("🗑️  Vector database cleared.")
         return
     
+    # Handle --delete
+    if args.delete:
+        removed = ChromaStore().delete_source(args.delete)
+        get_artifact_store().forget_document(args.delete)
+        console.print(f"🗑️  Removed {removed} chunks of [cyan]{args.delete}[/cyan].")
+        return
+    
+    # Handle --compact
+    if args.compact:
+        reclaimed = ChromaStore().compact(rebuild_index=True)
+        console.print(f"🧹 Compacted vector database ({reclaimed / 1e6:.1f} MB reclaimed).")
+        return
+    
+    # Handle --clauses
+    if args.clauses:
+        print_clause_sheet(args.clauses)
+        return
+    
     # Handle --ingest (ingest only)
     if args.ingest:
         ingest_document(args.ingest)
+        wait_for_precompute()
         return
     
     # Handle --doc + --query
     if args.doc:
         ingest_document(args.doc)
+        if not args.query and not args.batch:
+            wait_for_precompute()
     
-    if args.query:
-        query_document(args.query)
+    if args.batch:
+        query_batch(args.batch, args.source or (Path(args.doc).name if args.doc else None))
+        wait_for_precompute()
+        if args.metrics:
+            print_llm_metrics(args.metrics)
+    elif args.query:
+        query_document(args.query, args.source or (Path(args.doc).name if args.doc else None))
+        wait_for_precompute()
+        if args.metrics:
+            print_llm_metrics(args.metrics)
     elif not args.doc and not args.ingest:
-        # Interactive mode
+        # Interactive mode: open the store and load the embedder before the first query
+        get_agent_context().warm()
         console.print("\n[dim]Enter queries (Ctrl+C to exit):[/dim]")
         while True:
             try:
                 query = console.input("[bold]> [/bold]")
                 if query.strip():
-                    query_document(query)
+                    query_document(query, args.source)
             except KeyboardInterrupt:
+                if args.metrics:
+                    print_llm_metrics(args.metrics)
                 console.print("\n[dim]Goodbye![/dim]")
                 break
 
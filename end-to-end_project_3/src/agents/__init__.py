@@ -1,17 +1,78 @@
-from .router import route_query
-from .retriever import retrieve_chunks, format_context
-from .clause_analyzer import analyze_clause, ClauseInfo
-from .risk_assessor import assess_risks, RiskItem, RiskReport
-from .summarizer import summarize_document
+from .router import route_query, aroute_query, route_queries, llm_route_query
+from .fast_router import fast_route, FastRoute, router_stats
+from .retriever import retrieve_chunks, retrieve_chunks_batch, format_context, pack_context, PackedContext
+from .reranker import rerank_candidates, RerankOutcome, rerank_stats
+from .compressor import compress_results, CompressedContext, compression_stats
+from .clause_analyzer import (
+    analyze_clause,
+    aanalyze_clause,
+    analyze_clause_batch,
+    analyze_clauses,
+    aanalyze_clauses,
+    ClauseInfo
+)
+from .risk_assessor import assess_risks, aassess_risks, assess_risks_batch, RiskItem, RiskReport
+from .risk_screener import (
+    screen_document,
+    assess_document_risks,
+    aassess_document_risks,
+    cached_document_risks
+)
+from .summarizer import (
+    summarize_document,
+    asummarize_document,
+    summarize_documents,
+    stream_summary,
+    document_summary,
+    adocument_summary,
+    stream_document_summary,
+    cached_document_summary
+)
+from .precompute import AnalysisWorkerPool, analysis_pool, default_precompute_kinds
 
 __all__ = [
     "route_query",
+    "aroute_query",
+    "route_queries",
+    "llm_route_query",
+    "fast_route",
+    "FastRoute",
+    "router_stats",
     "retrieve_chunks",
+    "retrieve_chunks_batch",
     "format_context",
+    "pack_context",
+    "PackedContext",
+    "rerank_candidates",
+    "RerankOutcome",
+    "rerank_stats",
+    "compress_results",
+    "CompressedContext",
+    "compression_stats",
     "analyze_clause",
+    "aanalyze_clause",
+    "analyze_clause_batch",
+    "analyze_clauses",
+    "aanalyze_clauses",
     "ClauseInfo",
     "assess_risks",
+    "aassess_risks",
+    "assess_risks_batch",
     "RiskItem",
     "RiskReport",
-    "summarize_document"
+    "screen_document",
+    "assess_document_risks",
+    "aassess_document_risks",
+    "summarize_document",
+    "asummarize_document",
+    "summarize_documents",
+    "stream_summary",
+    "document_summary",
+    "adocument_summary",
+    "stream_document_summary",
+    "cached_document_summary",
+    "cached_document_risks",
+    "AnalysisWorkerPool",
+    "analysis_pool",
+    "default_precompute_kinds"
 ]
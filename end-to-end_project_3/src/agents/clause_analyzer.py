@@ -2,8 +2,16 @@
 Clause Analyzer Agent
 Extracts and structures specific clause types from legal documents.
 """
+import asyncio
+from typing import Any, Callable
 from pydantic import BaseModel
-from src.llm import invoke_llm
+from src.llm import ainvoke_llm, invoke_llm_batch, ainvoke_llm_batch, stream_llm
+from src.vectorstore import ChromaStore, embed_texts
+from src.ingestion import CLAUSE_TYPES
+from .retriever import merge_adjacent_chunks, pack_context
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import STANDARD_CLAUSE_TYPES, TOP_K_RESULTS, MMR_FETCH_K, CONTEXT_TOKEN_BUDGETS
 
 
 class ClauseInfo(BaseModel):
@@ -35,32 +43,236 @@ PAGE_REFERENCE: N/A
 """
 
 
-def analyze_clause(context: str, clause_type: str) -> ClauseInfo:
+def analyze_clause(
+    context: str,
+    clause_type: str,
+    on_field: Callable[[str, Any], None] | None = None
+) -> ClauseInfo:
     """
     Analyzes document context to extract specific clause information.
     
+    The response is streamed through a ClauseStreamParser, so each field is
+    available as soon as its line is complete.
+    
     Args:
         context: The document context from retrieval.
         clause_type: Type of clause to find (e.g., "termination", "liability").
+        on_field: Called with (ClauseInfo field name, value) as each field is parsed.
         
     Returns:
         ClauseInfo object with structured clause data.
     """
     prompt = CLAUSE_PROMPT.format(context=context, clause_type=clause_type)
-    response = invoke_llm(prompt)
+    parser = ClauseStreamParser(clause_type)
+    for token in stream_llm(prompt):
+        for name, value in parser.feed(token):
+            if on_field:
+                on_field(name, value)
+    return parser.close(on_field)
+
+
+async def aanalyze_clause(
+    context: str,
+    clause_type: str,
+    on_field: Callable[[str, Any], None] | None = None
+) -> ClauseInfo:
+    """
+    Async variant of analyze_clause.
     
-    # Parse the structured response
-    lines = response.strip().split("\n")
-    parsed = {}
+    The response is awaited whole, so on_field receives every field once
+    the response is complete.
+    """
+    prompt = CLAUSE_PROMPT.format(context=context, clause_type=clause_type)
+    parser = ClauseStreamParser(clause_type)
+    for name, value in parser.feed(await ainvoke_llm(prompt)):
+        if on_field:
+            on_field(name, value)
+    return parser.close(on_field)
+
+
+def analyze_clause_batch(requests: list[tuple[str, str]]) -> list[ClauseInfo | Exception]:
+    """
+    Analyzes several (context, clause_type) pairs with concurrent LLM calls.
     
-    for line in lines:
-        if ":" in line:
-            key, value = line.split(":", 1)
-            parsed[key.strip().upper()] = value.strip()
+    Args:
+        requests: (context, clause_type) pairs, e.g. one per clause type.
+        
+    Returns:
+        One ClauseInfo per request, in order; a failed request holds its exception.
+    """
+    prompts = [CLAUSE_PROMPT.format(context=c, clause_type=t) for c, t in requests]
+    responses = invoke_llm_batch(prompts)
+    return [
+        r if isinstance(r, Exception) else parse_clause_response(r, clause_type)
+        for r, (_, clause_type) in zip(responses, requests)
+    ]
+
+
+class ClauseStreamParser:
+    """
+    Incremental parser for the CLAUSE_PROMPT output format.
+    
+    Feed it response text in chunks of any size; each field is returned as
+    soon as its line ends.
+    """
     
-    return ClauseInfo(
-        clause_type=parsed.get("CLAUSE_TYPE", clause_type),
-        summary=parsed.get("SUMMARY", "Unable to extract"),
-        key_terms=[t.strip() for t in parsed.get("KEY_TERMS", "").split(",") if t.strip()],
-        page_reference=parsed.get("PAGE_REFERENCE", "Unknown")
-    )
+    _FIELDS = {
+        "CLAUSE_TYPE": "clause_type",
+        "SUMMARY": "summary",
+        "KEY_TERMS": "key_terms",
+        "PAGE_REFERENCE": "page_reference",
+    }
+    
+    def __init__(self, clause_type: str):
+        self.clause_type = clause_type
+        self.fields: dict[str, Any] = {}
+        self._buffer = ""
+    
+    def feed(self, text: str) -> list[tuple[str, Any]]:
+        """
+        Consumes the next chunk of the response.
+        
+        Args:
+            text: Response text as it arrives from the LLM.
+            
+        Returns:
+            (ClauseInfo field name, value) pairs completed by this chunk.
+        """
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        return [field for field in map(self._parse_line, lines) if field is not None]
+    
+    def close(self, on_field: Callable[[str, Any], None] | None = None) -> ClauseInfo:
+        """
+        Flushes the last line and returns the ClauseInfo.
+        
+        Args:
+            on_field: Called with the final field if closing completes one.
+            
+        Returns:
+            ClauseInfo object with structured clause data.
+        """
+        field = self._parse_line(self._buffer)
+        self._buffer = ""
+        if field is not None and on_field:
+            on_field(*field)
+        return ClauseInfo(
+            clause_type=self.fields.get("clause_type", self.clause_type),
+            summary=self.fields.get("summary", "Unable to extract"),
+            key_terms=self.fields.get("key_terms", []),
+            page_reference=self.fields.get("page_reference", "Unknown")
+        )
+    
+    def _parse_line(self, line: str) -> tuple[str, Any] | None:
+        key, colon, value = line.partition(":")
+        name = self._FIELDS.get(key.strip().upper())
+        if not colon or name is None:
+            return None
+        value = value.strip()
+        if name == "key_terms":
+            value = [t.strip() for t in value.split(",") if t.strip()]
+        self.fields[name] = value
+        return name, value
+
+
+def parse_clause_response(response: str, clause_type: str) -> ClauseInfo:
+    """
+    Parses the CLAUSE_PROMPT output format into a ClauseInfo.
+    
+    Args:
+        response: The raw LLM response.
+        clause_type: Clause type requested, used when the response omits it.
+        
+    Returns:
+        ClauseInfo object with structured clause data.
+    """
+    parser = ClauseStreamParser(clause_type)
+    parser.feed(response)
+    return parser.close()
+
+
+# === Clause Sheets ===
+
+def _clause_contexts(
+    source: str,
+    clause_types: list[str],
+    store: ChromaStore | None
+) -> list[str]:
+    """
+    Builds one packed context per clause type with a single embedding batch
+    and a single store query.
+    
+    Each clause type is queried with its prototype sentence. Candidates come
+    from the given document only; chunks tagged with the clause type at
+    ingest are ranked ahead of untagged ones.
+    """
+    store = store or ChromaStore()
+    queries = [CLAUSE_TYPES[t][0][0] if t in CLAUSE_TYPES else f"{t} clause" for t in clause_types]
+    candidate_lists = store.query_batch(embed_texts(queries), k=MMR_FETCH_K, where={"source": source})
+    
+    contexts = []
+    for clause_type, candidates in zip(clause_types, candidate_lists):
+        ranked = sorted(candidates, key=lambda r: clause_type not in r.clause_types)  # Stable: keeps distance order
+        results = merge_adjacent_chunks(ranked[:TOP_K_RESULTS])
+        contexts.append(pack_context(results, CONTEXT_TOKEN_BUDGETS["CLAUSE_SEARCH"]).text)
+    return contexts
+
+
+def _clause_sheet(clause_types: list[str], responses: list) -> dict[str, ClauseInfo]:
+    sheet = {}
+    for clause_type, response in zip(clause_types, responses):
+        if isinstance(response, Exception):
+            sheet[clause_type] = ClauseInfo(
+                clause_type=clause_type,
+                summary=f"Analysis failed: {response}",
+                key_terms=[],
+                page_reference="N/A"
+            )
+        else:
+            sheet[clause_type] = parse_clause_response(response, clause_type)
+    return sheet
+
+
+def analyze_clauses(
+    source: str,
+    clause_types: list[str] | None = None,
+    store: ChromaStore | None = None
+) -> dict[str, ClauseInfo]:
+    """
+    Produces a clause sheet for one document.
+    
+    All clause queries are embedded in one batch and retrieved in one store
+    call, and the LLM calls run concurrently, so the sheet takes about as
+    long as the slowest single clause.
+    
+    Args:
+        source: The document's source name (e.g., "contract.pdf").
+        clause_types: Clause types to extract; defaults to STANDARD_CLAUSE_TYPES.
+        store: ChromaStore instance. Creates new if not provided.
+        
+    Returns:
+        Dict of clause type -> ClauseInfo, in the requested order. A clause
+        whose LLM call failed gets a ClauseInfo describing the failure.
+    """
+    clause_types = list(clause_types or STANDARD_CLAUSE_TYPES)
+    contexts = _clause_contexts(source, clause_types, store)
+    prompts = [
+        CLAUSE_PROMPT.format(context=c, clause_type=t.replace("_", " "))
+        for c, t in zip(contexts, clause_types)
+    ]
+    return _clause_sheet(clause_types, invoke_llm_batch(prompts))
+
+
+async def aanalyze_clauses(
+    source: str,
+    clause_types: list[str] | None = None,
+    store: ChromaStore | None = None
+) -> dict[str, ClauseInfo]:
+    """Async variant of analyze_clauses."""
+    clause_types = list(clause_types or STANDARD_CLAUSE_TYPES)
+    contexts = await asyncio.to_thread(_clause_contexts, source, clause_types, store)
+    prompts = [
+        CLAUSE_PROMPT.format(context=c, clause_type=t.replace("_", " "))
+        for c, t in zip(contexts, clause_types)
+    ]
+    return _clause_sheet(clause_types, await ainvoke_llm_batch(prompts))
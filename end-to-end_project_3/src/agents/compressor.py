@@ -0,0 +1,181 @@
+"""
+Context Compressor
+Cuts retrieved chunks down to the sentences most similar to the query, so
+specialist prompts carry fewer tokens with the same citations.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import re
+import threading
+import numpy as np
+from src.vectorstore import RetrievalResult, embed_query, embed_texts, normalize
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import (
+    CONTEXT_COMPRESSION_MAX_SENTENCES,
+    CONTEXT_COMPRESSION_MIN_SIMILARITY,
+    CONTEXT_COMPRESSION_CACHE_SIZE,
+)
+
+
+# Sentence ends followed by the start of a new sentence or numbered item; line breaks
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9(\"“])|\n+")
+_GAP = " … "
+
+
+def split_sentences(text: str) -> list[str]:
+    """Splits chunk text into sentences (section headings count as sentences)."""
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+class SentenceEmbeddingCache:
+    """Thread-safe LRU of (sentences, normalized embedding matrix) per chunk text."""
+    
+    def __init__(self, max_entries: int = CONTEXT_COMPRESSION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[list[str], np.ndarray]] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_many(self, contents: list[str]) -> list[tuple[list[str], np.ndarray]]:
+        """
+        Returns the sentences and sentence embeddings of each chunk text.
+        
+        Sentences of all uncached chunks are embedded in a single batch.
+        """
+        with self._lock:
+            found = {c: self._entries[c] for c in contents if c in self._entries}
+            for c in found:
+                self._entries.move_to_end(c)
+        
+        missing = list(dict.fromkeys(c for c in contents if c not in found))
+        if missing:
+            split = [split_sentences(c) for c in missing]
+            flat = [s for sentences in split for s in sentences]
+            vectors = normalize(np.asarray(embed_texts(flat), dtype=np.float32)) if flat else np.zeros((0, 0))
+            offset = 0
+            with self._lock:
+                for content, sentences in zip(missing, split):
+                    entry = (sentences, vectors[offset:offset + len(sentences)])
+                    offset += len(sentences)
+                    found[content] = entry
+                    self._entries[content] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        
+        return [found[c] for c in contents]
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@dataclass
+class CompressedContext:
+    """Results cut down to their query-relevant sentences, with accounting."""
+    results: list[RetrievalResult]  # Chunks with at least one kept sentence, in rank order
+    sentences_in: int
+    sentences_kept: int
+    chars_in: int
+    chars_out: int
+    
+    @property
+    def ratio(self) -> float:
+        """Kept share of the original characters (1.0 = nothing removed)."""
+        return self.chars_out / self.chars_in if self.chars_in else 1.0
+
+
+class CompressionStats:
+    """Thread-safe running totals of how much context compression removes."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        self.queries = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.sentences_in = 0
+        self.sentences_kept = 0
+    
+    def record(self, compressed: CompressedContext) -> None:
+        with self._lock:
+            self.queries += 1
+            self.chars_in += compressed.chars_in
+            self.chars_out += compressed.chars_out
+            self.sentences_in += compressed.sentences_in
+            self.sentences_kept += compressed.sentences_kept
+    
+    def snapshot(self) -> dict:
+        """Returns the overall compression ratio and sentence retention."""
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "compression_ratio": self.chars_out / self.chars_in if self.chars_in else 1.0,
+                "sentences_kept_share": self.sentences_kept / self.sentences_in if self.sentences_in else 1.0,
+            }
+
+
+# Process-wide sentence embedding cache and statistics
+sentence_cache = SentenceEmbeddingCache()
+compression_stats = CompressionStats()
+
+
+def compress_results(
+    query: str,
+    results: list[RetrievalResult],
+    max_sentences: int = CONTEXT_COMPRESSION_MAX_SENTENCES,
+    min_similarity: float = CONTEXT_COMPRESSION_MIN_SIMILARITY
+) -> CompressedContext:
+    """
+    Keeps only the sentences of the retrieved chunks most similar to the query.
+    
+    All sentences are scored against the query embedding with one matrix
+    product. The best `max_sentences` scoring at least `min_similarity`
+    are kept (always at least the single best one), in their original order
+    within each chunk; skipped stretches are marked with an ellipsis.
+    Chunks left without a sentence are dropped, the rest keep their
+    citations and rank.
+    
+    Args:
+        query: The user's query.
+        results: Retrieval results in rank order.
+        max_sentences: Maximum sentences kept across all chunks.
+        min_similarity: Minimum cosine similarity for a sentence to be kept.
+        
+    Returns:
+        CompressedContext with the compressed results and accounting.
+    """
+    chars_in = sum(len(r.content) for r in results)
+    entries = sentence_cache.get_many([r.content for r in results])
+    sentences_in = sum(len(sentences) for sentences, _ in entries)
+    if not sentences_in:
+        return CompressedContext(results, 0, 0, chars_in, chars_in)
+    
+    matrix = np.concatenate([vectors for _, vectors in entries if len(vectors)])
+    query_vector = normalize(np.asarray(embed_query(query), dtype=np.float32))
+    similarity = matrix @ query_vector
+    
+    ranked = np.argsort(-similarity)
+    keep = {int(i) for i in ranked[:max_sentences] if similarity[i] >= min_similarity} or {int(ranked[0])}
+    
+    compressed, offset = [], 0
+    for result, (sentences, _) in zip(results, entries):
+        kept = [j for j in range(len(sentences)) if offset + j in keep]
+        offset += len(sentences)
+        if not kept:
+            continue
+        parts = [sentences[kept[0]]]
+        for previous, j in zip(kept, kept[1:]):
+            parts.append((" " if j == previous + 1 else _GAP) + sentences[j])
+        compressed.append(replace(result, content="".join(parts)))
+    
+    outcome = CompressedContext(
+        results=compressed,
+        sentences_in=sentences_in,
+        sentences_kept=len(keep),
+        chars_in=chars_in,
+        chars_out=sum(len(r.content) for r in compressed)
+    )
+    compression_stats.record(outcome)
+    return outcome
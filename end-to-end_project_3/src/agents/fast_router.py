@@ -0,0 +1,188 @@
+"""
+Fast Router
+Classifies queries locally with keyword rules and embedding prototypes, so
+most queries are routed without an LLM round trip.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+import re
+import threading
+import numpy as np
+from src.vectorstore import embed_texts
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import FAST_ROUTER_MIN_SIMILARITY, FAST_ROUTER_MIN_MARGIN
+
+
+# Unambiguous cues; a query matching exactly one route is routed by rule
+KEYWORD_RULES = {
+    "RISK_ANALYSIS": re.compile(r"\b(risks?|risky|red flags?|dangers?|dangerous|unfair|one-sided|pitfalls?|watch out)\b", re.I),
+    "SUMMARIZE": re.compile(r"\b(summar\w*|overview|tl;?dr|gist|in a nutshell|high-level|recap)\b", re.I),
+    "CLAUSE_SEARCH": re.compile(r"\b(clauses?|provisions?|section \d+|termination|indemnif\w*|liability|confidentiality|"
+                                r"non-compete|governing law|force majeure|payment terms|auto-?renewal)\b", re.I),
+}
+
+# Example queries per route; a query is compared against each route's closest example
+ROUTE_PROTOTYPES = {
+    "CLAUSE_SEARCH": [
+        "What does the termination clause say?",
+        "Find the liability section",
+        "Show me the payment terms",
+        "Is there a confidentiality provision?",
+        "What are the renewal conditions?",
+        "Where is the governing law specified?",
+    ],
+    "RISK_ANALYSIS": [
+        "What are the risks in this contract?",
+        "Are there any red flags I should know about?",
+        "Is this agreement unfavorable to me?",
+        "What should I be worried about before signing?",
+        "Which terms are one-sided?",
+        "Could this contract expose me to liability?",
+    ],
+    "SUMMARIZE": [
+        "Summarize this document",
+        "Give me an overview of the agreement",
+        "What is this contract about?",
+        "Explain the main points in plain English",
+        "TL;DR of the contract",
+        "Brief summary of the key terms",
+    ],
+    "GENERAL_QA": [
+        "Who are the parties to this agreement?",
+        "When does the contract start?",
+        "How much is the monthly fee?",
+        "What is the effective date?",
+        "Who signed the agreement?",
+        "Where is the company located?",
+    ],
+}
+
+
+@dataclass
+class FastRoute:
+    """A locally computed routing decision."""
+    route: str
+    confidence: float  # 1.0 for keyword matches, else lead over the runner-up route
+    similarity: float  # Cosine similarity to the closest prototype (1.0 for keyword matches)
+    method: str  # "keyword" or "prototype"
+    confident: bool  # Whether the decision clears the thresholds for skipping the LLM
+
+
+@lru_cache(maxsize=1)
+def _prototype_index() -> tuple[np.ndarray, list[str]]:
+    """Embeds the prototypes once; returns the normalized matrix and each row's route."""
+    routes = [route for route, examples in ROUTE_PROTOTYPES.items() for _ in examples]
+    texts = [text for examples in ROUTE_PROTOTYPES.values() for text in examples]
+    matrix = np.asarray(embed_texts(texts), dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    return matrix, routes
+
+
+def keyword_route(query: str) -> str | None:
+    """Returns the route if the query matches the keyword rules of exactly one route."""
+    matches = [route for route, pattern in KEYWORD_RULES.items() if pattern.search(query)]
+    return matches[0] if len(matches) == 1 else None
+
+
+def fast_route(
+    query: str,
+    query_embedding: list[float] | None = None,
+    min_similarity: float = FAST_ROUTER_MIN_SIMILARITY,
+    min_margin: float = FAST_ROUTER_MIN_MARGIN
+) -> FastRoute:
+    """
+    Routes a query without calling the LLM.
+    
+    Keyword rules are tried first; otherwise the query embedding is compared
+    with every prototype and each route scores its closest prototype.
+    
+    Args:
+        query: The user's natural language query.
+        query_embedding: Precomputed embedding of the query (embedded if None).
+        min_similarity: Minimum best-prototype similarity for a confident decision.
+        min_margin: Minimum lead over the runner-up route for a confident decision.
+        
+    Returns:
+        FastRoute with the best guess and whether it is confident.
+    """
+    route = keyword_route(query)
+    if route is not None:
+        return FastRoute(route=route, confidence=1.0, similarity=1.0, method="keyword", confident=True)
+    
+    matrix, routes = _prototype_index()
+    if query_embedding is None:
+        query_embedding = embed_texts([query])[0]
+    vector = np.asarray(query_embedding, dtype=np.float32)
+    similarities = matrix @ (vector / max(float(np.linalg.norm(vector)), 1e-12))
+    
+    best_per_route: dict[str, float] = {}
+    for r, similarity in zip(routes, similarities.tolist()):
+        best_per_route[r] = max(best_per_route.get(r, -1.0), similarity)
+    ranked = sorted(best_per_route.items(), key=lambda item: item[1], reverse=True)
+    (route, best), (_, runner_up) = ranked[0], ranked[1]
+    margin = best - runner_up
+    
+    return FastRoute(
+        route=route,
+        confidence=margin,
+        similarity=best,
+        method="prototype",
+        confident=best >= min_similarity and margin >= min_margin
+    )
+
+
+class RouterStats:
+    """
+    Thread-safe counters for the fast path.
+    
+    Agreement with the LLM router is measured whenever both answers are
+    known: on every fallback (the fast guess vs. the LLM's answer) and on
+    shadow-sampled fast-path decisions.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        self.fast_hits = {"keyword": 0, "prototype": 0}
+        self.fallbacks = 0
+        self.compared = {"fast_path": 0, "fallback": 0}
+        self.agreed = {"fast_path": 0, "fallback": 0}
+    
+    def record(self, decision: FastRoute, llm_route: str | None = None) -> None:
+        """Records a decision and, when the LLM was also consulted, whether it agreed."""
+        with self._lock:
+            if decision.confident:
+                self.fast_hits[decision.method] += 1
+            else:
+                self.fallbacks += 1
+            if llm_route is not None:
+                kind = "fast_path" if decision.confident else "fallback"
+                self.compared[kind] += 1
+                self.agreed[kind] += int(decision.route == llm_route)
+    
+    def snapshot(self) -> dict:
+        """Returns the fast-path hit rate and agreement rates with the LLM router."""
+        with self._lock:
+            hits = sum(self.fast_hits.values())
+            total = hits + self.fallbacks
+            
+            def rate(kind: str) -> float | None:
+                return self.agreed[kind] / self.compared[kind] if self.compared[kind] else None
+            
+            return {
+                "queries": total,
+                "fast_path_hits": dict(self.fast_hits),
+                "fallbacks": self.fallbacks,
+                "fast_path_hit_rate": hits / total if total else 0.0,
+                "fast_path_agreement": rate("fast_path"),
+                "fast_path_compared": self.compared["fast_path"],
+                "fallback_agreement": rate("fallback"),
+                "fallback_compared": self.compared["fallback"],
+            }
+
+
+# Process-wide fast router statistics
+router_stats = RouterStats()
@@ -0,0 +1,142 @@
+"""
+Document Precompute Workers
+Background thread pool that builds per-document artifacts right after ingest.
+
+Whole-document agents (risk report, summary) store their results under the
+document's content hash; running them here means later queries about the
+same version are served from the artifact store without an LLM call.
+"""
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from src.llm import agent_label
+from src.storage import get_artifact_store
+from src.vectorstore import ChromaStore
+from .risk_screener import assess_document_risks
+from .summarizer import document_summary
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import ANALYSIS_WORKERS, RISK_PRECOMPUTE_ON_INGEST, SUMMARY_PRECOMPUTE_ON_INGEST
+
+
+logger = logging.getLogger(__name__)
+
+# Artifact kind -> function computing and storing it for a source
+PRECOMPUTE_TASKS = {
+    "risk_report": assess_document_risks,
+    "summary": document_summary,
+}
+
+
+def default_precompute_kinds() -> list[str]:
+    """Artifact kinds enabled for ingest-time precomputation in config.py."""
+    enabled = {"risk_report": RISK_PRECOMPUTE_ON_INGEST, "summary": SUMMARY_PRECOMPUTE_ON_INGEST}
+    return [kind for kind in PRECOMPUTE_TASKS if enabled[kind]]
+
+
+class AnalysisWorkerPool:
+    """
+    Runs whole-document analyses on a pool of worker threads.
+    
+    Jobs are keyed by (document version, artifact kind): submitting a
+    version that is already queued or running returns the in-flight job, so
+    a query arriving mid-precompute can wait for it instead of paying for
+    the same LLM calls twice.
+    """
+    
+    def __init__(self, max_workers: int = ANALYSIS_WORKERS):
+        self.max_workers = max_workers
+        self.completed = 0
+        self.failed = 0
+        
+        self._executor: ThreadPoolExecutor | None = None
+        self._jobs: dict[tuple[str, str], Future] = {}
+        self._lock = threading.RLock()
+    
+    def submit(
+        self,
+        source: str,
+        kinds: list[str] | None = None,
+        store: ChromaStore | None = None
+    ) -> list[Future]:
+        """
+        Queues the analyses of a document's current version.
+        
+        Args:
+            source: The document's source name (e.g., "contract.pdf").
+            kinds: Artifact kinds to build; defaults to those enabled in config.py.
+            store: ChromaStore instance. Creates new if not provided.
+            
+        Returns:
+            One Future per kind, resolving to the computed artifact.
+        """
+        kinds = default_precompute_kinds() if kinds is None else kinds
+        doc_hash = get_artifact_store().document_hash(source) or source
+        futures = []
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="precompute")
+            for kind in kinds:
+                key = (doc_hash, kind)
+                future = self._jobs.get(key)
+                if future is None:
+                    future = self._executor.submit(self._run, source, kind, store)
+                    self._jobs[key] = future
+                    # Runs inline if the job already finished, hence the reentrant lock
+                    future.add_done_callback(lambda f, key=key: self._finish(key, f))
+                futures.append(future)
+        return futures
+    
+    def _run(self, source: str, kind: str, store: ChromaStore | None):
+        with agent_label(f"precompute_{kind}"):
+            return PRECOMPUTE_TASKS[kind](source, store)
+    
+    def _finish(self, key: tuple[str, str], future: Future) -> None:
+        with self._lock:
+            self._jobs.pop(key, None)
+            if future.exception() is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+                logger.warning("Precomputing %s failed: %s", key[1], future.exception())
+    
+    def wait(self, source: str, kind: str, timeout: float | None = None) -> bool:
+        """
+        Blocks until an in-flight analysis of the document's current version finishes.
+        
+        Args:
+            source: The document's source name.
+            kind: Artifact kind, e.g. "risk_report".
+            timeout: Maximum seconds to wait.
+            
+        Returns:
+            True if no job was pending or it finished within the timeout.
+        """
+        doc_hash = get_artifact_store().document_hash(source) or source
+        with self._lock:
+            future = self._jobs.get((doc_hash, kind))
+        if future is None:
+            return True
+        try:
+            future.result(timeout)
+        except TimeoutError:
+            return False
+        except Exception:
+            pass  # Logged by _finish; the caller recomputes on demand
+        return True
+    
+    def pending(self) -> int:
+        """Number of queued or running analyses."""
+        with self._lock:
+            return len(self._jobs)
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stops accepting work; with wait=True, lets queued analyses finish first."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+# Process-wide pool shared by ingest and the graph nodes
+analysis_pool = AnalysisWorkerPool()
@@ -0,0 +1,186 @@
+"""
+Cross-Encoder Re-ranker
+Re-scores over-fetched candidates against the query with a small CPU
+cross-encoder, within a per-query latency budget.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import time
+from src.vectorstore import RetrievalResult
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import RERANK_MODEL, RERANK_BATCH_SIZE, RERANK_BUDGET_MS, RERANK_CACHE_SIZE
+
+
+# Lazy-loaded model to avoid loading on import
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_reranker_model():
+    """Lazily loads the cross-encoder on first use (CPU)."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import CrossEncoder
+                _model = CrossEncoder(RERANK_MODEL, device="cpu")
+    return _model
+
+
+class PairScoreCache:
+    """Thread-safe LRU of cross-encoder scores per (query, chunk text)."""
+    
+    def __init__(self, max_entries: int = RERANK_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._scores: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, query: str, content: str) -> float | None:
+        with self._lock:
+            score = self._scores.get((query, content))
+            if score is not None:
+                self._scores.move_to_end((query, content))
+            return score
+    
+    def put(self, query: str, content: str, score: float) -> None:
+        with self._lock:
+            self._scores[(query, content)] = score
+            self._scores.move_to_end((query, content))
+            while len(self._scores) > self.max_entries:
+                self._scores.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._scores.clear()
+
+
+@dataclass
+class RerankOutcome:
+    """Re-ranked candidates with accounting for one query."""
+    results: list[RetrievalResult]
+    scored: int  # Pairs run through the model
+    cached: int  # Pairs served from the score cache
+    reranked: int  # Leading candidates re-ordered by score; the rest keep bi-encoder order
+    elapsed_ms: float
+    within_budget: bool  # False if scoring stopped early
+
+
+class RerankStats:
+    """
+    Thread-safe counters for the re-ranking stage.
+    
+    Also tracks a moving average of the model's time per pair, used to
+    predict whether the next batch still fits the latency budget.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self) -> None:
+        self.queries = 0
+        self.pairs_scored = 0
+        self.cache_hits = 0
+        self.budget_stops = 0
+        self.scoring_ms = 0.0
+        self.pair_ms: float | None = None
+    
+    def record_batch(self, pairs: int, elapsed_ms: float) -> None:
+        with self._lock:
+            per_pair = elapsed_ms / pairs
+            self.pair_ms = per_pair if self.pair_ms is None else 0.8 * self.pair_ms + 0.2 * per_pair
+            self.pairs_scored += pairs
+            self.scoring_ms += elapsed_ms
+    
+    def record(self, outcome: RerankOutcome) -> None:
+        with self._lock:
+            self.queries += 1
+            self.cache_hits += outcome.cached
+            self.budget_stops += int(not outcome.within_budget)
+    
+    def snapshot(self) -> dict:
+        """Returns pair throughput, cache hit rate and how often the budget cut scoring short."""
+        with self._lock:
+            lookups = self.pairs_scored + self.cache_hits
+            return {
+                "queries": self.queries,
+                "pairs_scored": self.pairs_scored,
+                "cache_hit_rate": self.cache_hits / lookups if lookups else 0.0,
+                "budget_stop_rate": self.budget_stops / self.queries if self.queries else 0.0,
+                "ms_per_pair": self.pair_ms,
+                "scoring_ms_total": self.scoring_ms,
+            }
+
+
+# Process-wide pair score cache and statistics
+pair_score_cache = PairScoreCache()
+rerank_stats = RerankStats()
+
+
+def rerank_candidates(
+    query: str,
+    candidates: list[RetrievalResult],
+    budget_ms: float = RERANK_BUDGET_MS,
+    batch_size: int = RERANK_BATCH_SIZE,
+    use_cache: bool = True
+) -> RerankOutcome:
+    """
+    Re-orders candidates by cross-encoder relevance to the query.
+    
+    Uncached pairs are scored in batches in bi-encoder order. Before each
+    batch, the time it is expected to take is checked against what is left
+    of the budget; once it no longer fits, scoring stops. The longest
+    leading run of scored candidates is then sorted by score and the rest
+    keep their original order, so running out of budget degrades towards
+    plain bi-encoder ranking. Loading the model is not counted.
+    
+    Args:
+        query: The search query.
+        candidates: Retrieval results in bi-encoder rank order.
+        budget_ms: Maximum scoring time for this query (0 disables scoring).
+        batch_size: Pairs per model call.
+        use_cache: Serve and populate the pair score cache.
+        
+    Returns:
+        RerankOutcome with the re-ordered results.
+    """
+    model = get_reranker_model() if budget_ms > 0 else None
+    start = time.perf_counter()
+    
+    scores = [pair_score_cache.get(query, c.content) if use_cache else None for c in candidates]
+    cached = sum(s is not None for s in scores)
+    missing = [i for i, s in enumerate(scores) if s is None]
+    scored = 0
+    
+    for offset in range(0, len(missing) if model is not None else 0, batch_size):
+        batch = missing[offset:offset + batch_size]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if rerank_stats.pair_ms is not None and elapsed_ms + rerank_stats.pair_ms * len(batch) > budget_ms:
+            break
+        
+        batch_start = time.perf_counter()
+        batch_scores = model.predict([(query, candidates[i].content) for i in batch], batch_size=len(batch))
+        rerank_stats.record_batch(len(batch), (time.perf_counter() - batch_start) * 1000)
+        
+        for i, score in zip(batch, batch_scores):
+            scores[i] = float(score)
+            if use_cache:
+                pair_score_cache.put(query, candidates[i].content, scores[i])
+        scored += len(batch)
+    
+    # Only a fully scored prefix can be re-ordered without comparing against unknown scores
+    prefix = next((i for i, s in enumerate(scores) if s is None), len(candidates))
+    order = sorted(range(prefix), key=lambda i: scores[i], reverse=True) + list(range(prefix, len(candidates)))
+    
+    outcome = RerankOutcome(
+        results=[candidates[i] for i in order],
+        scored=scored,
+        cached=cached,
+        reranked=prefix,
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+        within_budget=prefix == len(candidates)
+    )
+    rerank_stats.record(outcome)
+    return outcome
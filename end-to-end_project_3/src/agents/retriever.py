@@ -2,38 +2,285 @@
 Retriever Agent
 Finds relevant document chunks using semantic search.
 """
-from src.vectorstore import ChromaStore, embed_single, RetrievalResult
+from dataclasses import dataclass, replace
+import re
+import numpy as np
+from src.vectorstore import ChromaStore, embed_query, embed_texts, normalize, RetrievalResult, SemanticRetrievalCache
+from src.llm import count_tokens
+from src.storage import get_artifact_store, content_hash
+from .reranker import rerank_candidates
 import sys
 sys.path.append(str(__file__).rsplit("src", 1)[0])
-from config import TOP_K_RESULTS
+from config import (
+    TOP_K_RESULTS,
+    CHUNK_OVERLAP,
+    MMR_ENABLED,
+    MMR_FETCH_K,
+    MMR_LAMBDA,
+    RETRIEVAL_CACHE_ENABLED,
+    RERANK_ENABLED,
+    RERANK_FETCH_K,
+)
+
+
+# Clause/sentence boundaries used when a chunk must be truncated to fit a budget
+_BOUNDARY = re.compile(r"(?<=[.;:!?])\s+|\n+")
+_SEPARATOR = "\n\n---\n\n"
+NO_CONTEXT = "No relevant information found in the document."
+
+
+@dataclass
+class PackedContext:
+    """Context text assembled under a token budget, with accounting."""
+    text: str
+    tokens_used: int
+    results: list[RetrievalResult]  # Chunks included (possibly truncated), in rank order
+    truncated: int  # Chunks cut at a sentence/clause boundary
+    dropped: int  # Chunks that did not fit at all
+
+
+# Process-wide cache of results for semantically equivalent queries
+retrieval_cache = SemanticRetrievalCache()
 
 
 def retrieve_chunks(
     query: str,
     store: ChromaStore | None = None,
-    k: int = TOP_K_RESULTS
+    k: int = TOP_K_RESULTS,
+    diversify: bool = MMR_ENABLED,
+    use_cache: bool = RETRIEVAL_CACHE_ENABLED,
+    where: dict | None = None,
+    rerank: bool = RERANK_ENABLED,
+    query_embedding: list[float] | None = None
 ) -> list[RetrievalResult]:
     """
     Retrieves relevant document chunks for a query.
     
+    With diversification enabled, MMR_FETCH_K candidates are over-fetched,
+    reduced to k with Maximal Marginal Relevance, and adjacent overlapping
+    chunks are merged into single spans.
+    
+    With re-ranking enabled, RERANK_FETCH_K candidates are over-fetched and
+    re-ordered by the cross-encoder within RERANK_BUDGET_MS; the top k
+    replace MMR selection (adjacent chunks are still merged when
+    diversifying).
+    
+    With caching enabled, a query whose embedding is within
+    RETRIEVAL_CACHE_THRESHOLD cosine similarity of a cached query is served
+    from memory until the store is written to.
+    
     Args:
         query: The search query.
         store: ChromaStore instance. Creates new if not provided.
         k: Number of results to return.
+        diversify: Apply MMR and adjacent-chunk merging.
+        use_cache: Serve and populate the semantic retrieval cache.
+        where: Optional metadata filter, e.g. {"clause_termination": True}.
+        rerank: Re-rank over-fetched candidates with the cross-encoder.
+        query_embedding: Precomputed query embedding; embeds the query if omitted.
         
     Returns:
         List of RetrievalResult objects with content and citations.
     """
+    # Generate query embedding
+    query_embedding = query_embedding if query_embedding is not None else embed_query(query)
+    
+    return retrieve_chunks_batch([query], store, k, diversify, use_cache, where, rerank, [query_embedding])[0]
+
+
+def retrieve_chunks_batch(
+    queries: list[str],
+    store: ChromaStore | None = None,
+    k: int = TOP_K_RESULTS,
+    diversify: bool = MMR_ENABLED,
+    use_cache: bool = RETRIEVAL_CACHE_ENABLED,
+    where: dict | None = None,
+    rerank: bool = RERANK_ENABLED,
+    query_embeddings: list[list[float]] | None = None
+) -> list[list[RetrievalResult]]:
+    """
+    Retrieves chunks for several queries sharing one metadata filter.
+    
+    Same selection as retrieve_chunks, but queries missing from the
+    retrieval cache are embedded in one batch and sent to the store in a
+    single query.
+    
+    Args:
+        queries: The search queries.
+        store: ChromaStore instance. Creates new if not provided.
+        k: Number of results to return per query.
+        diversify: Apply MMR and adjacent-chunk merging.
+        use_cache: Serve and populate the semantic retrieval cache.
+        where: Optional metadata filter applied to every query.
+        rerank: Re-rank over-fetched candidates with the cross-encoder.
+        query_embeddings: Precomputed embeddings, one per query; embeds the
+            queries if omitted.
+            
+    Returns:
+        One list of RetrievalResult objects per query, in order.
+    """
     if store is None:
         store = ChromaStore()
+    if query_embeddings is None:
+        query_embeddings = embed_texts(queries) if queries else []
+    query_embeddings = [list(e) for e in query_embeddings]
     
-    # Generate query embedding
-    query_embedding = embed_single(query)
+    scope = (store.cache_key, k, diversify, rerank, repr(where) if where else None)
+    generation = store.generation
+    batches: list[list[RetrievalResult] | None] = [None] * len(queries)
+    if use_cache:
+        batches = [retrieval_cache.get(e, scope, generation) for e in query_embeddings]
+    
+    missing = [i for i, results in enumerate(batches) if results is None]
+    if not missing:
+        return batches
+    
+    if rerank:
+        fetch_k = max(k, RERANK_FETCH_K)
+    else:
+        fetch_k = max(k, MMR_FETCH_K) if diversify else k
+    candidate_lists = store.query_batch(
+        [query_embeddings[i] for i in missing],
+        k=fetch_k,
+        where=where,
+        include_embeddings=diversify and not rerank
+    )
+    
+    for i, candidates in zip(missing, candidate_lists):
+        if rerank:
+            results = rerank_candidates(queries[i], candidates).results[:k]
+            if diversify:
+                results = merge_adjacent_chunks(results)
+        elif not diversify:
+            results = candidates
+        else:
+            selected = mmr_select(query_embeddings[i], candidates, k=k)
+            results = merge_adjacent_chunks(selected)
+        
+        if use_cache:
+            retrieval_cache.put(query_embeddings[i], scope, generation, results)
+        batches[i] = results
     
-    # Retrieve from vector store
-    results = store.query(query_embedding, k=k)
+    return batches
+
+
+def load_document_chunks(source: str, store: ChromaStore | None = None) -> tuple[str, list[RetrievalResult]]:
+    """
+    Reads every chunk of a document and records its current content hash.
     
-    return results
+    Args:
+        source: The document's source name (e.g., "contract.pdf").
+        store: ChromaStore instance. Creates new if not provided.
+        
+    Returns:
+        (content hash, chunks in reading order)
+    """
+    chunks = (store or ChromaStore()).get_source(source)
+    if not chunks:
+        raise ValueError(f"Document not found in the vector store: {source}")
+    doc_hash = content_hash([c.content for c in chunks])
+    get_artifact_store().set_document(source, doc_hash)
+    return doc_hash, chunks
+
+
+def mmr_select(
+    query_embedding: list[float],
+    candidates: list[RetrievalResult],
+    k: int = TOP_K_RESULTS,
+    lambda_mult: float = MMR_LAMBDA
+) -> list[RetrievalResult]:
+    """
+    Selects k candidates with Maximal Marginal Relevance.
+    
+    Each step picks the candidate maximizing
+    lambda * sim(query, c) - (1 - lambda) * max(sim(c, already_selected)).
+    
+    Args:
+        query_embedding: The query embedding vector.
+        candidates: Results carrying their embeddings (include_embeddings=True).
+        k: Number of results to keep.
+        lambda_mult: Relevance/diversity trade-off in [0, 1].
+        
+    Returns:
+        The selected results in selection order.
+    """
+    if len(candidates) <= 1 or any(c.embedding is None for c in candidates):
+        return candidates[:k]
+    
+    vectors = normalize(np.asarray([c.embedding for c in candidates], dtype=np.float32))
+    query_vector = normalize(np.asarray(query_embedding, dtype=np.float32))
+    
+    relevance = vectors @ query_vector
+    pairwise = vectors @ vectors.T
+    
+    selected = [int(np.argmax(relevance))]
+    max_similarity = pairwise[selected[0]].copy()
+    
+    for _ in range(min(k, len(candidates)) - 1):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        scores[selected] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        max_similarity = np.maximum(max_similarity, pairwise[best])
+    
+    return [candidates[i] for i in selected]
+
+
+def _join_overlapping(first: str, second: str, overlap: int = CHUNK_OVERLAP) -> str:
+    """Joins two consecutive chunks, dropping the text they share."""
+    for size in range(min(overlap, len(first), len(second)), 0, -1):
+        if first.endswith(second[:size]):
+            return first + second[size:]
+    return f"{first}\n{second}"
+
+
+def merge_adjacent_chunks(results: list[RetrievalResult]) -> list[RetrievalResult]:
+    """
+    Merges hits with consecutive chunk_index from the same source and page.
+    
+    Consecutive chunks overlap by CHUNK_OVERLAP characters, so neighbors are
+    stitched into one span with the shared text removed. Spans keep the
+    rank of their best-ranked member and its score.
+    
+    Args:
+        results: Retrieval results in rank order.
+        
+    Returns:
+        Results with adjacent chunks merged, in rank order.
+    """
+    rank = {id(r): i for i, r in enumerate(results)}
+    groups: dict[tuple[str, int], list[RetrievalResult]] = {}
+    for r in results:
+        groups.setdefault((r.source, r.page_number), []).append(r)
+    
+    spans = []
+    for members in groups.values():
+        members.sort(key=lambda r: r.chunk_index)
+        run = [members[0]]
+        for r in members[1:]:
+            if r.chunk_index == run[-1].chunk_index + 1:
+                run.append(r)
+            else:
+                spans.append(run)
+                run = [r]
+        spans.append(run)
+    
+    merged = []
+    for run in spans:
+        best = min(run, key=lambda r: rank[id(r)])
+        content = run[0].content
+        for r in run[1:]:
+            content = _join_overlapping(content, r.content)
+        merged.append((rank[id(best)], replace(
+            run[0],
+            content=content,
+            score=min(r.score for r in run),
+            embedding=best.embedding,
+            clause_types=sorted({t for r in run for t in r.clause_types})
+        )))
+    
+    merged.sort(key=lambda item: item[0])
+    return [r for _, r in merged]
 
 
 def format_context(results: list[RetrievalResult]) -> str:
@@ -47,11 +294,72 @@ def format_context(results: list[RetrievalResult]) -> str:
         Formatted string with numbered chunks and citations.
     """
     if not results:
-        return "No relevant information found in the document."
+        return NO_CONTEXT
     
     context_parts = []
     for i, r in enumerate(results, 1):
         citation = r.to_citation()
         context_parts.append(f"[{i}] {citation}\n{r.content}")
     
-    return "\n\n---\n\n".join(context_parts)
+    return _SEPARATOR.join(context_parts)
+
+
+def _truncate_to_fit(content: str, header: str, budget: int) -> str | None:
+    """Longest prefix of content ending at a clause/sentence boundary that fits the budget."""
+    pieces = _BOUNDARY.split(content)
+    kept = ""
+    for piece in pieces:
+        candidate = f"{kept} {piece}".strip() if kept else piece
+        if count_tokens(f"{header}{candidate}") > budget:
+            break
+        kept = candidate
+    return kept or None
+
+
+def pack_context(results: list[RetrievalResult], token_budget: int) -> PackedContext:
+    """
+    Formats retrieval results like format_context, but within a token budget.
+    
+    Chunks are taken in relevance order. A chunk that does not fit is cut
+    back to the last clause/sentence boundary that does; if not even one
+    sentence fits it is dropped, and lower-ranked (shorter) chunks still get
+    a chance to fill the remaining budget.
+    
+    Args:
+        results: Retrieval results in rank order.
+        token_budget: Maximum tokens of the formatted context.
+        
+    Returns:
+        PackedContext with the text and token accounting.
+    """
+    if not results:
+        return PackedContext(NO_CONTEXT, count_tokens(NO_CONTEXT), [], 0, 0)
+    
+    separator_tokens = count_tokens(_SEPARATOR)
+    parts, included = [], []
+    used = truncated = dropped = 0
+    
+    for r in results:
+        header = f"[{len(parts) + 1}] {r.to_citation()}\n"
+        cost_extra = separator_tokens if parts else 0
+        remaining = token_budget - used - cost_extra
+        
+        part_tokens = count_tokens(f"{header}{r.content}")
+        if part_tokens <= remaining:
+            content = r.content
+        else:
+            content = _truncate_to_fit(r.content, header, remaining)
+            if content is None:
+                dropped += 1
+                continue
+            truncated += 1
+            part_tokens = count_tokens(f"{header}{content}")
+        
+        parts.append(f"{header}{content}")
+        included.append(r if content == r.content else replace(r, content=content))
+        used += cost_extra + part_tokens
+    
+    if not parts:
+        return PackedContext(NO_CONTEXT, count_tokens(NO_CONTEXT), [], 0, dropped)
+    
+    return PackedContext(_SEPARATOR.join(parts), used, included, truncated, dropped)
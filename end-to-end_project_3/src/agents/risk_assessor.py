@@ -2,8 +2,9 @@
 Risk Assessor Agent
 Identifies potential legal risks and red flags in contracts.
 """
+from typing import Callable
 from pydantic import BaseModel
-from src.llm import invoke_llm
+from src.llm import ainvoke_llm, invoke_llm_batch, stream_llm
 
 
 class RiskItem(BaseModel):
@@ -48,55 +49,165 @@ SUMMARY: [1-2 sentence overall assessment]
 """
 
 
-def assess_risks(context: str) -> RiskReport:
+def assess_risks(context: str, on_risk: Callable[[RiskItem], None] | None = None) -> RiskReport:
     """
     Analyzes document context for legal risks.
     
+    The response is streamed through a RiskStreamParser, so each risk is
+    available as soon as its block is complete rather than when the whole
+    report has been generated.
+    
     Args:
         context: The document context from retrieval.
+        on_risk: Called with each RiskItem as soon as it is parsed.
         
     Returns:
         RiskReport with identified risks and recommendations.
     """
     prompt = RISK_PROMPT.format(context=context)
-    response = invoke_llm(prompt)
+    parser = RiskStreamParser()
+    for token in stream_llm(prompt):
+        for risk in parser.feed(token):
+            if on_risk:
+                on_risk(risk)
+    return parser.close(on_risk)
+
+
+async def aassess_risks(context: str, on_risk: Callable[[RiskItem], None] | None = None) -> RiskReport:
+    """
+    Async variant of assess_risks.
     
-    # Parse risks from response
-    risks = []
-    current_risk = {}
-    overall_risk = "MEDIUM"
-    summary = "Risk assessment completed."
+    The response is awaited whole, so on_risk receives every item once the
+    report is complete.
+    """
+    prompt = RISK_PROMPT.format(context=context)
+    parser = RiskStreamParser()
+    for risk in parser.feed(await ainvoke_llm(prompt)):
+        if on_risk:
+            on_risk(risk)
+    return parser.close(on_risk)
+
+
+def assess_risks_batch(contexts: list[str]) -> list[RiskReport | Exception]:
+    """
+    Assesses several documents' contexts with concurrent LLM calls.
     
-    lines = response.strip().split("\n")
+    Args:
+        contexts: One context per contract.
+        
+    Returns:
+        One RiskReport per context, in order; a failed call holds its exception.
+    """
+    responses = invoke_llm_batch([RISK_PROMPT.format(context=c) for c in contexts])
+    return [r if isinstance(r, Exception) else parse_risk_response(r) for r in responses]
+
+
+class RiskStreamParser:
+    """
+    Incremental parser for the RISK_PROMPT output format.
     
-    for line in lines:
-        line = line.strip()
-        if line.startswith("RISK:"):
-            if current_risk.get("risk_title"):
-                risks.append(RiskItem(**current_risk))
-            current_risk = {"risk_title": line.split(":", 1)[1].strip()}
-        elif line.startswith("SEVERITY:"):
-            current_risk["severity"] = line.split(":", 1)[1].strip().upper()
-        elif line.startswith("DESCRIPTION:"):
-            current_risk["description"] = line.split(":", 1)[1].strip()
-        elif line.startswith("RECOMMENDATION:"):
-            current_risk["recommendation"] = line.split(":", 1)[1].strip()
-        elif line.startswith("OVERALL_RISK:"):
-            overall_risk = line.split(":", 1)[1].strip().upper()
-        elif line.startswith("SUMMARY:"):
-            summary = line.split(":", 1)[1].strip()
+    Feed it response text in chunks of any size; each RiskItem is returned
+    as soon as its block closes, i.e. when the next RISK: line starts, and
+    the last one on close(). Fields may come in any order within a block.
+    """
     
-    # Don't forget the last risk
-    if current_risk.get("risk_title"):
-        risks.append(RiskItem(
-            risk_title=current_risk.get("risk_title", "Unknown"),
-            severity=current_risk.get("severity", "MEDIUM"),
-            description=current_risk.get("description", ""),
-            recommendation=current_risk.get("recommendation", "")
-        ))
+    _FIELDS = {
+        "RISK": "risk_title",
+        "SEVERITY": "severity",
+        "DESCRIPTION": "description",
+        "RECOMMENDATION": "recommendation",
+    }
     
-    return RiskReport(
-        overall_risk_level=overall_risk,
-        risks=risks,
-        summary=summary
-    )
+    def __init__(self):
+        self.risks: list[RiskItem] = []
+        self.overall_risk = "MEDIUM"
+        self.summary = "Risk assessment completed."
+        self._current: dict = {}
+        self._buffer = ""
+    
+    def feed(self, text: str) -> list[RiskItem]:
+        """
+        Consumes the next chunk of the response.
+        
+        Args:
+            text: Response text as it arrives from the LLM.
+            
+        Returns:
+            Risks whose blocks were completed by this chunk.
+        """
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        completed = []
+        for line in lines:
+            risk = self._parse_line(line)
+            if risk is not None:
+                completed.append(risk)
+        return completed
+    
+    def close(self, on_risk: Callable[[RiskItem], None] | None = None) -> RiskReport:
+        """
+        Flushes the last line and returns the full report.
+        
+        Args:
+            on_risk: Called with the final risk if closing completes one.
+            
+        Returns:
+            RiskReport with every parsed risk.
+        """
+        last = [self._parse_line(self._buffer), self._flush()]
+        self._buffer = ""
+        for risk in last:
+            if risk is not None and on_risk:
+                on_risk(risk)
+        return RiskReport(overall_risk_level=self.overall_risk, risks=self.risks, summary=self.summary)
+    
+    def _parse_line(self, line: str) -> RiskItem | None:
+        key, colon, value = line.strip().partition(":")
+        if not colon:
+            return None
+        key, value = key.strip().upper(), value.strip()
+        
+        if key == "RISK":
+            completed = self._flush()
+            self._current = {"risk_title": value}
+            return completed
+        if key in self._FIELDS:
+            if self._current:
+                self._current[self._FIELDS[key]] = value.upper() if key == "SEVERITY" else value
+            return None
+        if key == "OVERALL_RISK":
+            self.overall_risk = value.upper()
+            return None
+        if key == "SUMMARY":
+            self.summary = value
+        return None
+    
+    def _flush(self) -> RiskItem | None:
+        """Closes the current block, if any, and records its RiskItem."""
+        if not self._current.get("risk_title"):
+            self._current = {}
+            return None
+        risk = RiskItem(
+            risk_title=self._current["risk_title"],
+            severity=self._current.get("severity", "MEDIUM"),
+            description=self._current.get("description", ""),
+            recommendation=self._current.get("recommendation", "")
+        )
+        self.risks.append(risk)
+        self._current = {}
+        return risk
+
+
+def parse_risk_response(response: str) -> RiskReport:
+    """
+    Parses the RISK_PROMPT output format into a RiskReport.
+    
+    Args:
+        response: The raw LLM response.
+        
+    Returns:
+        RiskReport with identified risks and recommendations.
+    """
+    parser = RiskStreamParser()
+    parser.feed(response)
+    return parser.close()
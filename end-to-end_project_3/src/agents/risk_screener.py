@@ -0,0 +1,228 @@
+"""
+Risk Pre-Screener
+Scans every chunk of a document with one combined regex for the risk
+families the risk assessor looks for, so only flagged chunks reach the LLM.
+"""
+import asyncio
+import re
+from typing import Callable
+from src.storage import get_artifact_store
+from src.vectorstore import ChromaStore, RetrievalResult
+from .retriever import load_document_chunks, pack_context
+from .risk_assessor import RiskItem, RiskReport, assess_risks, aassess_risks
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import CONTEXT_TOKEN_BUDGETS
+
+
+# Risk family -> cue patterns, mirroring the list in RISK_PROMPT. Families are
+# listed in priority order: chunks hitting earlier families are packed first.
+RISK_PATTERNS = {
+    "unlimited_liability": [
+        r"unlimited liability",
+        r"liab\w* (?:shall|will) not be (?:limited|capped)",
+        r"without limitation of liability",
+        r"liable for (?:any and )?all (?:losses|damages)",
+    ],
+    "auto_renewal": [
+        r"automatic(?:ally)? renew\w*",
+        r"auto-?renew\w*",
+        r"renew\w* for (?:successive|additional) (?:\w+[- ])?(?:terms?|periods?|years?)",
+        r"evergreen",
+    ],
+    "termination_rights": [
+        r"may not terminate",
+        r"non-?cancell?able",
+        r"terminat\w* (?:for|without) (?:convenience|cause)",
+        r"early termination (?:fee|charge|penalt\w*)",
+        r"\d+\W{0,3}(?:\(\d+\)\s*)?days?(?:'|’)? (?:prior )?(?:written )?notice",
+    ],
+    "payment_terms": [
+        r"late (?:payment|fee|charge)s?",
+        r"interest (?:at|of) \d+(?:\.\d+)?\s*%",
+        r"non-?refundable",
+        r"(?:payable|due) (?:with)?in \d+ days",
+        r"price (?:increase|adjustment)s?",
+    ],
+    "indemnification": [
+        r"indemnif\w*",
+        r"hold (?:\w+ )?harmless",
+        r"defend(?:,| and) indemnify",
+    ],
+    "dispute_resolution": [
+        r"binding arbitration",
+        r"exclusive (?:jurisdiction|venue)",
+        r"waive\w* (?:any )?(?:right to )?(?:a )?jury trial",
+        r"class action waiver",
+        r"governed by the laws? of",
+    ],
+}
+
+# One alternation with a named group per family: a single left-to-right pass per chunk
+_MATCHER = re.compile(
+    "|".join(f"(?P<{family}>{'|'.join(patterns)})" for family, patterns in RISK_PATTERNS.items()),
+    re.IGNORECASE
+)
+_PRIORITY = {family: i for i, family in enumerate(RISK_PATTERNS)}
+
+
+def screen_chunks(chunks: list[RetrievalResult]) -> list[dict]:
+    """
+    Flags chunks that match any risk family.
+    
+    Args:
+        chunks: Document chunks in reading order.
+        
+    Returns:
+        One dict per flagged chunk (chunk_index, page_number, families,
+        matches, content), in reading order.
+    """
+    flagged = []
+    for chunk in chunks:
+        hits = {}
+        for match in _MATCHER.finditer(chunk.content):
+            hits.setdefault(match.lastgroup, []).append(match.group(0))
+        if hits:
+            flagged.append({
+                "chunk_index": chunk.chunk_index,
+                "page_number": chunk.page_number,
+                "families": sorted(hits, key=_PRIORITY.get),
+                "matches": hits,
+                "content": chunk.content,
+            })
+    return flagged
+
+
+def screen_document(source: str, store: ChromaStore | None = None) -> list[dict]:
+    """
+    Pre-screens a whole document, cached per document version.
+    
+    Args:
+        source: The document's source name (e.g., "contract.pdf").
+        store: ChromaStore instance. Creates new if not provided.
+        
+    Returns:
+        Flagged chunks as returned by screen_chunks.
+    """
+    return _screen_document(source, store)[1]
+
+
+def _screen_document(source: str, store: ChromaStore | None = None) -> tuple[str, list[dict]]:
+    """screen_document, also returning the hash of the document version screened."""
+    artifacts = get_artifact_store()
+    doc_hash = artifacts.document_hash(source)
+    if doc_hash is not None:
+        cached = artifacts.get(doc_hash, "risk_screen")
+        if cached is not None:
+            return doc_hash, cached
+    
+    doc_hash, chunks = load_document_chunks(source, store)
+    flagged = screen_chunks(chunks)
+    artifacts.put(doc_hash, "risk_screen", flagged)
+    return doc_hash, flagged
+
+
+def screened_context(source: str, flagged: list[dict]) -> tuple[str, list[str]]:
+    """
+    Packs flagged chunks into the risk analysis budget, highest-priority families first.
+    
+    Returns:
+        (context text, citations of the packed chunks)
+    """
+    ordered = sorted(flagged, key=lambda f: (min(_PRIORITY[x] for x in f["families"]), f["chunk_index"]))
+    results = [
+        RetrievalResult(
+            content=f["content"],
+            score=0.0,
+            page_number=f["page_number"],
+            source=source,
+            chunk_index=f["chunk_index"]
+        )
+        for f in ordered
+    ]
+    packed = pack_context(results, CONTEXT_TOKEN_BUDGETS["RISK_ANALYSIS"])
+    return packed.text, [r.to_citation() for r in packed.results]
+
+
+def _clean_report() -> RiskReport:
+    return RiskReport(
+        overall_risk_level="LOW",
+        risks=[],
+        summary="The pre-screen found none of the common risk patterns anywhere in the document."
+    )
+
+
+def cached_document_risks(source: str) -> RiskReport | None:
+    """Returns the stored risk report of a document's current version, if any."""
+    artifacts = get_artifact_store()
+    doc_hash = artifacts.document_hash(source)
+    cached = artifacts.get(doc_hash, "risk_report") if doc_hash else None
+    return RiskReport(**cached) if cached is not None else None
+
+
+def _replay(report: RiskReport, on_risk: Callable[[RiskItem], None] | None) -> RiskReport:
+    """Passes every risk of a ready report to on_risk."""
+    if on_risk:
+        for risk in report.risks:
+            on_risk(risk)
+    return report
+
+
+def _store_report(doc_hash: str, report: RiskReport) -> RiskReport:
+    """
+    Stores a report under the document version it was built from.
+    
+    Not the source's current hash: a re-ingest during the LLM call would
+    otherwise file the old version's report as current.
+    """
+    get_artifact_store().put(doc_hash, "risk_report", report.model_dump())
+    return report
+
+
+def assess_document_risks(
+    source: str,
+    store: ChromaStore | None = None,
+    on_risk: Callable[[RiskItem], None] | None = None
+) -> RiskReport:
+    """
+    Assesses risks across a whole document, serving the stored report when cached.
+    
+    On a miss every chunk is pre-screened; only flagged chunks are sent to
+    the risk assessor, a document with no flags costs no LLM call at all,
+    and the report is stored under the document's content hash.
+    
+    Args:
+        source: The document's source name (e.g., "contract.pdf").
+        store: ChromaStore instance. Creates new if not provided.
+        on_risk: Called with each RiskItem as soon as it is parsed (all at
+            once when cached).
+            
+    Returns:
+        RiskReport for the document.
+    """
+    cached = cached_document_risks(source)
+    if cached is not None:
+        return _replay(cached, on_risk)
+    
+    doc_hash, flagged = _screen_document(source, store)
+    if not flagged:
+        return _store_report(doc_hash, _clean_report())
+    context, _ = screened_context(source, flagged)
+    return _store_report(doc_hash, assess_risks(context, on_risk))
+
+
+async def aassess_document_risks(
+    source: str,
+    store: ChromaStore | None = None,
+    on_risk: Callable[[RiskItem], None] | None = None
+) -> RiskReport:
+    """Async variant of assess_document_risks."""
+    cached = await asyncio.to_thread(cached_document_risks, source)
+    if cached is not None:
+        return _replay(cached, on_risk)
+    
+    doc_hash, flagged = await asyncio.to_thread(_screen_document, source, store)
+    if not flagged:
+        return _store_report(doc_hash, _clean_report())
+    context, _ = screened_context(source, flagged)
+    return _store_report(doc_hash, await aassess_risks(context, on_risk))
@@ -2,7 +2,17 @@
 Router Agent
 Classifies user queries to route them to the appropriate specialist agent.
 """
-from src.llm import invoke_llm
+import asyncio
+import contextvars
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.llm import invoke_llm, ainvoke_llm, invoke_llm_batch, agent_label
+from src.vectorstore import embed_query
+from .fast_router import FastRoute, fast_route, router_stats
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import FAST_ROUTER_ENABLED, FAST_ROUTER_SHADOW_RATE
 
 
 ROUTER_PROMPT = """You are a query classifier for a legal document analysis system.
@@ -18,18 +28,161 @@ User Query: {query}
 Respond with ONLY the category name, nothing else."""
 
 
-def route_query(query: str) -> str:
+def llm_route_query(query: str) -> str:
+    """Classifies a query with the LLM router prompt."""
+    prompt = ROUTER_PROMPT.format(query=query)
+    return parse_route(invoke_llm(prompt))
+
+
+async def allm_route_query(query: str) -> str:
+    """Async variant of llm_route_query."""
+    prompt = ROUTER_PROMPT.format(query=query)
+    return parse_route(await ainvoke_llm(prompt))
+
+
+# Shadow LLM calls run off the request path; beyond this many pending, samples are dropped
+_MAX_PENDING_SHADOWS = 8
+
+# Lazy-started worker for shadow calls
+_shadow_executor: ThreadPoolExecutor | None = None
+_shadow_lock = threading.Lock()
+_pending_shadows = 0
+
+
+def _shadowed() -> bool:
+    """Samples fast-path decisions that are also sent to the LLM to measure agreement."""
+    return FAST_ROUTER_SHADOW_RATE > 0 and random.random() < FAST_ROUTER_SHADOW_RATE
+
+
+def _run_shadow(query: str, decision: FastRoute) -> None:
+    global _pending_shadows
+    try:
+        with agent_label("router_shadow"):
+            llm_route = llm_route_query(query)
+    except Exception:
+        llm_route = None  # Agreement is simply not measured for this sample
+    finally:
+        with _shadow_lock:
+            _pending_shadows -= 1
+    router_stats.record(decision, llm_route)
+
+
+def _record_fast_path(query: str, decision: FastRoute) -> None:
+    """
+    Records a confident fast-path decision.
+    
+    A shadow-sampled decision is also sent to the LLM router on a background
+    thread; the agreement is recorded when that call returns, so the query
+    itself never waits for it. The call runs in a copy of the caller's
+    context, so it goes to the same client (use_llm) as the query.
+    """
+    global _shadow_executor, _pending_shadows
+    if _shadowed():
+        with _shadow_lock:
+            if _pending_shadows < _MAX_PENDING_SHADOWS:
+                if _shadow_executor is None:
+                    _shadow_executor = ThreadPoolExecutor(1, thread_name_prefix="router-shadow")
+                _pending_shadows += 1
+                _shadow_executor.submit(contextvars.copy_context().run, _run_shadow, query, decision)
+                return
+    router_stats.record(decision)
+
+
+def route_query(
+    query: str,
+    use_fast_path: bool = FAST_ROUTER_ENABLED,
+    query_embedding: list[float] | None = None
+) -> str:
     """
     Routes a user query to the appropriate agent.
     
+    The local fast router (keyword rules, then embedding prototypes) answers
+    when it is confident; otherwise the LLM router decides. The query
+    embedding is shared with retrieval, so the fast path costs no extra
+    model call.
+    
     Args:
         query: The user's natural language query.
+        use_fast_path: Try the local router before the LLM.
+        query_embedding: Precomputed query embedding; embeds the query if omitted.
         
     Returns:
         One of: CLAUSE_SEARCH, RISK_ANALYSIS, SUMMARIZE, GENERAL_QA
     """
-    prompt = ROUTER_PROMPT.format(query=query)
-    response = invoke_llm(prompt).strip().upper()
+    if not use_fast_path:
+        return llm_route_query(query)
+    
+    decision = fast_route(query, query_embedding if query_embedding is not None else embed_query(query))
+    if decision.confident:
+        _record_fast_path(query, decision)
+        return decision.route
+    
+    llm_route = llm_route_query(query)
+    router_stats.record(decision, llm_route)
+    return llm_route
+
+
+async def aroute_query(
+    query: str,
+    use_fast_path: bool = FAST_ROUTER_ENABLED,
+    query_embedding: list[float] | None = None
+) -> str:
+    """Async variant of route_query."""
+    if not use_fast_path:
+        return await allm_route_query(query)
+    
+    if query_embedding is None:
+        query_embedding = await asyncio.to_thread(embed_query, query)
+    decision = fast_route(query, query_embedding)
+    if decision.confident:
+        _record_fast_path(query, decision)
+        return decision.route
+    
+    llm_route = await allm_route_query(query)
+    router_stats.record(decision, llm_route)
+    return llm_route
+
+
+def route_queries(queries: list[str], use_fast_path: bool = FAST_ROUTER_ENABLED) -> list[str]:
+    """
+    Routes several queries; only unconfident ones go to the LLM, in one batch.
+    
+    Args:
+        queries: The user queries.
+        use_fast_path: Try the local router before the LLM.
+        
+    Returns:
+        One route per query, in order. A query whose call failed falls back
+        to GENERAL_QA like an unparseable response.
+    """
+    decisions = [fast_route(q, embed_query(q)) if use_fast_path else None for q in queries]
+    pending = [i for i, d in enumerate(decisions) if d is None or not d.confident]
+    
+    responses = invoke_llm_batch([ROUTER_PROMPT.format(query=queries[i]) for i in pending])
+    llm_routes = {
+        i: "GENERAL_QA" if isinstance(r, Exception) else parse_route(r)
+        for i, r in zip(pending, responses)
+    }
+    
+    routes = []
+    for i, decision in enumerate(decisions):
+        if decision is not None:
+            router_stats.record(decision, llm_routes.get(i))
+        routes.append(llm_routes[i] if i in llm_routes else decision.route)
+    return routes
+
+
+def parse_route(response: str) -> str:
+    """
+    Maps a raw router response onto a valid route.
+    
+    Args:
+        response: The LLM's classification output.
+        
+    Returns:
+        One of: CLAUSE_SEARCH, RISK_ANALYSIS, SUMMARIZE, GENERAL_QA
+    """
+    response = response.strip().upper()
     
     valid_routes = {"CLAUSE_SEARCH", "RISK_ANALYSIS", "SUMMARIZE", "GENERAL_QA"}
     
@@ -1,8 +1,19 @@
 """
 Summarizer Agent
 Generates executive summaries of legal documents.
+
+Whole-document summaries are built map-reduce style (sections summarized in
+parallel, then merged) and cached per document version in the artifact store.
 """
-from src.llm import invoke_llm
+import asyncio
+from typing import Iterator
+from src.llm import invoke_llm, ainvoke_llm, invoke_llm_batch, ainvoke_llm_batch, stream_llm, count_tokens
+from src.storage import get_artifact_store, content_hash
+from src.vectorstore import ChromaStore, RetrievalResult
+from .retriever import load_document_chunks
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import SUMMARY_SECTION_TOKENS, SUMMARY_REDUCE_TOKENS
 
 
 SUMMARIZE_PROMPT = """You are an executive summary specialist for legal documents.
@@ -33,3 +44,217 @@ def summarize_document(context: str) -> str:
     prompt = SUMMARIZE_PROMPT.format(context=context)
     response = invoke_llm(prompt)
     return response.strip()
+
+
+async def asummarize_document(context: str) -> str:
+    """Async variant of summarize_document."""
+    prompt = SUMMARIZE_PROMPT.format(context=context)
+    response = await ainvoke_llm(prompt)
+    return response.strip()
+
+
+def summarize_documents(contexts: list[str]) -> list[str | Exception]:
+    """
+    Summarizes several contexts with concurrent LLM calls.
+    
+    Args:
+        contexts: One context per document.
+        
+    Returns:
+        One summary per context, in order; a failed call holds its exception.
+    """
+    responses = invoke_llm_batch([SUMMARIZE_PROMPT.format(context=c) for c in contexts])
+    return [r if isinstance(r, Exception) else r.strip() for r in responses]
+
+
+def stream_summary(context: str) -> Iterator[str]:
+    """
+    Streams the executive summary token by token.
+    
+    Args:
+        context: The document context (can be full or retrieved chunks).
+        
+    Yields:
+        Text chunks of the summary as the LLM generates them.
+    """
+    prompt = SUMMARIZE_PROMPT.format(context=context)
+    yield from stream_llm(prompt)
+
+
+# === Whole-Document (Map-Reduce) Summaries ===
+
+SECTION_PROMPT = """You are summarizing one section of a longer legal document.
+
+Document Section:
+{context}
+
+List the 3-5 most important points of this section as short bullet points: parties, obligations, deadlines, amounts, and any unusual or one-sided terms. Be specific about numbers and dates."""
+
+
+def _group(texts: list[str], max_tokens: int) -> list[list[str]]:
+    """Packs consecutive texts into groups of at most max_tokens (at least one text each)."""
+    groups, current, used = [], [], 0
+    for text in texts:
+        tokens = count_tokens(text)
+        if current and used + tokens > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(text)
+        used += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _sections(chunks: list[RetrievalResult]) -> list[str]:
+    """Splits a document's chunks into page-labelled sections for the map step."""
+    labelled = [f"[Page {c.page_number}] {c.content}" for c in chunks]
+    return ["\n".join(group) for group in _group(labelled, SUMMARY_SECTION_TOKENS)]
+
+
+def _load(source: str, store: ChromaStore | None) -> tuple[str, list[str]]:
+    """Reads a document's current version and splits it into sections."""
+    doc_hash, chunks = load_document_chunks(source, store)
+    return doc_hash, _sections(chunks)
+
+
+def _raise_failures(results: list) -> list[str]:
+    for r in results:
+        if isinstance(r, Exception):
+            raise r
+    return results
+
+
+def _map(doc_hash: str, sections: list[str]) -> list[str]:
+    """
+    Summarizes sections in parallel.
+    
+    Section summaries are stored under the document version and the section
+    content, so a retry after a failed section only re-summarizes what is
+    missing; successful sections are stored even when another section fails.
+    """
+    artifacts = get_artifact_store()
+    keys = [content_hash([s]) for s in sections]
+    summaries = [artifacts.get(doc_hash, "section_summary", k) for k in keys]
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    
+    responses = invoke_llm_batch([SECTION_PROMPT.format(context=sections[i]) for i in missing])
+    for i, response in zip(missing, responses):
+        if not isinstance(response, Exception):
+            response = response.strip()
+            artifacts.put(doc_hash, "section_summary", response, keys[i])
+        summaries[i] = response
+    return _raise_failures(summaries)
+
+
+async def _amap(doc_hash: str, sections: list[str]) -> list[str]:
+    """Async variant of _map."""
+    artifacts = get_artifact_store()
+    keys = [content_hash([s]) for s in sections]
+    summaries = [artifacts.get(doc_hash, "section_summary", k) for k in keys]
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    
+    responses = await ainvoke_llm_batch([SECTION_PROMPT.format(context=sections[i]) for i in missing])
+    for i, response in zip(missing, responses):
+        if not isinstance(response, Exception):
+            response = response.strip()
+            artifacts.put(doc_hash, "section_summary", response, keys[i])
+        summaries[i] = response
+    return _raise_failures(summaries)
+
+
+def _join(summaries: list[str]) -> str:
+    return "\n\n".join(f"Section {i}:\n{s}" for i, s in enumerate(summaries, 1))
+
+
+def _reduce_input(doc_hash: str, summaries: list[str]) -> str:
+    """Condenses section summaries level by level until they fit one reduce prompt."""
+    while count_tokens(_join(summaries)) > SUMMARY_REDUCE_TOKENS:
+        groups = _group(summaries, SUMMARY_REDUCE_TOKENS)
+        if len(groups) == len(summaries):
+            break  # Nothing left to merge; the final prompt will be over budget
+        summaries = _map(doc_hash, ["\n".join(g) for g in groups])
+    return _join(summaries)
+
+
+async def _areduce_input(doc_hash: str, summaries: list[str]) -> str:
+    """Async variant of _reduce_input."""
+    while count_tokens(_join(summaries)) > SUMMARY_REDUCE_TOKENS:
+        groups = _group(summaries, SUMMARY_REDUCE_TOKENS)
+        if len(groups) == len(summaries):
+            break
+        summaries = await _amap(doc_hash, ["\n".join(g) for g in groups])
+    return _join(summaries)
+
+
+def cached_document_summary(source: str) -> str | None:
+    """Returns the stored summary of a document's current version, if any."""
+    artifacts = get_artifact_store()
+    doc_hash = artifacts.document_hash(source)
+    return artifacts.get(doc_hash, "summary") if doc_hash else None
+
+
+def stream_document_summary(source: str, store: ChromaStore | None = None) -> Iterator[str]:
+    """
+    Streams a whole-document summary, serving it from the artifact store when cached.
+    
+    On a miss, every section is summarized in parallel (map), the section
+    summaries are merged by the executive summary prompt (reduce, streamed),
+    and the result is stored under the document's content hash.
+    
+    Args:
+        source: The document's source name (e.g., "contract.pdf").
+        store: ChromaStore instance. Creates new if not provided.
+        
+    Yields:
+        Text chunks of the summary (the whole summary at once when cached).
+    """
+    cached = cached_document_summary(source)
+    if cached is not None:
+        yield cached
+        return
+    
+    doc_hash, sections = _load(source, store)
+    cached = get_artifact_store().get(doc_hash, "summary")
+    if cached is not None:
+        yield cached
+        return
+    
+    parts = []
+    for token in stream_llm(SUMMARIZE_PROMPT.format(context=_reduce_input(doc_hash, _map(doc_hash, sections)))):
+        parts.append(token)
+        yield token
+    get_artifact_store().put(doc_hash, "summary", "".join(parts).strip())
+
+
+def document_summary(source: str, store: ChromaStore | None = None) -> str:
+    """
+    Returns the whole-document summary, computing and caching it if needed.
+    
+    Called at ingest time so later SUMMARIZE queries are served from the cache.
+    
+    Args:
+        source: The document's source name (e.g., "contract.pdf").
+        store: ChromaStore instance. Creates new if not provided.
+        
+    Returns:
+        A 3-paragraph executive summary of the whole document.
+    """
+    return "".join(stream_document_summary(source, store)).strip()
+
+
+async def adocument_summary(source: str, store: ChromaStore | None = None) -> str:
+    """Async variant of document_summary."""
+    cached = cached_document_summary(source)
+    if cached is not None:
+        return cached
+    
+    doc_hash, sections = await asyncio.to_thread(_load, source, store)
+    cached = get_artifact_store().get(doc_hash, "summary")
+    if cached is not None:
+        return cached
+    
+    context = await _areduce_input(doc_hash, await _amap(doc_hash, sections))
+    summary = (await ainvoke_llm(SUMMARIZE_PROMPT.format(context=context))).strip()
+    get_artifact_store().put(doc_hash, "summary", summary)
+    return summary
@@ -1,4 +1,14 @@
 from .document_loader import load_document, DocumentPage
 from .chunker import chunk_text, chunk_documents, TextChunk
+from .clause_tagger import tag_chunks, detect_clause_type, CLAUSE_TYPES
 
-__all__ = ["load_document", "DocumentPage", "chunk_text", "chunk_documents", "TextChunk"]
+__all__ = [
+    "load_document",
+    "DocumentPage",
+    "chunk_text",
+    "chunk_documents",
+    "TextChunk",
+    "tag_chunks",
+    "detect_clause_type",
+    "CLAUSE_TYPES"
+]
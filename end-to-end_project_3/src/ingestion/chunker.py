@@ -2,7 +2,7 @@
 Text Chunking Module
 Splits documents into semantically meaningful chunks for embedding.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import sys
 sys.path.append(str(__file__).rsplit("src", 1)[0])
 from config import CHUNK_SIZE, CHUNK_OVERLAP
@@ -15,14 +15,19 @@ class TextChunk:
     chunk_index: int
     page_number: int
     source: str
+    clause_types: list[str] = field(default_factory=list)  # Set by the clause tagger
     
     def to_metadata(self) -> dict:
         """Returns metadata dict for vector store."""
-        return {
+        metadata = {
             "chunk_index": self.chunk_index,
             "page_number": self.page_number,
             "source": self.source
         }
+        # One boolean flag per tag, so queries can filter with {"clause_<type>": True}
+        for clause_type in self.clause_types:
+            metadata[f"clause_{clause_type}"] = True
+        return metadata
 
 
 def chunk_text(
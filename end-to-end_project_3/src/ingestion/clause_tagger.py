@@ -0,0 +1,140 @@
+"""
+Clause Tagging Module
+Labels chunks with the clause types they contain, using the chunk embeddings
+computed at ingest plus lexical cues.
+"""
+from functools import lru_cache
+import re
+import numpy as np
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import CLAUSE_TAG_THRESHOLD, CLAUSE_TAG_LEXICAL_BOOST
+
+
+# Clause type -> (prototype sentences, lexical cue pattern)
+CLAUSE_TYPES = {
+    "termination": (
+        ["Either party may terminate this agreement upon written notice.",
+         "This agreement terminates immediately upon a material breach that is not cured."],
+        re.compile(r"\bterminat\w*|\bcancel\w*|\bnotice of non-renewal", re.I),
+    ),
+    "liability": (
+        ["In no event shall either party's aggregate liability exceed the fees paid.",
+         "Neither party shall be liable for indirect, incidental or consequential damages."],
+        re.compile(r"\bliab\w*|\bconsequential damages|\blimitation of damages", re.I),
+    ),
+    "payment": (
+        ["The client shall pay all invoices within thirty days of receipt.",
+         "Fees are payable monthly in advance; late payments accrue interest."],
+        re.compile(r"\bpay(?:ment|able|s)?\b|\binvoic\w*|\bfees?\b|\blate charge", re.I),
+    ),
+    "confidentiality": (
+        ["Each party shall keep the other party's confidential information secret.",
+         "The receiving party shall not disclose proprietary information to third parties."],
+        re.compile(r"\bconfidential\w*|\bnon-disclosure|\bproprietary information", re.I),
+    ),
+    "indemnification": (
+        ["The supplier shall indemnify and hold harmless the customer against third-party claims.",
+         "Each party agrees to defend the other against losses arising from its negligence."],
+        re.compile(r"\bindemnif\w*|\bhold harmless", re.I),
+    ),
+    "renewal": (
+        ["This agreement automatically renews for successive one-year terms.",
+         "The initial term shall be extended unless either party gives notice."],
+        re.compile(r"\brenew\w*|\bsuccessive (?:terms?|periods?)|\bevergreen", re.I),
+    ),
+    "governing_law": (
+        ["This agreement shall be governed by the laws of the State of New York.",
+         "Disputes shall be resolved by binding arbitration in the courts of the chosen venue."],
+        re.compile(r"\bgoverning law|\bgoverned by|\bjurisdiction|\barbitrat\w*|\bvenue", re.I),
+    ),
+    "intellectual_property": (
+        ["All intellectual property created under this agreement belongs to the client.",
+         "The licensor grants a non-exclusive license to use the software."],
+        re.compile(r"\bintellectual property|\bcopyright\w*|\bpatent\w*|\btrademark\w*|\blicen[cs]e", re.I),
+    ),
+    "force_majeure": (
+        ["Neither party is liable for delays caused by events beyond its reasonable control.",
+         "Performance is excused during acts of God, war, or natural disasters."],
+        re.compile(r"\bforce majeure|\bacts? of god|\bbeyond (?:its|their) reasonable control", re.I),
+    ),
+}
+
+
+@lru_cache(maxsize=1)
+def _prototype_matrix() -> tuple[np.ndarray, np.ndarray]:
+    """
+    Embeds the clause prototypes once.
+    
+    Returns:
+        (normalized prototype matrix, clause-type index of each row)
+    """
+    from src.vectorstore import embed_texts
+    
+    names = list(CLAUSE_TYPES)
+    texts, owners = [], []
+    for i, name in enumerate(names):
+        for text in CLAUSE_TYPES[name][0]:
+            texts.append(text)
+            owners.append(i)
+    matrix = np.asarray(embed_texts(texts), dtype=np.float32)
+    matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    return matrix, np.asarray(owners)
+
+
+def clause_scores(texts: list[str], embeddings: list[list[float]]) -> np.ndarray:
+    """
+    Scores every chunk against every clause type in one matrix product.
+    
+    Args:
+        texts: Chunk texts (for the lexical cues).
+        embeddings: The chunk embeddings already computed for the vector store.
+        
+    Returns:
+        Array of shape (len(texts), len(CLAUSE_TYPES)): best prototype cosine
+        similarity per type, plus CLAUSE_TAG_LEXICAL_BOOST where a cue matches.
+    """
+    prototypes, owners = _prototype_matrix()
+    vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(texts), -1)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    
+    similarities = vectors @ prototypes.T  # (chunks, prototypes)
+    scores = np.full((len(texts), len(CLAUSE_TYPES)), -1.0, dtype=np.float32)
+    for type_index in range(len(CLAUSE_TYPES)):
+        scores[:, type_index] = similarities[:, owners == type_index].max(axis=1)
+    
+    lexical = np.array(
+        [[bool(pattern.search(text)) for _, pattern in CLAUSE_TYPES.values()] for text in texts],
+        dtype=np.float32
+    ).reshape(len(texts), len(CLAUSE_TYPES))
+    return scores + CLAUSE_TAG_LEXICAL_BOOST * lexical
+
+
+def tag_chunks(chunks: list, embeddings: list[list[float]], threshold: float = CLAUSE_TAG_THRESHOLD) -> list:
+    """
+    Sets `clause_types` on each chunk in place.
+    
+    Args:
+        chunks: TextChunk objects to tag.
+        embeddings: Their embeddings, in the same order.
+        threshold: Minimum score for a tag.
+        
+    Returns:
+        The same chunks, for chaining.
+    """
+    if not chunks:
+        return chunks
+    
+    names = list(CLAUSE_TYPES)
+    scores = clause_scores([c.content for c in chunks], embeddings)
+    for chunk, row in zip(chunks, scores >= threshold):
+        chunk.clause_types = [names[i] for i in np.flatnonzero(row)]
+    return chunks
+
+
+def detect_clause_type(query: str) -> str | None:
+    """Returns the clause type a query asks about, from the lexical cues, if any."""
+    for name, (_, pattern) in CLAUSE_TYPES.items():
+        if pattern.search(query):
+            return name
+    return None
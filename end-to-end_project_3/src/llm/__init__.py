@@ -1,3 +1,37 @@
-from .client import get_llm, invoke_llm
+from .client import (
+    get_llm,
+    use_llm,
+    invoke_llm,
+    ainvoke_llm,
+    invoke_llm_batch,
+    ainvoke_llm_batch,
+    stream_llm,
+    clear_llm_cache,
+    get_response_cache
+)
+from .cache import ResponseCache
+from .fake import FakeLegalChatModel
+from .metrics import get_llm_metrics, LLMMetrics, agent_label
+from .rate_limit import get_rate_limiter, ProviderLimiter, TokenBucket
+from .tokenizer import count_tokens
 
-__all__ = ["get_llm", "invoke_llm"]
+__all__ = [
+    "get_llm",
+    "use_llm",
+    "invoke_llm",
+    "ainvoke_llm",
+    "invoke_llm_batch",
+    "ainvoke_llm_batch",
+    "stream_llm",
+    "clear_llm_cache",
+    "get_response_cache",
+    "ResponseCache",
+    "FakeLegalChatModel",
+    "get_llm_metrics",
+    "LLMMetrics",
+    "agent_label",
+    "get_rate_limiter",
+    "ProviderLimiter",
+    "TokenBucket",
+    "count_tokens"
+]
@@ -0,0 +1,132 @@
+"""
+LLM Response Cache Module
+Persists LLM responses in SQLite keyed by a hash of (provider, model, temperature, prompt).
+"""
+from contextlib import closing
+from pathlib import Path
+import hashlib
+import sqlite3
+import threading
+import time
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import LLM_CACHE_PATH, LLM_CACHE_TTL_S, LLM_CACHE_MAX_ENTRIES
+
+
+# Access times of hits buffered before they are written in one transaction
+_TOUCH_FLUSH_SIZE = 64
+
+
+class ResponseCache:
+    """
+    SQLite-backed LRU cache of LLM responses.
+    
+    Entries expire after `ttl_s` seconds and the least recently used entries
+    are evicted once `max_entries` is exceeded. Hit/miss counters are kept
+    per process.
+    
+    Hits only read: their access times are buffered and written in one
+    transaction with the next put (before eviction) or every
+    _TOUCH_FLUSH_SIZE hits.
+    """
+    
+    def __init__(
+        self,
+        path: str | Path = LLM_CACHE_PATH,
+        ttl_s: float = LLM_CACHE_TTL_S,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES
+    ):
+        self.path = Path(path)
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        self._touched: dict[str, float] = {}  # key -> access time not yet written
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON responses (accessed_at)")
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, prompt: str) -> str:
+        """Hashes the inputs that determine a response."""
+        raw = "\x1f".join([provider, model, repr(temperature), prompt])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> str | None:
+        """Returns the cached response for a key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            
+            if row is None or now - row[1] > self.ttl_s:
+                if row is not None:
+                    self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            
+            self._touched[key] = now
+            if len(self._touched) >= _TOUCH_FLUSH_SIZE:
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += 1
+            return row[0]
+    
+    def _flush_touched(self) -> None:
+        """Writes buffered access times (call with the lock held; caller commits)."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()]
+            )
+            self._touched.clear()
+    
+    def put(self, key: str, response: str) -> None:
+        """Stores a response and evicts least recently used entries beyond max_entries."""
+        now = time.time()
+        with self._lock:
+            self._flush_touched()  # Recent hits must count before evicting
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        """Removes all cached responses."""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+    
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the number of stored entries."""
+        with self._lock, closing(self._conn.cursor()) as cursor:
+            entries = cursor.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
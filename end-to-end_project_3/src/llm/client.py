@@ -2,46 +2,488 @@
 LLM Client Module
 Provides unified interface for OpenAI and Google Gemini models.
 """
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from langchain_core.runnables import RunnableLambda
 import sys
 sys.path.append(str(__file__).rsplit("src", 1)[0])
-from config import LLM_PROVIDER, LLM_MODEL, OPENAI_API_KEY, GOOGLE_API_KEY
+from config import (
+    LLM_PROVIDER,
+    LLM_MODEL,
+    LLM_TEMPERATURE,
+    OPENAI_API_KEY,
+    GOOGLE_API_KEY,
+    LLM_POOL_SIZE,
+    LLM_KEEPALIVE_S,
+    LLM_TIMEOUT_S,
+    LLM_CONNECT_TIMEOUT_S,
+    LLM_CACHE_ENABLED,
+    LLM_MAX_CONCURRENT,
+)
+from .cache import ResponseCache
+from .metrics import llm_metrics
+from .tokenizer import count_tokens
+from .rate_limit import (
+    get_rate_limiter,
+    estimate_tokens,
+    backoff_delay,
+    call_with_retries,
+    acall_with_retries,
+)
 
 
-def get_llm():
+# Process-wide client cache keyed by (provider, model, temperature, event loop).
+# Async connection pools belong to the loop that opened them, so each running loop
+# gets its own client; callers outside a loop share the loop=None entry.
+_clients: dict[tuple[str, str, float, asyncio.AbstractEventLoop | None], object] = {}
+_clients_lock = threading.Lock()
+
+# Lazy-loaded response cache to avoid opening the database on import
+_response_cache = None
+
+# Client injected for the current context (see use_llm), bypassing the shared ones
+_llm_override: ContextVar[object | None] = ContextVar("llm_override", default=None)
+
+
+def _build_llm(provider: str, model: str, temperature: float):
     """
-    Returns a LangChain LLM instance based on configuration.
+    Constructs a new LangChain chat model with a pooled, keep-alive HTTP transport.
     
+    Args:
+        provider: "openai", "gemini" or "fake".
+        model: Model name.
+        temperature: Sampling temperature.
+        
     Returns:
-        A ChatOpenAI or ChatGoogleGenerativeAI instance.
+        A ChatOpenAI, ChatGoogleGenerativeAI or FakeLegalChatModel instance.
     """
-    if LLM_PROVIDER == "openai":
+    if provider == "openai":
+        import httpx
         from langchain_openai import ChatOpenAI
+        
+        limits = httpx.Limits(
+            max_connections=LLM_POOL_SIZE,
+            max_keepalive_connections=LLM_POOL_SIZE,
+            keepalive_expiry=LLM_KEEPALIVE_S
+        )
+        timeout = httpx.Timeout(LLM_TIMEOUT_S, connect=LLM_CONNECT_TIMEOUT_S)
         return ChatOpenAI(
-            model=LLM_MODEL,
+            model=model,
             api_key=OPENAI_API_KEY,
-            temperature=0.1  # Low for consistent outputs
+            temperature=temperature,
+            timeout=LLM_TIMEOUT_S,
+            max_retries=0,  # Retries are handled by the rate limiter's backoff
+            http_client=httpx.Client(limits=limits, timeout=timeout),
+            http_async_client=httpx.AsyncClient(limits=limits, timeout=timeout)
         )
-    elif LLM_PROVIDER == "gemini":
+    elif provider == "gemini":
         from langchain_google_genai import ChatGoogleGenerativeAI
+        # The Google client manages its own channel; reusing the instance reuses it
         return ChatGoogleGenerativeAI(
-            model=LLM_MODEL,
+            model=model,
             google_api_key=GOOGLE_API_KEY,
-            temperature=0.1
+            temperature=temperature,
+            timeout=LLM_TIMEOUT_S,
+            max_retries=0
         )
+    elif provider == "fake":
+        from .fake import FakeLegalChatModel
+        return FakeLegalChatModel(model=model, temperature=temperature)
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def get_llm(
+    provider: str = LLM_PROVIDER,
+    model: str = LLM_MODEL,
+    temperature: float = LLM_TEMPERATURE
+):
+    """
+    Returns a shared LangChain LLM instance based on configuration.
+    
+    Instances are created once per (provider, model, temperature) and reused
+    by every caller, so HTTP connections stay alive between calls. Safe to
+    call from multiple threads.
+    
+    Returns:
+        A ChatOpenAI, ChatGoogleGenerativeAI or FakeLegalChatModel instance,
+        or the client injected with use_llm.
+    """
+    override = _llm_override.get()
+    if override is not None:
+        return override
+    
+    key = (provider, model, temperature, _running_loop())
+    llm = _clients.get(key)
+    if llm is None:
+        with _clients_lock:
+            llm = _clients.get(key)
+            if llm is None:
+                _drop_closed_loops()
+                llm = _build_llm(provider, model, temperature)
+                _clients[key] = llm
+    return llm
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _close_client(llm, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Closes the HTTP clients a chat model owns (only OpenAI clients are built with them)."""
+    http_client = getattr(llm, "http_client", None)
+    if http_client is not None:
+        http_client.close()
+    
+    async_client = getattr(llm, "http_async_client", None)
+    if async_client is None or loop is None or loop.is_closed():
+        return  # A closed loop has already torn down its connections
+    if loop.is_running():
+        asyncio.run_coroutine_threadsafe(async_client.aclose(), loop)
+    else:
+        loop.run_until_complete(async_client.aclose())
+
+
+def _drop_closed_loops() -> None:
+    """Forgets clients of event loops that have been closed (call with _clients_lock held)."""
+    for key in [k for k in _clients if k[3] is not None and k[3].is_closed()]:
+        _close_client(_clients.pop(key), key[3])
+
+
+@contextmanager
+def use_llm(llm):
+    """
+    Serves get_llm() from `llm` for every call made inside the block (None = shared clients).
+    
+    Calls to an injected client bypass the response cache, and are metered
+    and rate limited under its own labels (see _call_target), so test or
+    alternate models never mix with the configured provider.
+    """
+    token = _llm_override.set(llm)
+    try:
+        yield
+    finally:
+        _llm_override.reset(token)
+
+
+def clear_llm_cache() -> None:
+    """Drops all cached clients (e.g. after changing credentials)."""
+    with _clients_lock:
+        clients = list(_clients.items())
+        _clients.clear()
+    for key, llm in clients:
+        _close_client(llm, key[3])
+
+
+def get_response_cache() -> ResponseCache:
+    """Lazily opens the persistent response cache on first use."""
+    global _response_cache
+    if _response_cache is None:
+        with _clients_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache()
+    return _response_cache
+
+
+def _cache_key(prompt: str) -> str:
+    return ResponseCache.make_key(LLM_PROVIDER, LLM_MODEL, LLM_TEMPERATURE, prompt)
+
+
+def _call_target() -> tuple[object, str, str]:
+    """
+    Returns (client, provider label, model label) for a call in the current context.
+    
+    An injected client is labelled "injected/<its type>" with its own model
+    name, which keeps its metrics and its rate limiter apart from the
+    configured provider's.
+    """
+    override = _llm_override.get()
+    if override is None:
+        return get_llm(), LLM_PROVIDER, LLM_MODEL
+    llm_type = getattr(override, "_llm_type", type(override).__name__)
+    model = getattr(override, "model_name", None) or getattr(override, "model", None) or llm_type
+    return override, f"injected/{llm_type}", str(model)
+
+
+def _cacheable(use_cache: bool) -> bool:
+    """Whether a call may use the response cache, which is keyed by the configured model only."""
+    return use_cache and _llm_override.get() is None
+
+
+def _usage_tokens(message) -> int | None:
+    """Total tokens reported by the provider for a response, if available."""
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+def _record_call(
+    provider: str,
+    model: str,
+    prompt: str,
+    usage: dict | None,
+    completion: str,
+    started: float,
+    error: bool = False
+) -> None:
+    """Records latency, token usage and cost of one provider call."""
+    if usage:
+        prompt_tokens, completion_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
     else:
-        raise ValueError(f"Unknown LLM provider: {LLM_PROVIDER}")
+        # Provider did not report usage; fall back to local estimates
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(completion)
+    llm_metrics.record_call(
+        provider,
+        model,
+        time.perf_counter() - started,
+        prompt_tokens,
+        completion_tokens,
+        error=error
+    )
+
+
+def _complete(prompt: str):
+    """Calls the provider under its rate limiter, retrying transient failures."""
+    llm, provider, model = _call_target()
+    limiter = get_rate_limiter(provider)
+    estimate = estimate_tokens(prompt)
+    
+    def attempt():
+        with limiter.slot(estimate):
+            return llm.invoke(prompt)
+    
+    started = time.perf_counter()
+    try:
+        response = call_with_retries(attempt, limiter)
+    except Exception:
+        _record_call(provider, model, prompt, None, "", started, error=True)
+        raise
+    limiter.record_usage(estimate, _usage_tokens(response))
+    _record_call(provider, model, prompt, response.usage_metadata, response.content, started)
+    return response
+
 
+async def _acomplete(prompt: str):
+    """Async variant of _complete."""
+    llm, provider, model = _call_target()
+    limiter = get_rate_limiter(provider)
+    estimate = estimate_tokens(prompt)
+    
+    async def attempt():
+        async with limiter.aslot(estimate):
+            return await llm.ainvoke(prompt)
+    
+    started = time.perf_counter()
+    try:
+        response = await acall_with_retries(attempt, limiter)
+    except Exception:
+        _record_call(provider, model, prompt, None, "", started, error=True)
+        raise
+    limiter.record_usage(estimate, _usage_tokens(response))
+    _record_call(provider, model, prompt, response.usage_metadata, response.content, started)
+    return response
 
-def invoke_llm(prompt: str) -> str:
+
+def invoke_llm(prompt: str, use_cache: bool = LLM_CACHE_ENABLED) -> str:
     """
     Simple helper to invoke the LLM with a string prompt.
     
     Args:
         prompt: The prompt string.
+        use_cache: Serve from / store into the persistent response cache.
+            Pass False to always hit the provider (e.g. for benchmarks).
+            
+    Returns:
+        The LLM's response as a string.
+    """
+    use_cache = _cacheable(use_cache)
+    if use_cache:
+        key = _cache_key(prompt)
+        cached = get_response_cache().get(key)
+        if cached is not None:
+            llm_metrics.record_cache_hit(LLM_PROVIDER, LLM_MODEL)
+            return cached
+    
+    response = _complete(prompt)
+    
+    if use_cache:
+        get_response_cache().put(key, response.content)
+    return response.content
+
+
+async def ainvoke_llm(prompt: str, use_cache: bool = LLM_CACHE_ENABLED) -> str:
+    """
+    Async variant of invoke_llm; awaits the provider without blocking a thread.
+    
+    Response cache I/O (SQLite) runs in a worker thread so it never stalls
+    the event loop.
+    
+    Args:
+        prompt: The prompt string.
+        use_cache: Serve from / store into the persistent response cache.
         
     Returns:
         The LLM's response as a string.
     """
-    llm = get_llm()
-    response = llm.invoke(prompt)
+    use_cache = _cacheable(use_cache)
+    if use_cache:
+        key = _cache_key(prompt)
+        cached = await asyncio.to_thread(lambda: get_response_cache().get(key))
+        if cached is not None:
+            llm_metrics.record_cache_hit(LLM_PROVIDER, LLM_MODEL)
+            return cached
+    
+    response = await _acomplete(prompt)
+    
+    if use_cache:
+        await asyncio.to_thread(lambda: get_response_cache().put(key, response.content))
     return response.content
+
+
+# Runs the rate-limited completion through LangChain's batch executor
+_batch_runner = RunnableLambda(_complete, afunc=_acomplete)
+
+# Batch calls are intermediate results (section summaries, clause sheets, routes);
+# the tag keeps LangGraph's "messages" stream from forwarding their tokens
+_BATCH_TAGS = ["nostream"]
+
+
+def _batch_lookup(prompts: list[str], use_cache: bool) -> tuple[list, dict[str, list[int]]]:
+    """Serves cached prompts and groups the rest by prompt text (duplicates run once)."""
+    results = [None] * len(prompts)
+    pending: dict[str, list[int]] = {}
+    for i, prompt in enumerate(prompts):
+        cached = get_response_cache().get(_cache_key(prompt)) if use_cache else None
+        if cached is not None:
+            llm_metrics.record_cache_hit(LLM_PROVIDER, LLM_MODEL)
+            results[i] = cached
+        else:
+            pending.setdefault(prompt, []).append(i)
+    return results, pending
+
+
+def _batch_store(results: list, pending: dict[str, list[int]], responses: list, use_cache: bool) -> None:
+    """Writes batch responses back in prompt order, caching the successful ones."""
+    for (prompt, indices), response in zip(pending.items(), responses):
+        if not isinstance(response, Exception):
+            response = response.content
+            if use_cache:
+                get_response_cache().put(_cache_key(prompt), response)
+        for i in indices:
+            results[i] = response
+
+
+def invoke_llm_batch(
+    prompts: list[str],
+    max_concurrency: int = LLM_MAX_CONCURRENT,
+    use_cache: bool = LLM_CACHE_ENABLED
+) -> list[str | Exception]:
+    """
+    Invokes the LLM for several independent prompts concurrently.
+    
+    Calls still go through the provider's rate limiter and retry policy, so
+    wall time approaches that of the slowest single call when the quota
+    allows it.
+    
+    Calls are tagged "nostream", so a graph streaming in "messages" mode
+    does not forward their tokens.
+    
+    Args:
+        prompts: The prompt strings.
+        max_concurrency: Maximum number of calls in flight for this batch.
+        use_cache: Serve from / store into the persistent response cache.
+        
+    Returns:
+        Responses in the order of `prompts`. An item whose call failed holds
+        the raised exception instead, without affecting the other items.
+    """
+    use_cache = _cacheable(use_cache)
+    results, pending = _batch_lookup(prompts, use_cache)
+    if pending:
+        responses = _batch_runner.batch(
+            list(pending),
+            config={"max_concurrency": max_concurrency, "tags": _BATCH_TAGS},
+            return_exceptions=True
+        )
+        _batch_store(results, pending, responses, use_cache)
+    return results
+
+
+async def ainvoke_llm_batch(
+    prompts: list[str],
+    max_concurrency: int = LLM_MAX_CONCURRENT,
+    use_cache: bool = LLM_CACHE_ENABLED
+) -> list[str | Exception]:
+    """Async variant of invoke_llm_batch (cache I/O runs in a worker thread)."""
+    use_cache = _cacheable(use_cache)
+    results, pending = await asyncio.to_thread(_batch_lookup, prompts, use_cache)
+    if pending:
+        responses = await _batch_runner.abatch(
+            list(pending),
+            config={"max_concurrency": max_concurrency, "tags": _BATCH_TAGS},
+            return_exceptions=True
+        )
+        await asyncio.to_thread(_batch_store, results, pending, responses, use_cache)
+    return results
+
+
+def stream_llm(prompt: str, use_cache: bool = LLM_CACHE_ENABLED) -> Iterator[str]:
+    """
+    Streaming variant of invoke_llm that yields response tokens as they arrive.
+    
+    A cache hit yields the whole cached response as a single chunk. Failures
+    are retried only before the first token has been yielded.
+    
+    Args:
+        prompt: The prompt string.
+        use_cache: Serve from / store into the persistent response cache.
+        
+    Yields:
+        Text chunks of the LLM's response.
+    """
+    use_cache = _cacheable(use_cache)
+    if use_cache:
+        key = _cache_key(prompt)
+        cached = get_response_cache().get(key)
+        if cached is not None:
+            llm_metrics.record_cache_hit(LLM_PROVIDER, LLM_MODEL)
+            yield cached
+            return
+    
+    llm, provider, model = _call_target()
+    limiter = get_rate_limiter(provider)
+    estimate = estimate_tokens(prompt)
+    parts = []
+    attempt = 0
+    started = time.perf_counter()
+    
+    while True:
+        try:
+            with limiter.slot(estimate):
+                usage = None
+                for chunk in llm.stream(prompt):
+                    usage = chunk.usage_metadata or usage
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        yield chunk.content
+            break
+        except Exception as e:
+            delay = None if parts else backoff_delay(e, attempt)
+            if delay is None:
+                _record_call(provider, model, prompt, None, "".join(parts), started, error=True)
+                raise
+            limiter.record_retry(e)
+            time.sleep(delay)
+            attempt += 1
+    
+    limiter.record_usage(estimate, usage.get("total_tokens") if usage else None)
+    _record_call(provider, model, prompt, usage, "".join(parts), started)
+    
+    if use_cache:
+        get_response_cache().put(key, "".join(parts))
@@ -0,0 +1,237 @@
+"""
+Fake LLM Provider Module
+Deterministic, offline stand-in chat model for load tests and profiling.
+
+Selected with LLM_PROVIDER=fake. Responses follow the output formats of the
+agent prompt templates so every parser downstream is exercised, and latency
+is simulated from a configurable time-to-first-token distribution plus a
+tokens/s generation rate.
+"""
+import asyncio
+import math
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import (
+    FAKE_LLM_LATENCY_MS,
+    FAKE_LLM_LATENCY_DIST,
+    FAKE_LLM_LATENCY_SIGMA,
+    FAKE_LLM_TOKENS_PER_S,
+    FAKE_LLM_SEED,
+)
+
+
+# Keyword rules used to answer router prompts
+_ROUTE_KEYWORDS = [
+    ("RISK_ANALYSIS", ("risk", "red flag", "danger", "unfavorable", "concern")),
+    ("SUMMARIZE", ("summar", "overview", "tl;dr", "gist")),
+    ("CLAUSE_SEARCH", ("clause", "termination", "liability", "payment", "confidential",
+                       "indemn", "renewal", "governing law")),
+]
+
+# (context keyword, title, severity, description, recommendation) for risk prompts
+_RISK_RULES = [
+    ("renew", "Auto-Renewal Trap", "HIGH",
+     "The agreement renews automatically unless notice is given well in advance.",
+     "Calendar the notice deadline or negotiate opt-in renewal."),
+    ("liab", "Liability Exposure", "HIGH",
+     "Liability caps are limited or one-sided.",
+     "Negotiate a mutual cap tied to fees paid."),
+    ("indemn", "Broad Indemnification", "MEDIUM",
+     "Indemnification obligations extend beyond third-party claims.",
+     "Limit indemnity to third-party claims caused by the indemnifying party."),
+    ("payment", "Unfavorable Payment Terms", "MEDIUM",
+     "Late payment penalties and short payment windows apply.",
+     "Extend payment terms and cap late fees."),
+    ("terminat", "Restricted Termination Rights", "LOW",
+     "Termination for convenience requires long notice.",
+     "Shorten the notice period or add termination for convenience."),
+    ("arbitration", "One-Sided Dispute Resolution", "LOW",
+     "Disputes are resolved in a forum chosen by one party.",
+     "Agree on a neutral venue."),
+]
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+_CITATION = re.compile(r"\[[^\]]*?Page (\d+)\]")
+
+
+class FakeLegalChatModel(BaseChatModel):
+    """
+    Chat model that answers the LegalMind prompt templates locally.
+    
+    Responses are a pure function of the prompt; only latency is random
+    (seeded per instance).
+    """
+    
+    model: str = "fake-legal"
+    temperature: float = 0.0
+    latency_ms: float = FAKE_LLM_LATENCY_MS  # Mean time to first token
+    latency_dist: str = FAKE_LLM_LATENCY_DIST  # "fixed", "normal" or "lognormal"
+    latency_sigma: float = FAKE_LLM_LATENCY_SIGMA  # Relative spread of the distribution
+    tokens_per_s: float = FAKE_LLM_TOKENS_PER_S  # Generation speed after the first token
+    seed: int | None = FAKE_LLM_SEED
+    
+    _rng: random.Random = PrivateAttr()
+    
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+    
+    @property
+    def _llm_type(self) -> str:
+        return "fake-legal"
+    
+    # === Latency Model ===
+    
+    def _first_token_delay(self) -> float:
+        """Samples the time to first token in seconds."""
+        mean = self.latency_ms / 1000
+        if self.latency_dist == "normal":
+            return max(0.0, self._rng.gauss(mean, mean * self.latency_sigma))
+        if self.latency_dist == "lognormal" and mean > 0:
+            # Parameterized so the distribution's mean equals latency_ms
+            sigma = self.latency_sigma
+            return self._rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
+    
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_s if self.tokens_per_s > 0 else 0.0
+    
+    # === Responses ===
+    
+    @staticmethod
+    def _prompt_text(messages: list[BaseMessage]) -> str:
+        content = messages[-1].content if messages else ""
+        return content if isinstance(content, str) else str(content)
+    
+    @staticmethod
+    def _context(prompt: str) -> str:
+        match = re.search(r"Document (?:Context|Section):\n(.*?)(?:\n\n(?:Provide|Identify|Write|Question|List)|$)",
+                          prompt, re.S)
+        return match.group(1) if match else prompt
+    
+    @staticmethod
+    def _first_sentence(context: str) -> str:
+        text = re.sub(r"\[\d+\] \[[^\]]*\]\n?", "", context).replace("---", " ")
+        text = " ".join(text.split())
+        match = re.search(r"(.{20,240}?[.;])(\s|$)", text)
+        return match.group(1) if match else (text[:200] or "No relevant text provided.")
+    
+    @staticmethod
+    def _pages(context: str) -> str:
+        pages = sorted({int(p) for p in _CITATION.findall(context)})
+        return ", ".join(f"Page {p}" for p in pages) or "N/A"
+    
+    def _respond(self, prompt: str) -> str:
+        """Builds a well-formed response for whichever template the prompt uses."""
+        if "query classifier" in prompt:
+            match = re.search(r"User Query: (.*)", prompt)
+            query = (match.group(1) if match else prompt).lower()
+            for route, keywords in _ROUTE_KEYWORDS:
+                if any(k in query for k in keywords):
+                    return route
+            return "GENERAL_QA"
+        
+        context = self._context(prompt)
+        
+        if "clause extraction specialist" in prompt:
+            match = re.search(r"extract information about (.+?) clauses", prompt)
+            clause_type = match.group(1) if match else "general"
+            if clause_type.lower() not in context.lower() and clause_type != "general":
+                return (f"CLAUSE_TYPE: {clause_type}\n"
+                        "SUMMARY: Not found in the provided document sections.\n"
+                        "KEY_TERMS: N/A\nPAGE_REFERENCE: N/A")
+            terms = sorted(set(re.findall(r"\(\d+\)|\$[\d,.]+|\d+(?:\.\d+)?%", context)))[:5]
+            return (f"CLAUSE_TYPE: {clause_type}\n"
+                    f"SUMMARY: {self._first_sentence(context)}\n"
+                    f"KEY_TERMS: {', '.join(terms) or clause_type}\n"
+                    f"PAGE_REFERENCE: {self._pages(context)}")
+        
+        if "risk assessment specialist" in prompt:
+            lowered = context.lower()
+            blocks = [
+                f"RISK: {title}\nSEVERITY: {severity}\nDESCRIPTION: {description}\n"
+                f"RECOMMENDATION: {recommendation}\n"
+                for keyword, title, severity, description, recommendation in _RISK_RULES
+                if keyword in lowered
+            ]
+            overall = "HIGH" if any("SEVERITY: HIGH" in b for b in blocks) else (
+                "MEDIUM" if blocks else "LOW")
+            return ("\n".join(blocks)
+                    + f"\nOVERALL_RISK: {overall}\n"
+                    + f"SUMMARY: {len(blocks)} potential risks identified in the provided excerpts.")
+        
+        if "summarizing one section" in prompt:
+            sentences = re.findall(r"[^.;\n]{20,200}[.;]", re.sub(r"\[[^\]]*\]", "", context))
+            return "\n".join(f"- {s.strip().lstrip('- ')}" for s in sentences[:4]) or f"- {self._first_sentence(context)}"
+        
+        if "executive summary specialist" in prompt:
+            first = self._first_sentence(context)
+            return ("1. OVERVIEW: This document is an agreement between the named parties. "
+                    f"{first}\n\n"
+                    "2. KEY TERMS: The excerpts set out obligations, deadlines and payment "
+                    f"conditions ({self._pages(context)}).\n\n"
+                    "3. ACTION ITEMS: Review the renewal, liability and termination provisions "
+                    "before signing.")
+        
+        return f"According to the document, {self._first_sentence(context)}"
+    
+    def _usage(self, prompt: str, text: str) -> dict:
+        from .tokenizer import count_tokens
+        input_tokens = count_tokens(prompt)
+        output_tokens = len(_TOKEN.findall(text))
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+    
+    # === BaseChatModel Interface ===
+    
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = self._prompt_text(messages)
+        text = self._respond(prompt)
+        time.sleep(self._first_token_delay() + len(_TOKEN.findall(text)) * self._token_delay())
+        message = AIMessage(content=text, usage_metadata=self._usage(prompt, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        prompt = self._prompt_text(messages)
+        text = self._respond(prompt)
+        await asyncio.sleep(self._first_token_delay() + len(_TOKEN.findall(text)) * self._token_delay())
+        message = AIMessage(content=text, usage_metadata=self._usage(prompt, text))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+    
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs) -> Iterator[ChatGenerationChunk]:
+        prompt = self._prompt_text(messages)
+        text = self._respond(prompt)
+        time.sleep(self._first_token_delay())
+        for i, token in enumerate(_TOKEN.findall(text)):
+            if i:
+                time.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(prompt, text)))
+    
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs) -> AsyncIterator[ChatGenerationChunk]:
+        prompt = self._prompt_text(messages)
+        text = self._respond(prompt)
+        await asyncio.sleep(self._first_token_delay())
+        for i, token in enumerate(_TOKEN.findall(text)):
+            if i:
+                await asyncio.sleep(self._token_delay())
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=self._usage(prompt, text)))
@@ -0,0 +1,196 @@
+"""
+LLM Metrics Module
+Records latency, token usage and estimated cost of every LLM call, labelled
+by the agent/graph node that made it.
+"""
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import copy
+import json
+import threading
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import LLM_PRICES_PER_1M, LLM_LATENCY_BUCKETS_S
+
+
+# Name of the agent/node whose LLM calls are being recorded
+_current_agent: ContextVar[str] = ContextVar("llm_agent", default="unlabeled")
+
+
+@contextmanager
+def agent_label(name: str):
+    """Attributes every LLM call made inside the block to `name`."""
+    token = _current_agent.set(name)
+    try:
+        yield
+    finally:
+        _current_agent.reset(token)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimated USD cost of a call from the configured per-model prices."""
+    prices = LLM_PRICES_PER_1M.get(model)
+    if prices is None:
+        return 0.0
+    return (prompt_tokens * prices["input"] + completion_tokens * prices["output"]) / 1e6
+
+
+@dataclass
+class _Series:
+    """Aggregates for one (agent, provider, model) label set."""
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    latency_sum_s: float = 0.0
+    bucket_counts: list[int] = field(default_factory=lambda: [0] * len(LLM_LATENCY_BUCKETS_S))
+    recent_latencies_s: deque = field(default_factory=lambda: deque(maxlen=2048))
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+class LLMMetrics:
+    """
+    Thread-safe aggregator of LLM call metrics.
+    
+    Latencies go into cumulative histogram buckets (for Prometheus) and a
+    bounded window of recent values (for exact percentiles in JSON dumps).
+    """
+    
+    def __init__(self, buckets: tuple[float, ...] = LLM_LATENCY_BUCKETS_S):
+        self.buckets = buckets
+        self._series: dict[tuple[str, str, str], _Series] = {}
+        self._lock = threading.Lock()
+    
+    def _get_series(self, provider: str, model: str) -> _Series:
+        key = (_current_agent.get(), provider, model)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+    
+    def record_call(
+        self,
+        provider: str,
+        model: str,
+        latency_s: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        error: bool = False
+    ) -> None:
+        """
+        Records one provider call for the current agent label.
+        
+        Args:
+            provider: LLM provider name.
+            model: Model name, used for cost estimation.
+            latency_s: Wall time including queueing and retries.
+            prompt_tokens: Input tokens (provider-reported or estimated).
+            completion_tokens: Output tokens (provider-reported or estimated).
+            error: Whether the call ultimately failed.
+        """
+        with self._lock:
+            series = self._get_series(provider, model)
+            series.calls += 1
+            series.errors += int(error)
+            series.latency_sum_s += latency_s
+            series.recent_latencies_s.append(latency_s)
+            for i, bound in enumerate(self.buckets):
+                if latency_s <= bound:
+                    series.bucket_counts[i] += 1
+            series.prompt_tokens += prompt_tokens
+            series.completion_tokens += completion_tokens
+            series.cost_usd += estimate_cost(model, prompt_tokens, completion_tokens)
+    
+    def record_cache_hit(self, provider: str, model: str) -> None:
+        """Counts a response served from the response cache (no provider call)."""
+        with self._lock:
+            self._get_series(provider, model).cache_hits += 1
+    
+    def reset(self) -> None:
+        """Drops all recorded metrics."""
+        with self._lock:
+            self._series.clear()
+    
+    def snapshot(self) -> list[dict]:
+        """
+        Returns per-label aggregates with latency percentiles.
+        
+        Returns:
+            One dict per (agent, provider, model), sorted by total cost then
+            p95 latency, highest first.
+        """
+        rows = []
+        with self._lock:
+            for (agent, provider, model), s in self._series.items():
+                latencies = sorted(s.recent_latencies_s)
+                
+                def percentile(p: float) -> float:
+                    return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+                
+                rows.append({
+                    "agent": agent,
+                    "provider": provider,
+                    "model": model,
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "cache_hits": s.cache_hits,
+                    "latency_s_mean": s.latency_sum_s / s.calls if s.calls else 0.0,
+                    "latency_s_p50": percentile(0.50),
+                    "latency_s_p95": percentile(0.95),
+                    "latency_s_max": latencies[-1] if latencies else 0.0,
+                    "prompt_tokens": s.prompt_tokens,
+                    "completion_tokens": s.completion_tokens,
+                    "cost_usd": s.cost_usd,
+                })
+        return sorted(rows, key=lambda r: (r["cost_usd"], r["latency_s_p95"]), reverse=True)
+    
+    def to_json(self, indent: int | None = 2) -> str:
+        """Serializes the snapshot as JSON."""
+        return json.dumps(self.snapshot(), indent=indent)
+    
+    def to_prometheus(self, prefix: str = "legalmind_llm") -> str:
+        """Renders all series in the Prometheus text exposition format."""
+        with self._lock:
+            items = list(copy.deepcopy(self._series).items())
+        
+        def labels(key: tuple[str, str, str], **extra: str) -> str:
+            pairs = dict(zip(("agent", "provider", "model"), key), **extra)
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs.items()) + "}"
+        
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds LLM call latency including queueing and retries.",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for key, s in items:
+            for bound, count in zip(self.buckets, s.bucket_counts):
+                lines.append(f"{prefix}_request_duration_seconds_bucket{labels(key, le=str(bound))} {count}")
+            lines.append(f'{prefix}_request_duration_seconds_bucket{labels(key, le="+Inf")} {s.calls}')
+            lines.append(f"{prefix}_request_duration_seconds_sum{labels(key)} {s.latency_sum_s}")
+            lines.append(f"{prefix}_request_duration_seconds_count{labels(key)} {s.calls}")
+        
+        counters = [
+            ("tokens_total", "Tokens consumed.", lambda s: [("prompt", s.prompt_tokens), ("completion", s.completion_tokens)]),
+            ("cost_usd_total", "Estimated spend in USD.", lambda s: [(None, s.cost_usd)]),
+            ("errors_total", "LLM calls that failed after retries.", lambda s: [(None, s.errors)]),
+            ("cache_hits_total", "Responses served from the response cache.", lambda s: [(None, s.cache_hits)]),
+        ]
+        for name, help_text, values in counters:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, s in items:
+                for kind, value in values(s):
+                    extra = {"type": kind} if kind else {}
+                    lines.append(f"{prefix}_{name}{labels(key, **extra)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide metrics registry
+llm_metrics = LLMMetrics()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """Returns the process-wide LLM metrics registry."""
+    return llm_metrics
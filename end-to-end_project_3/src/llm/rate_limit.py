@@ -0,0 +1,304 @@
+"""
+Rate Limiting Module
+Per-provider token-bucket limits, an in-flight concurrency cap, and jittered
+exponential backoff for LLM calls.
+"""
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+import asyncio
+import random
+import threading
+import time
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import (
+    LLM_RATE_LIMITS,
+    LLM_MAX_CONCURRENT,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE_S,
+    LLM_BACKOFF_MAX_S,
+    LLM_EXPECTED_COMPLETION_TOKENS,
+)
+from .tokenizer import count_tokens
+
+
+# Transient HTTP statuses worth retrying besides 429
+_RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `rate_per_min`.
+    
+    Callers reserve capacity up front and are told how long to wait, so
+    concurrent callers queue in arrival order instead of racing.
+    """
+    
+    def __init__(self, rate_per_min: float, capacity: float | None = None):
+        self.rate_per_s = rate_per_min / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_min
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` tokens, going into debt if necessary.
+        
+        Returns:
+            Seconds the caller must wait before the reservation is covered.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate_per_s)
+    
+    def adjust(self, delta: float) -> None:
+        """Corrects a reservation once the true cost is known (positive = charge more)."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Token estimate for a call: the prompt's tokens plus the expected completion."""
+    return count_tokens(prompt) + LLM_EXPECTED_COMPLETION_TOKENS
+
+
+def _status_code(error: Exception) -> int | None:
+    status = getattr(error, "status_code", None) or getattr(error, "code", None)
+    response = getattr(error, "response", None)
+    if status is None and response is not None:
+        status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(error: Exception) -> float | None:
+    """Reads a Retry-After header (seconds form) from a provider error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for provider throttling errors (HTTP 429 / quota exhausted)."""
+    name = type(error).__name__
+    return _status_code(error) == 429 or "RateLimit" in name or "ResourceExhausted" in name
+
+
+def backoff_delay(error: Exception, attempt: int) -> float | None:
+    """
+    Computes how long to wait before retrying a failed call.
+    
+    Uses full-jitter exponential backoff and never waits less than the
+    provider's Retry-After hint.
+    
+    Args:
+        error: The exception raised by the provider call.
+        attempt: Zero-based retry attempt number.
+        
+    Returns:
+        Delay in seconds, or None if the error is not retryable or retries
+        are exhausted.
+    """
+    retryable = (
+        is_rate_limit_error(error)
+        or _status_code(error) in _RETRYABLE_STATUS
+        or isinstance(error, (TimeoutError, ConnectionError))
+        or "Timeout" in type(error).__name__
+    )
+    if not retryable or attempt >= LLM_MAX_RETRIES:
+        return None
+    
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX_S, LLM_BACKOFF_BASE_S * 2 ** attempt))
+    retry_after = _retry_after(error)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ProviderLimiter:
+    """
+    Admission control for one provider's LLM calls.
+    
+    A call waits for its requests/min and tokens/min reservations, then for a
+    free in-flight slot. Queue wait, retries and throttling are recorded so
+    throughput can be sized against the provider quota.
+    """
+    
+    def __init__(
+        self,
+        provider: str,
+        rpm: float,
+        tpm: float,
+        max_concurrent: int = LLM_MAX_CONCURRENT
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        # Coroutines waiting for a slot, woken on release (the semaphore is shared with threads)
+        self._async_waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._waiters_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._waits_ms: list[float] = []
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+    
+    def _record_admission(self, waited_s: float) -> None:
+        with self._metrics_lock:
+            self._waits_ms.append(waited_s * 1000)
+            if len(self._waits_ms) > 10000:
+                del self._waits_ms[:5000]
+            self.calls += 1
+            self.in_flight += 1
+    
+    def _release(self) -> None:
+        with self._metrics_lock:
+            self.in_flight -= 1
+        self._slots.release()
+        self._wake_async_waiter()
+    
+    def _wake_async_waiter(self) -> None:
+        """Wakes the oldest coroutine still waiting for a slot, on its own loop."""
+        with self._waiters_lock:
+            while self._async_waiters:
+                loop, waiter = self._async_waiters.popleft()
+                if waiter.done():
+                    continue  # Cancelled while waiting
+                try:
+                    loop.call_soon_threadsafe(_resolve, waiter)
+                    return
+                except RuntimeError:
+                    continue  # Its loop has been closed
+    
+    @contextmanager
+    def slot(self, estimated_tokens: int):
+        """Blocks until the call may proceed, then holds an in-flight slot."""
+        start = time.monotonic()
+        time.sleep(max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens)))
+        self._slots.acquire()
+        self._record_admission(time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    @asynccontextmanager
+    async def aslot(self, estimated_tokens: int):
+        """Async variant of slot; waits without blocking the event loop."""
+        start = time.monotonic()
+        await asyncio.sleep(max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens)))
+        
+        # The slot semaphore is shared with threads: park on a future that _release resolves
+        loop = asyncio.get_running_loop()
+        while not self._slots.acquire(blocking=False):
+            waiter = loop.create_future()
+            with self._waiters_lock:
+                self._async_waiters.append((loop, waiter))
+            if self._slots.acquire(blocking=False):  # Released before we were queued
+                waiter.cancel()
+                break
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._wake_async_waiter()  # Pass on a wake-up we can no longer use
+                raise
+        self._record_admission(time.monotonic() - start)
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def record_usage(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """Reconciles the tokens/min bucket with the provider-reported usage."""
+        if actual_tokens is not None:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
+    
+    def record_retry(self, error: Exception) -> None:
+        with self._metrics_lock:
+            self.retries += 1
+            if is_rate_limit_error(error):
+                self.throttled += 1
+    
+    def metrics(self) -> dict:
+        """Returns queue wait statistics (ms) and call/retry counters."""
+        with self._metrics_lock:
+            waits = sorted(self._waits_ms)
+            
+            def percentile(p: float) -> float:
+                return waits[min(len(waits) - 1, int(p * len(waits)))] if waits else 0.0
+            
+            return {
+                "provider": self.provider,
+                "calls": self.calls,
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "retries": self.retries,
+                "throttled": self.throttled,
+                "queue_wait_ms_mean": sum(waits) / len(waits) if waits else 0.0,
+                "queue_wait_ms_p50": percentile(0.50),
+                "queue_wait_ms_p95": percentile(0.95),
+                "queue_wait_ms_max": waits[-1] if waits else 0.0,
+            }
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> ProviderLimiter:
+    """Returns the process-wide limiter for a provider."""
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(provider)
+            if limiter is None:
+                limits = LLM_RATE_LIMITS.get(provider, {"rpm": float("inf"), "tpm": float("inf")})
+                limiter = ProviderLimiter(provider, rpm=limits["rpm"], tpm=limits["tpm"])
+                _limiters[provider] = limiter
+    return limiter
+
+
+def call_with_retries(fn, limiter: ProviderLimiter):
+    """Calls fn(), retrying retryable provider errors with backoff."""
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            delay = backoff_delay(e, attempt)
+            if delay is None:
+                raise
+            limiter.record_retry(e)
+            time.sleep(delay)
+            attempt += 1
+
+
+async def acall_with_retries(fn, limiter: ProviderLimiter):
+    """Async variant of call_with_retries; fn returns an awaitable."""
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            delay = backoff_delay(e, attempt)
+            if delay is None:
+                raise
+            limiter.record_retry(e)
+            await asyncio.sleep(delay)
+            attempt += 1
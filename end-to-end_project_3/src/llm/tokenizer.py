@@ -0,0 +1,49 @@
+"""
+Tokenizer Module
+Counts tokens the way the configured provider does, without a network call.
+"""
+from functools import lru_cache
+import math
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import LLM_PROVIDER, LLM_MODEL
+
+
+@lru_cache(maxsize=8)
+def _tiktoken_encoding(model: str):
+    """Loads the tiktoken encoding for an OpenAI model (None if it cannot be loaded)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # BPE files are downloaded on first use; offline we fall back to the estimate
+        return None
+
+
+def count_tokens(text: str, provider: str = LLM_PROVIDER, model: str = LLM_MODEL) -> int:
+    """
+    Counts the tokens of a text for the given provider.
+    
+    OpenAI models use their exact tiktoken encoding. Gemini exposes token
+    counting only through a remote API call, so it (and any provider without
+    a local tokenizer) uses the ~4 characters per token approximation.
+    
+    Args:
+        text: Text to measure.
+        provider: LLM provider name.
+        model: Model name.
+        
+    Returns:
+        Number of tokens.
+    """
+    if provider == "openai":
+        encoding = _tiktoken_encoding(model)
+        if encoding is not None:
+            return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / 4)
@@ -1,3 +1,16 @@
-from .graph import build_graph, run_agent
+from .graph import build_graph, get_graph, initial_state, run_agent, arun_agent, stream_agent, run_agent_many, QueryResult
+from .context import AgentContext, get_agent_context, reset_agent_context
 
-__all__ = ["build_graph", "run_agent"]
+__all__ = [
+    "build_graph",
+    "get_graph",
+    "initial_state",
+    "run_agent",
+    "arun_agent",
+    "stream_agent",
+    "run_agent_many",
+    "QueryResult",
+    "AgentContext",
+    "get_agent_context",
+    "reset_agent_context"
+]
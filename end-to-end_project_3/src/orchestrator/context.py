@@ -0,0 +1,60 @@
+"""
+Agent Context
+Long-lived resources shared by every query the agent graph runs: the vector
+store, the query embedder and the LLM client.
+
+Creating these per query reopens the Chroma client and re-resolves the
+models each time; a context is created once and passed to the graph through
+its run config, so per-query setup is only building the initial state.
+"""
+from dataclasses import dataclass, field
+import threading
+from typing import Any, Callable, Sequence
+from src.vectorstore import ChromaStore, embed_query, embed_texts
+
+
+@dataclass
+class AgentContext:
+    """
+    Shared dependencies injected into the graph nodes.
+    
+    Attributes:
+        store: Vector store used for retrieval and whole-document agents.
+        embed_query: Embeds a query for the router and the retriever (the
+            default memoizes repeats, so both share one model call).
+        embed_queries: Embeds many queries in one model call (bulk runs);
+            must produce the same vectors as embed_query.
+        llm: Chat model every node's LLM calls go to (None = the shared
+            clients from get_llm, per provider and model).
+    """
+    store: ChromaStore = field(default_factory=ChromaStore)
+    embed_query: Callable[[str], Sequence[float]] = embed_query
+    embed_queries: Callable[[list[str]], list[list[float]]] = embed_texts
+    llm: Any = None
+    
+    def warm(self) -> "AgentContext":
+        """Loads the embedding model now instead of on the first query."""
+        self.embed_query("warm up")
+        return self
+
+
+# Lazy-created default context to avoid opening the store on import
+_agent_context = None
+_agent_context_lock = threading.Lock()
+
+
+def get_agent_context() -> AgentContext:
+    """Lazily creates the process-wide default context on first use."""
+    global _agent_context
+    if _agent_context is None:
+        with _agent_context_lock:
+            if _agent_context is None:
+                _agent_context = AgentContext()
+    return _agent_context
+
+
+def reset_agent_context() -> None:
+    """Drops the default context, e.g. to pick up a changed configuration."""
+    global _agent_context
+    with _agent_context_lock:
+        _agent_context = None
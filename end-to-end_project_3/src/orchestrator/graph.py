@@ -2,62 +2,149 @@
 LangGraph Orchestrator
 Coordinates multiple agents using a state graph for conditional routing.
 """
-from typing import TypedDict, Literal
-from langgraph.graph import StateGraph, END
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import Any, TypedDict, Literal, Iterator, Sequence
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph, START, END
 
 from src.agents import (
     route_query,
+    aroute_query,
     retrieve_chunks,
-    format_context,
+    retrieve_chunks_batch,
+    pack_context,
+    compress_results,
     analyze_clause,
+    aanalyze_clause,
+    ClauseInfo,
     assess_risks,
-    summarize_document
+    aassess_risks,
+    RiskReport,
+    assess_document_risks,
+    aassess_document_risks,
+    asummarize_document,
+    stream_summary,
+    adocument_summary,
+    stream_document_summary,
+    analysis_pool
 )
-from src.vectorstore import ChromaStore
-from src.llm import invoke_llm
+from src.vectorstore import RetrievalResult
+from src.ingestion import detect_clause_type
+from src.llm import ainvoke_llm, stream_llm, agent_label, use_llm
+from .context import AgentContext, get_agent_context
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import (
+    CONTEXT_TOKEN_BUDGETS,
+    DEFAULT_CONTEXT_TOKEN_BUDGET,
+    CLAUSE_FILTER_ENABLED,
+    CONTEXT_COMPRESSION_ENABLED,
+    CONTEXT_COMPRESSION_ROUTES,
+    AGENT_MAX_CONCURRENT,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 # === State Definition ===
 class AgentState(TypedDict):
     """State passed between nodes in the graph."""
     query: str
+    source: str | None  # Restrict the query to one document (None = all documents)
     route: str
+    clause_type: str  # Clause type named in the query, or "general"
+    results: list[RetrievalResult]
     context: str
+    context_tokens: int
     response: str
     citations: list[str]
 
 
 # === Node Functions ===
 
-def router_node(state: AgentState) -> AgentState:
+def _configurable(config: RunnableConfig | None, name: str):
+    """A value passed by the caller in config["configurable"], if any."""
+    return ((config or {}).get("configurable") or {}).get(name)
+
+
+def _context(config: RunnableConfig | None) -> AgentContext:
+    """The AgentContext of the run, or the process-wide default."""
+    return _configurable(config, "agent_context") or get_agent_context()
+
+
+def router_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
     """Classifies the query and determines the route."""
-    route = route_query(state["query"])
+    ctx = _context(config)
+    route = route_query(state["query"], query_embedding=ctx.embed_query(state["query"]))
     return {"route": route}
 
 
-def retriever_node(state: AgentState) -> AgentState:
-    """Retrieves relevant chunks from the vector store."""
-    store = ChromaStore()
-    results = retrieve_chunks(state["query"], store=store)
-    context = format_context(results)
-    citations = [r.to_citation() for r in results]
-    return {"context": context, "citations": citations}
+def _retrieval_filters(query: str, source: str | None) -> tuple[str | None, list[dict | None]]:
+    """The clause type named in a query and the metadata filters to search, in order."""
+    clause_type = detect_clause_type(query)
+    source_filter = {"source": source} if source else None
+    
+    filters = []
+    if clause_type and CLAUSE_FILTER_ENABLED:
+        clause_filter = {f"clause_{clause_type}": True}
+        filters.append({"$and": [source_filter, clause_filter]} if source_filter else clause_filter)
+    filters.append(source_filter)
+    return clause_type, filters
 
 
-def clause_search_node(state: AgentState) -> AgentState:
-    """Handles clause search queries."""
-    # Extract clause type from query (simplified)
-    query_lower = state["query"].lower()
-    clause_type = "general"
+def retriever_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """
+    Retrieves relevant chunks from the vector store.
     
-    for ct in ["termination", "liability", "payment", "confidentiality", "indemnification"]:
-        if ct in query_lower:
-            clause_type = ct
-            break
+    A query naming a clause type only searches chunks tagged with it at
+    ingest, falling back to the whole corpus if none are tagged.
+    
+    Results already fetched by run_agent_many arrive in
+    config["configurable"]["retrieval"] and are used as-is.
+    """
+    prefetched = _configurable(config, "retrieval")
+    if prefetched is not None:
+        return prefetched
     
-    clause_info = analyze_clause(state["context"], clause_type)
+    ctx = _context(config)
+    query_embedding = ctx.embed_query(state["query"])
+    clause_type, filters = _retrieval_filters(state["query"], state.get("source"))
     
-    response = f"""**{clause_info.clause_type.title()} Clause Analysis**
+    results = []
+    for where in filters:
+        results = retrieve_chunks(state["query"], store=ctx.store, where=where, query_embedding=query_embedding)
+        if results:
+            break
+    return {"results": results, "clause_type": clause_type or "general"}
+
+
+def context_packer_node(state: AgentState) -> AgentState:
+    """
+    Packs retrieved chunks into the route's context token budget.
+    
+    For routes in CONTEXT_COMPRESSION_ROUTES the chunks are first cut down
+    to their sentences most similar to the query.
+    """
+    budget = CONTEXT_TOKEN_BUDGETS.get(state["route"], DEFAULT_CONTEXT_TOKEN_BUDGET)
+    results = state["results"]
+    if CONTEXT_COMPRESSION_ENABLED and state["route"] in CONTEXT_COMPRESSION_ROUTES and results:
+        results = compress_results(state["query"], results).results
+    packed = pack_context(results, budget)
+    citations = [r.to_citation() for r in packed.results]
+    return {"context": packed.text, "context_tokens": packed.tokens_used, "citations": citations}
+
+
+def _format_clause_response(clause_info: ClauseInfo) -> str:
+    """Renders a ClauseInfo as the clause search response."""
+    return f"""**{clause_info.clause_type.title()} Clause Analysis**
 
 **Summary:** {clause_info.summary}
 
@@ -65,13 +152,10 @@ def clause_search_node(state: AgentState) -> AgentState:
 
 **Source:** {clause_info.page_reference}
 """
-    return {"response": response}
 
 
-def risk_analysis_node(state: AgentState) -> AgentState:
-    """Handles risk analysis queries."""
-    risk_report = assess_risks(state["context"])
-    
+def _format_risk_report(risk_report: RiskReport) -> str:
+    """Renders a RiskReport as the risk analysis response."""
     risk_lines = []
     for risk in risk_report.risks:
         severity_emoji = {"HIGH": "🔴", "MEDIUM": "🟡", "LOW": "🟢"}.get(risk.severity, "⚪")
@@ -80,7 +164,7 @@ def risk_analysis_node(state: AgentState) -> AgentState:
         risk_lines.append(f"   💡 *{risk.recommendation}*")
         risk_lines.append("")
     
-    response = f"""**Risk Assessment Report**
+    return f"""**Risk Assessment Report**
 
 **Overall Risk Level:** {risk_report.overall_risk_level}
 
@@ -89,18 +173,11 @@ def risk_analysis_node(state: AgentState) -> AgentState:
 
 **Summary:** {risk_report.summary}
 """
-    return {"response": response}
 
 
-def summarize_node(state: AgentState) -> AgentState:
-    """Handles summarization queries."""
-    summary = summarize_document(state["context"])
-    return {"response": f"**Executive Summary**\n\n{summary}"}
-
-
-def general_qa_node(state: AgentState) -> AgentState:
-    """Handles general Q&A queries."""
-    prompt = f"""Based on the following document excerpts, answer the user's question.
+def _general_qa_prompt(state: AgentState) -> str:
+    """Builds the general Q&A prompt from the query and retrieved context."""
+    return f"""Based on the following document excerpts, answer the user's question.
 
 Document Context:
 {state["context"]}
@@ -108,14 +185,136 @@ Document Context:
 Question: {state["query"]}
 
 Provide a clear, direct answer. If the answer is not in the context, say so."""
+
+
+def _with_citations(answer: str, state: AgentState) -> str:
+    """Appends the retrieval citations to an answer."""
+    citations_text = "\n".join(state.get("citations", []))
+    return f"{answer}\n\n**Sources:**\n{citations_text}"
+
+
+def clause_search_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """
+    Handles clause search queries.
     
-    answer = invoke_llm(prompt)
+    Each field is passed to config["configurable"]["on_clause_field"] as
+    (name, value) as soon as it has been generated.
+    """
+    clause_type = state["clause_type"].replace("_", " ")
+    clause_info = analyze_clause(state["context"], clause_type, _configurable(config, "on_clause_field"))
+    return {"response": _format_clause_response(clause_info)}
+
+
+def _target_source(state: AgentState) -> str | None:
+    """The document a summary request refers to: the requested one, else the best match's."""
+    if state.get("source"):
+        return state["source"]
+    results = state.get("results") or []
+    return results[0].source if results else None
+
+
+def risk_analysis_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """
+    Handles risk analysis queries.
     
-    # Add citations
-    citations_text = "\n".join(state.get("citations", []))
-    response = f"{answer}\n\n**Sources:**\n{citations_text}"
+    A query scoped to one document gets that document's whole-document risk
+    report, precomputed per version after ingest (on a miss the document is
+    pre-screened and assessed on demand). Unscoped queries are assessed on
+    the retrieved context, which may span several documents.
+    
+    Each RiskItem is passed to config["configurable"]["on_risk"] as soon as
+    its block has been generated.
+    """
+    source = state.get("source")
+    on_risk = _configurable(config, "on_risk")
+    if source is not None:
+        analysis_pool.wait(source, "risk_report")  # Reuse an in-flight precompute of this version
+        risk_report = assess_document_risks(source, _context(config).store, on_risk=on_risk)
+    else:
+        risk_report = assess_risks(state["context"], on_risk)
+    return {"response": _format_risk_report(risk_report)}
+
+
+def summarize_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """Handles summarization queries with the cached whole-document summary."""
+    source = _target_source(state)
+    # Streamed so stream_agent can forward tokens as they are generated
+    if source is not None:
+        analysis_pool.wait(source, "summary")
+        summary = "".join(stream_document_summary(source, _context(config).store)).strip()
+    else:
+        summary = "".join(stream_summary(state["context"])).strip()
+    return {"response": f"**Executive Summary**\n\n{summary}"}
+
+
+def general_qa_node(state: AgentState) -> AgentState:
+    """Handles general Q&A queries."""
+    answer = "".join(stream_llm(_general_qa_prompt(state)))
     
-    return {"response": response}
+    # Add citations
+    return {"response": _with_citations(answer, state)}
+
+
+# === Async Node Functions ===
+# Same behavior as the sync nodes, but LLM calls are awaited and CPU-bound
+# retrieval runs in a worker thread, so one event loop can serve many queries.
+
+async def arouter_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """Async variant of router_node."""
+    ctx = _context(config)
+    query_embedding = await asyncio.to_thread(ctx.embed_query, state["query"])
+    route = await aroute_query(state["query"], query_embedding=query_embedding)
+    return {"route": route}
+
+
+async def aretriever_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """Async variant of retriever_node."""
+    return await asyncio.to_thread(retriever_node, state, config)
+
+
+async def acontext_packer_node(state: AgentState) -> AgentState:
+    """Async variant of context_packer_node (compression embeds sentences, so it runs in a worker thread)."""
+    return await asyncio.to_thread(context_packer_node, state)
+
+
+async def aclause_search_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """Async variant of clause_search_node."""
+    clause_type = state["clause_type"].replace("_", " ")
+    clause_info = await aanalyze_clause(state["context"], clause_type, _configurable(config, "on_clause_field"))
+    return {"response": _format_clause_response(clause_info)}
+
+
+async def arisk_analysis_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """Async variant of risk_analysis_node."""
+    source = state.get("source")
+    on_risk = _configurable(config, "on_risk")
+    if source is not None:
+        await asyncio.to_thread(analysis_pool.wait, source, "risk_report")
+        risk_report = await aassess_document_risks(source, _context(config).store, on_risk=on_risk)
+    else:
+        risk_report = await aassess_risks(state["context"], on_risk)
+    return {"response": _format_risk_report(risk_report)}
+
+
+async def asummarize_node(state: AgentState, config: RunnableConfig | None = None) -> AgentState:
+    """Async variant of summarize_node."""
+    source = _target_source(state)
+    if source is not None:
+        await asyncio.to_thread(analysis_pool.wait, source, "summary")
+        summary = await adocument_summary(source, _context(config).store)
+    else:
+        summary = await asummarize_document(state["context"])
+    return {"response": f"**Executive Summary**\n\n{summary}"}
+
+
+async def ageneral_qa_node(state: AgentState) -> AgentState:
+    """Async variant of general_qa_node."""
+    answer = await ainvoke_llm(_general_qa_prompt(state))
+    return {"response": _with_citations(answer, state)}
+
+
+# Specialist nodes whose LLM tokens stream_agent forwards to the caller
+STREAMING_NODES = {"general_qa", "summarize"}
 
 
 # === Routing Logic ===
@@ -133,25 +332,76 @@ def decide_next_node(state: AgentState) -> Literal["clause_search", "risk_analys
 
 # === Graph Builder ===
 
-def build_graph() -> StateGraph:
-    """Constructs the LangGraph workflow."""
+SYNC_NODES = {
+    "router": router_node,
+    "retriever": retriever_node,
+    "context_packer": context_packer_node,
+    "clause_search": clause_search_node,
+    "risk_analysis": risk_analysis_node,
+    "summarize": summarize_node,
+    "general_qa": general_qa_node
+}
+
+ASYNC_NODES = {
+    "router": arouter_node,
+    "retriever": aretriever_node,
+    "context_packer": acontext_packer_node,
+    "clause_search": aclause_search_node,
+    "risk_analysis": arisk_analysis_node,
+    "summarize": asummarize_node,
+    "general_qa": ageneral_qa_node
+}
+
+
+def _labeled(name: str, node):
+    """
+    Wraps a node so its LLM calls are attributed to it in the LLM metrics
+    and go to the run's AgentContext client.
+    """
+    # Nodes declaring a config parameter get the run config (context, progress callbacks)
+    takes_config = "config" in inspect.signature(node).parameters
+    if asyncio.iscoroutinefunction(node):
+        async def labeled_node(state: AgentState, config: RunnableConfig) -> dict:
+            with agent_label(name), use_llm(_context(config).llm):
+                return await (node(state, config) if takes_config else node(state))
+    else:
+        def labeled_node(state: AgentState, config: RunnableConfig) -> dict:
+            with agent_label(name), use_llm(_context(config).llm):
+                return node(state, config) if takes_config else node(state)
+    return labeled_node
+
+
+def build_graph(use_async: bool = False, fan_out: bool = True) -> StateGraph:
+    """
+    Constructs the LangGraph workflow.
+    
+    Args:
+        use_async: Wire the async node variants; the compiled graph must then
+            be run with `ainvoke`.
+        fan_out: Run the router and the retriever concurrently (retrieval only
+            needs the query); False chains them sequentially.
+    """
     graph = StateGraph(AgentState)
     
     # Add nodes
-    graph.add_node("router", router_node)
-    graph.add_node("retriever", retriever_node)
-    graph.add_node("clause_search", clause_search_node)
-    graph.add_node("risk_analysis", risk_analysis_node)
-    graph.add_node("summarize", summarize_node)
-    graph.add_node("general_qa", general_qa_node)
+    for name, node in (ASYNC_NODES if use_async else SYNC_NODES).items():
+        graph.add_node(name, _labeled(name, node))
     
     # Define edges
-    graph.set_entry_point("router")
-    graph.add_edge("router", "retriever")
+    if fan_out:
+        # Both start from the query and join before packing, so the critical
+        # path is max(routing, retrieval) instead of their sum
+        graph.add_edge(START, "router")
+        graph.add_edge(START, "retriever")
+        graph.add_edge(["router", "retriever"], "context_packer")
+    else:
+        graph.set_entry_point("router")
+        graph.add_edge("router", "retriever")
+        graph.add_edge("retriever", "context_packer")
     
-    # Conditional routing after retrieval
+    # Conditional routing once the context is packed
     graph.add_conditional_edges(
-        "retriever",
+        "context_packer",
         decide_next_node,
         {
             "clause_search": "clause_search",
@@ -170,28 +420,284 @@ def build_graph() -> StateGraph:
     return graph.compile()
 
 
-# === Main Entry Point ===
+# Compiled graphs per (use_async, fan_out), built on first use
+_compiled_graphs: dict[tuple[bool, bool], Any] = {}
+_compiled_graphs_lock = threading.Lock()
 
-def run_agent(query: str) -> str:
+
+def get_graph(use_async: bool = False, fan_out: bool = True):
     """
-    Runs the full agent pipeline for a query.
+    Returns the compiled workflow, building it only once per process.
+    
+    Compiled graphs hold no per-query state, so one instance is safely
+    invoked from many threads or tasks at once; everything a query needs is
+    in its initial state and run config.
     
     Args:
-        query: User's natural language question.
-        
-    Returns:
-        The agent's response as a formatted string.
+        use_async: Return the graph wired with the async node variants.
+        fan_out: Run the router and the retriever concurrently.
     """
-    graph = build_graph()
-    
-    initial_state: AgentState = {
+    key = (use_async, fan_out)
+    graph = _compiled_graphs.get(key)
+    if graph is None:
+        with _compiled_graphs_lock:
+            graph = _compiled_graphs.get(key)
+            if graph is None:
+                graph = _compiled_graphs[key] = build_graph(use_async, fan_out)
+    return graph
+
+
+# === Main Entry Point ===
+
+def initial_state(query: str, source: str | None = None) -> AgentState:
+    """Creates the empty state a query starts from."""
+    return {
         "query": query,
+        "source": source,
         "route": "",
+        "clause_type": "general",
+        "results": [],
         "context": "",
+        "context_tokens": 0,
         "response": "",
         "citations": []
     }
+
+
+def _run_config(context: AgentContext | None, **configurable) -> RunnableConfig:
+    """Builds the run config carrying the shared context and any callbacks."""
+    return {"configurable": {"agent_context": context or get_agent_context(), **configurable}}
+
+
+def run_agent(query: str, source: str | None = None, context: AgentContext | None = None) -> str:
+    """
+    Runs the full agent pipeline for a query.
+    
+    Args:
+        query: User's natural language question.
+        source: Restrict retrieval and whole-document agents to one document.
+        context: Store, embedder and LLM client to use; defaults to the
+            process-wide context.
+            
+    Returns:
+        The agent's response as a formatted string.
+    """
+    graph = get_graph()
+    
+    final_state = graph.invoke(initial_state(query, source), config=_run_config(context))
+    
+    return final_state["response"]
+
+
+def stream_agent(
+    query: str,
+    source: str | None = None,
+    context: AgentContext | None = None
+) -> Iterator[tuple[str, Any]]:
+    """
+    Runs the agent pipeline, yielding partial results of specialist nodes live.
+    
+    Tokens of the router and of non-streaming nodes are not forwarded; risk
+    and clause nodes instead forward each parsed item as its block closes.
+    A cached LLM response arrives all at once.
+    
+    Args:
+        query: User's natural language question.
+        source: Restrict retrieval and whole-document agents to one document.
+        context: Store, embedder and LLM client to use; defaults to the
+            process-wide context.
+            
+    Yields:
+        ("token", text) for each generated chunk of a streaming node,
+        ("risk", RiskItem) for each identified risk, ("clause_field",
+        (name, value)) for each extracted clause field, then ("response",
+        text) with the complete formatted response.
+    """
+    graph = get_graph()
+    final_state = {}
+    
+    # Filled by node callbacks and drained between graph events
+    items = deque()
+    config = _run_config(
+        context,
+        on_risk=lambda risk: items.append(("risk", risk)),
+        on_clause_field=lambda name, value: items.append(("clause_field", (name, value)))
+    )
+    
+    for mode, payload in graph.stream(
+        initial_state(query, source),
+        config=config,
+        stream_mode=["messages", "values"]
+    ):
+        while items:
+            yield items.popleft()
+        if mode == "messages":
+            chunk, metadata = payload
+            if metadata.get("langgraph_node") in STREAMING_NODES and chunk.content:
+                yield "token", chunk.content
+        else:
+            final_state = payload
+    
+    while items:
+        yield items.popleft()
+    yield "response", final_state.get("response", "")
+
+
+async def arun_agent(query: str, source: str | None = None, context: AgentContext | None = None) -> str:
+    """
+    Async variant of run_agent.
     
-    final_state = graph.invoke(initial_state)
+    Runs the async graph so that concurrent queries share one event loop
+    instead of holding one thread per in-flight LLM call, e.g.
+    `await asyncio.gather(*(arun_agent(q) for q in queries))`.
+    
+    Args:
+        query: User's natural language question.
+        source: Restrict retrieval and whole-document agents to one document.
+        context: Store, embedder and LLM client to use; defaults to the
+            process-wide context.
+            
+    Returns:
+        The agent's response as a formatted string.
+    """
+    graph = get_graph(use_async=True)
+    
+    final_state = await graph.ainvoke(initial_state(query, source), config=_run_config(context))
     
     return final_state["response"]
+
+
+# === Bulk Queries ===
+
+@dataclass
+class QueryResult:
+    """Outcome of one distinct query in run_agent_many."""
+    query: str
+    source: str | None
+    indices: list[int]  # Positions in the input; duplicates share one run
+    response: str | None = None
+    error: Exception | None = None  # Set instead of response if the run failed
+    elapsed_ms: float = 0.0  # Graph execution time, excluding time queued
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _prefetch_retrieval(
+    keys: list[tuple[str, str | None]],
+    embeddings: dict[str, list[float]],
+    ctx: AgentContext
+) -> dict[tuple[str, str | None], dict]:
+    """
+    Runs the retriever step of many queries with one store query per filter.
+    
+    Queries are grouped by metadata filter; a query whose clause-filtered
+    search comes back empty moves on to its next filter in the following
+    round, as in retriever_node. Queries of a group whose store query fails
+    are left out of the result, so their graphs retrieve for themselves.
+    """
+    plans = {key: _retrieval_filters(*key) for key in keys}
+    found = {key: [] for key in keys}
+    pending, attempt = list(keys), 0
+    while pending:
+        groups: dict[str, tuple[dict | None, list]] = {}
+        for key in pending:
+            where = plans[key][1][attempt]
+            groups.setdefault(repr(where), (where, []))[1].append(key)
+        for where, group in groups.values():
+            try:
+                batches = retrieve_chunks_batch(
+                    [query for query, _ in group],
+                    store=ctx.store,
+                    where=where,
+                    query_embeddings=[embeddings[query] for query, _ in group]
+                )
+            except Exception as e:
+                logger.warning("Prefetching retrieval for %d queries failed: %s", len(group), e)
+                for key in group:
+                    del found[key]
+                continue
+            found.update(zip(group, batches))
+        attempt += 1
+        pending = [key for key in pending if key in found and not found[key] and attempt < len(plans[key][1])]
+    return {key: {"results": results, "clause_type": plans[key][0] or "general"} for key, results in found.items()}
+
+
+def _prefetched(retrieval: dict, key: tuple[str, str | None]) -> dict:
+    """Run config entries handing a query its prefetched retrieval, if there is any."""
+    return {"retrieval": retrieval[key]} if key in retrieval else {}
+
+
+def _run_one(graph, key: tuple[str, str | None], config: RunnableConfig) -> tuple[str | None, Exception | None, float]:
+    """Runs one query, returning (response, error, elapsed ms) instead of raising."""
+    start = time.perf_counter()
+    try:
+        response, error = graph.invoke(initial_state(*key), config=config)["response"], None
+    except Exception as e:
+        response, error = None, e
+    return response, error, (time.perf_counter() - start) * 1000
+
+
+def run_agent_many(
+    queries: Sequence[str | tuple[str, str | None]],
+    max_concurrency: int = AGENT_MAX_CONCURRENT,
+    source: str | None = None,
+    context: AgentContext | None = None
+) -> Iterator[QueryResult]:
+    """
+    Runs the agent pipeline for many queries with bounded parallelism.
+    
+    Identical (query, source) pairs run once. Before any graph runs, all
+    distinct queries are embedded in one batch and their retrieval is done
+    with one store query per metadata filter; the graphs then only route,
+    pack and call the specialists, at most `max_concurrency` at a time. A
+    failing query is reported in its result without affecting the others;
+    if batch embedding or a prefetch store query fails, the affected graphs
+    embed and retrieve on their own.
+    
+    Args:
+        queries: Questions, each a string or a (query, source) pair.
+        max_concurrency: Maximum graph runs in flight.
+        source: Document that plain-string queries are restricted to.
+        context: Store, embedder and LLM client to use; defaults to the
+            process-wide context.
+            
+    Yields:
+        One QueryResult per distinct query, in completion order.
+    """
+    ctx = context or get_agent_context()
+    
+    jobs: dict[tuple[str, str | None], list[int]] = {}
+    for i, item in enumerate(queries):
+        key = (item, source) if isinstance(item, str) else tuple(item)
+        jobs.setdefault(key, []).append(i)
+    if not jobs:
+        return
+    
+    # One embedding batch, shared by the prefetch and every router node. If it
+    # fails, each graph embeds and retrieves its own query, so a bad input only
+    # fails its own result.
+    texts = list(dict.fromkeys(query for query, _ in jobs))
+    try:
+        embeddings = {text: list(vector) for text, vector in zip(texts, ctx.embed_queries(texts), strict=True)}
+    except Exception as e:
+        logger.warning("Batch embedding of %d queries failed, embedding per query: %s", len(texts), e)
+        embeddings = {}
+    embed_query = ctx.embed_query
+    ctx = replace(ctx, embed_query=lambda query: embeddings.get(query) or embed_query(query))
+    retrieval = _prefetch_retrieval([key for key in jobs if key[0] in embeddings], embeddings, ctx)
+    
+    graph = get_graph()
+    executor = ThreadPoolExecutor(max(1, max_concurrency), thread_name_prefix="agent")
+    try:
+        futures = {
+            executor.submit(_run_one, graph, key, _run_config(ctx, **_prefetched(retrieval, key))): key
+            for key in jobs
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            yield QueryResult(*key, jobs[key], *future.result())
+    finally:
+        # Stops queued queries if the caller stops iterating early
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,3 @@
+from .artifact_store import ArtifactStore, content_hash, get_artifact_store
+
+__all__ = ["ArtifactStore", "content_hash", "get_artifact_store"]
@@ -0,0 +1,149 @@
+"""
+Artifact Store Module
+Persists derived per-document results (summaries, reports) in SQLite, keyed
+by a hash of the document's content so any edit invalidates them.
+"""
+from contextlib import closing
+from pathlib import Path
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import ARTIFACT_STORE_PATH
+
+
+def content_hash(texts: list[str]) -> str:
+    """Hashes a document's chunk texts, in order, into a stable version id."""
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    SQLite-backed store of JSON artifacts per document version.
+    
+    `documents` maps a source name to the hash of its current content;
+    `artifacts` holds values under (doc_hash, kind, key), e.g.
+    (hash, "summary", ""), (hash, "risk_report", "") or
+    (hash, "section_summary", <section hash>).
+    """
+    
+    def __init__(self, path: str | Path = ARTIFACT_STORE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS documents (
+                source TEXT PRIMARY KEY,
+                doc_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS artifacts (
+                doc_hash TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (doc_hash, kind, key)
+            )"""
+        )
+        self._conn.commit()
+    
+    def set_document(self, source: str, doc_hash: str) -> None:
+        """
+        Records the current content hash of a source.
+        
+        When the hash changes, artifacts of versions no source refers to any
+        more (including results stored late by jobs that analyzed an older
+        version) are deleted.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_hash FROM documents WHERE source = ?", (source,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (source, doc_hash, updated_at) VALUES (?, ?, ?)",
+                (source, doc_hash, time.time())
+            )
+            if row is None or row[0] != doc_hash:
+                self._prune_orphans()
+            self._conn.commit()
+    
+    def _prune_orphans(self) -> None:
+        """Deletes artifacts of versions no source refers to (call with the lock held)."""
+        self._conn.execute("DELETE FROM artifacts WHERE doc_hash NOT IN (SELECT doc_hash FROM documents)")
+    
+    def document_hash(self, source: str) -> str | None:
+        """Returns the content hash recorded for a source, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT doc_hash FROM documents WHERE source = ?", (source,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def get(self, doc_hash: str, kind: str, key: str = "") -> Any | None:
+        """Returns a stored artifact, or None if missing."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM artifacts WHERE doc_hash = ? AND kind = ? AND key = ?",
+                (doc_hash, kind, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def put(self, doc_hash: str, kind: str, value: Any, key: str = "") -> None:
+        """Stores a JSON-serializable artifact."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (doc_hash, kind, key, value, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (doc_hash, kind, key, json.dumps(value), time.time())
+            )
+            self._conn.commit()
+    
+    def forget_document(self, source: str) -> None:
+        """Drops a source and every artifact no remaining source refers to."""
+        with self._lock:
+            self._conn.execute("DELETE FROM documents WHERE source = ?", (source,))
+            # Another source with identical content keeps the shared artifacts
+            self._prune_orphans()
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        """Removes all documents and artifacts."""
+        with self._lock:
+            self._conn.execute("DELETE FROM documents")
+            self._conn.execute("DELETE FROM artifacts")
+            self._conn.commit()
+    
+    def stats(self) -> dict:
+        """Returns the number of tracked documents and stored artifacts per kind."""
+        with self._lock, closing(self._conn.cursor()) as cursor:
+            documents = cursor.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            kinds = dict(cursor.execute("SELECT kind, COUNT(*) FROM artifacts GROUP BY kind").fetchall())
+        return {"documents": documents, "artifacts": kinds}
+
+
+# Lazy-loaded store to avoid opening the database on import
+_artifact_store = None
+_artifact_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Lazily opens the process-wide artifact store on first use."""
+    global _artifact_store
+    if _artifact_store is None:
+        with _artifact_store_lock:
+            if _artifact_store is None:
+                _artifact_store = ArtifactStore()
+    return _artifact_store
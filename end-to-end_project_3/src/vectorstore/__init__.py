@@ -1,4 +1,15 @@
-from .embedder import embed_texts, embed_single
+from .embedder import embed_texts, embed_single, embed_query, normalize
 from .chroma_store import ChromaStore, RetrievalResult
+from .retrieval_cache import SemanticRetrievalCache
+from .maintenance import CompactionJob
 
-__all__ = ["embed_texts", "embed_single", "ChromaStore", "RetrievalResult"]
+__all__ = [
+    "embed_texts",
+    "embed_single",
+    "embed_query",
+    "normalize",
+    "ChromaStore",
+    "RetrievalResult",
+    "SemanticRetrievalCache",
+    "CompactionJob"
+]
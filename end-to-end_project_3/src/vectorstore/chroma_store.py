@@ -3,10 +3,48 @@ ChromaDB Vector Store Module
 Handles storage and retrieval of document embeddings with metadata filtering.
 """
 from pathlib import Path
-from dataclasses import dataclass
+from contextlib import closing
+from dataclasses import dataclass, field
+import shutil
+import sqlite3
+import threading
+import uuid
 import sys
 sys.path.append(str(__file__).rsplit("src", 1)[0])
-from config import CHROMA_PERSIST_DIR, TOP_K_RESULTS
+from config import (
+    CHROMA_PERSIST_DIR,
+    TOP_K_RESULTS,
+    HNSW_SPACE,
+    HNSW_M,
+    HNSW_CONSTRUCTION_EF,
+    HNSW_SEARCH_EF,
+)
+
+# Write counters per (persist dir, collection), shared by all ChromaStore instances
+# in the process so caches can detect that the corpus changed.
+_generations: dict[tuple[str, str], int] = {}
+_generations_lock = threading.Lock()
+
+# Recreation counters per (persist dir, collection): clear() and index rebuilds
+# replace the Chroma collection, and other instances re-resolve their handle by name
+# when the counter moved (a handle to the dropped collection fails on use).
+_epochs: dict[tuple[str, str], int] = {}
+
+# One writer per persist dir in this process: compaction VACUUMs the shared SQLite
+# file and swaps collections, so it must not interleave with adds or deletes.
+_write_locks: dict[str, threading.RLock] = {}
+_write_locks_lock = threading.Lock()
+
+# Suffixes of the temporary collections used while rebuilding the index
+_COMPACTING = "_compacting"
+_BACKUP = "_backup"
+
+
+def _write_lock(persist_dir: Path) -> threading.RLock:
+    """Returns the process-wide write lock of a persist directory."""
+    key = str(persist_dir.resolve())
+    with _write_locks_lock:
+        return _write_locks.setdefault(key, threading.RLock())
 
 
 @dataclass
@@ -17,6 +55,8 @@ class RetrievalResult:
     page_number: int
     source: str
     chunk_index: int
+    embedding: list[float] | None = None  # Only populated when requested
+    clause_types: list[str] = field(default_factory=list)  # Tags set at ingest
     
     def to_citation(self) -> str:
         """Formats as a readable citation."""
@@ -31,24 +71,114 @@ class ChromaStore:
     - Adding documents with embeddings and metadata
     - Semantic search with optional metadata filtering
     - Persistent storage across sessions
+    
+    HNSW parameters (M, construction_ef, search_ef) default to the values in
+    config.py. M and construction_ef only take effect when the collection is
+    first created; an existing collection keeps the parameters it was built with.
     """
     
-    def __init__(self, collection_name: str = "legal_documents"):
+    def __init__(
+        self,
+        collection_name: str = "legal_documents",
+        persist_dir: str | Path = CHROMA_PERSIST_DIR,
+        hnsw_m: int = HNSW_M,
+        hnsw_construction_ef: int = HNSW_CONSTRUCTION_EF,
+        hnsw_search_ef: int = HNSW_SEARCH_EF
+    ):
         import chromadb
         from chromadb.config import Settings
         
+        self.persist_dir = Path(persist_dir)
+        self.hnsw_m = hnsw_m
+        self.hnsw_construction_ef = hnsw_construction_ef
+        self.hnsw_search_ef = hnsw_search_ef
+        
         # Ensure persist directory exists
-        Path(CHROMA_PERSIST_DIR).mkdir(parents=True, exist_ok=True)
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        self._write_lock = _write_lock(self.persist_dir)
+        self._dropped_segments: set[str] = set()  # Segment dirs left behind by collections dropped here
         
         self.client = chromadb.PersistentClient(
-            path=str(CHROMA_PERSIST_DIR),
+            path=str(self.persist_dir),
             settings=Settings(anonymized_telemetry=False)
         )
-        self.collection = self.client.get_or_create_collection(
-            name=collection_name,
-            metadata={"hnsw:space": "cosine"}  # Use cosine similarity
+        self._name = collection_name
+        with self._write_lock:
+            self._recover_rebuild(collection_name)
+            self._collection = self.client.get_or_create_collection(
+                name=collection_name,
+                metadata=self._collection_metadata()
+            )
+            self._epoch = _epochs.get(self.cache_key, 0)
+    
+    @property
+    def collection(self):
+        """
+        The Chroma collection, re-resolved if another instance recreated it.
+        
+        Long-lived stores (e.g. the shared agent context) thus keep working
+        after clear() or a CompactionJob index rebuild on a different instance.
+        """
+        epoch = _epochs.get(self.cache_key, 0)
+        if epoch != self._epoch:
+            with self._write_lock:
+                self._collection = self.client.get_collection(self._name)
+                self._epoch = _epochs.get(self.cache_key, 0)
+        return self._collection
+    
+    def _replace_collection(self, collection) -> None:
+        """Switches to a recreated collection and tells other instances to follow."""
+        self._collection = collection
+        with _generations_lock:
+            self._epoch = _epochs[self.cache_key] = _epochs.get(self.cache_key, 0) + 1
+    
+    @property
+    def cache_key(self) -> tuple[str, str]:
+        """Identifies the underlying collection across store instances."""
+        return (str(self.persist_dir.resolve()), self._name)
+    
+    @property
+    def generation(self) -> int:
+        """Counter bumped on every write; used to invalidate derived caches."""
+        return _generations.get(self.cache_key, 0)
+    
+    def _bump_generation(self) -> None:
+        with _generations_lock:
+            _generations[self.cache_key] = _generations.get(self.cache_key, 0) + 1
+    
+    def _collection_metadata(self) -> dict:
+        """Returns the collection metadata carrying the HNSW index settings."""
+        return {
+            "hnsw:space": HNSW_SPACE,  # Use cosine similarity
+            "hnsw:M": self.hnsw_m,
+            "hnsw:construction_ef": self.hnsw_construction_ef,
+            "hnsw:search_ef": self.hnsw_search_ef
+        }
+    
+    @staticmethod
+    def _to_result(
+        document: str,
+        metadata: dict,
+        distance: float = 0.0,
+        embedding: list[float] | None = None
+    ) -> RetrievalResult:
+        """Builds a RetrievalResult from a stored record."""
+        return RetrievalResult(
+            content=document,
+            score=distance,
+            page_number=metadata.get("page_number", 0),
+            source=metadata.get("source", "unknown"),
+            chunk_index=metadata.get("chunk_index", 0),
+            embedding=embedding,
+            clause_types=[key[len("clause_"):] for key, value in metadata.items()
+                          if key.startswith("clause_") and value is True]
         )
     
+    @staticmethod
+    def _chunk_id(chunk) -> str:
+        """Stable ID for a chunk; unique across documents."""
+        return f"{chunk.source}::chunk_{chunk.chunk_index}"
+    
     def add_documents(
         self,
         chunks: list,  # List of TextChunk objects
@@ -61,22 +191,76 @@ class ChromaStore:
             chunks: List of TextChunk objects with content and metadata.
             embeddings: Corresponding embeddings for each chunk.
         """
-        ids = [f"chunk_{c.chunk_index}" for c in chunks]
+        ids = [self._chunk_id(c) for c in chunks]
         documents = [c.content for c in chunks]
         metadatas = [c.to_metadata() for c in chunks]
         
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            embeddings=embeddings,
-            metadatas=metadatas
-        )
+        with self._write_lock:
+            self.collection.add(
+                ids=ids,
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=metadatas
+            )
+            self._bump_generation()
+    
+    def upsert_documents(
+        self,
+        chunks: list,  # List of TextChunk objects
+        embeddings: list[list[float]]
+    ) -> None:
+        """
+        Inserts or replaces the chunks of every source present in `chunks`.
+        
+        Chunks are written by stable ID and any previously stored chunk of the
+        same source that is not in the new set is deleted, so replacing an
+        amended document only touches that document's records.
+        
+        Args:
+            chunks: List of TextChunk objects with content and metadata.
+            embeddings: Corresponding embeddings for each chunk.
+        """
+        ids = [self._chunk_id(c) for c in chunks]
+        new_ids = set(ids)
+        
+        with self._write_lock:
+            for source in {c.source for c in chunks}:
+                existing = self.collection.get(where={"source": source}, include=[])["ids"]
+                stale = [i for i in existing if i not in new_ids]
+                if stale:
+                    self.collection.delete(ids=stale)
+            
+            self.collection.upsert(
+                ids=ids,
+                documents=[c.content for c in chunks],
+                embeddings=embeddings,
+                metadatas=[c.to_metadata() for c in chunks]
+            )
+            self._bump_generation()
+    
+    def delete_source(self, source: str) -> int:
+        """
+        Removes every chunk of one document.
+        
+        Args:
+            source: The document's source name (e.g., "contract.pdf").
+            
+        Returns:
+            Number of chunks removed.
+        """
+        with self._write_lock:
+            ids = self.collection.get(where={"source": source}, include=[])["ids"]
+            if ids:
+                self.collection.delete(ids=ids)
+                self._bump_generation()
+        return len(ids)
     
     def query(
         self,
         query_embedding: list[float],
         k: int = TOP_K_RESULTS,
-        where: dict | None = None
+        where: dict | None = None,
+        include_embeddings: bool = False
     ) -> list[RetrievalResult]:
         """
         Retrieves the most relevant chunks for a query.
@@ -85,44 +269,220 @@ class ChromaStore:
             query_embedding: The embedding vector of the query.
             k: Number of results to return.
             where: Optional metadata filter (e.g., {"source": "contract.pdf"}).
+            include_embeddings: Also return the stored chunk embeddings.
             
         Returns:
             List of RetrievalResult objects sorted by relevance.
         """
+        return self.query_batch([query_embedding], k, where, include_embeddings)[0]
+    
+    def query_batch(
+        self,
+        query_embeddings: list[list[float]],
+        k: int = TOP_K_RESULTS,
+        where: dict | None = None,
+        include_embeddings: bool = False
+    ) -> list[list[RetrievalResult]]:
+        """
+        Retrieves the most relevant chunks for several queries in one call.
+        
+        Args:
+            query_embeddings: One embedding vector per query.
+            k: Number of results to return per query.
+            where: Optional metadata filter applied to every query.
+            include_embeddings: Also return the stored chunk embeddings.
+            
+        Returns:
+            One list of RetrievalResult objects per query, sorted by relevance.
+        """
+        include = ["documents", "metadatas", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+        
         results = self.collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=query_embeddings,
             n_results=k,
             where=where,
-            include=["documents", "metadatas", "distances"]
+            include=include
         )
         
-        retrieval_results = []
-        
-        # Unpack results (ChromaDB returns nested lists)
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                metadata = results["metadatas"][0][i]
-                distance = results["distances"][0][i]
-                
-                retrieval_results.append(RetrievalResult(
-                    content=doc,
-                    score=distance,
-                    page_number=metadata.get("page_number", 0),
-                    source=metadata.get("source", "unknown"),
-                    chunk_index=metadata.get("chunk_index", 0)
-                ))
+        # Unpack results (ChromaDB returns one nested list per query)
+        batches = []
+        for q, documents in enumerate(results["documents"] or [[] for _ in query_embeddings]):
+            batches.append([
+                self._to_result(
+                    doc,
+                    results["metadatas"][q][i],
+                    results["distances"][q][i],
+                    list(results["embeddings"][q][i]) if include_embeddings else None
+                )
+                for i, doc in enumerate(documents)
+            ])
+        return batches
+    
+    def get_source(self, source: str) -> list[RetrievalResult]:
+        """
+        Returns every chunk of one document in reading order.
         
-        return retrieval_results
+        Args:
+            source: The document's source name (e.g., "contract.pdf").
+            
+        Returns:
+            List of RetrievalResult objects sorted by chunk index (score 0).
+        """
+        records = self.collection.get(where={"source": source}, include=["documents", "metadatas"])
+        results = [
+            self._to_result(doc, metadata)
+            for doc, metadata in zip(records["documents"], records["metadatas"])
+        ]
+        return sorted(results, key=lambda r: r.chunk_index)
     
     def count(self) -> int:
         """Returns the number of documents in the collection."""
         return self.collection.count()
     
+    def disk_usage(self) -> int:
+        """Returns the on-disk size of the persist directory in bytes."""
+        return sum(f.stat().st_size for f in self.persist_dir.rglob("*") if f.is_file())
+    
     def clear(self) -> None:
         """Clears all documents from the collection."""
-        # Delete and recreate collection
-        self.client.delete_collection(self.collection.name)
-        self.collection = self.client.get_or_create_collection(
-            name="legal_documents",
-            metadata={"hnsw:space": "cosine"}
+        # Delete and recreate collection under the same name
+        with self._write_lock:
+            self._drop_collection(self._name)
+            self._replace_collection(self.client.get_or_create_collection(
+                name=self._name,
+                metadata=self._collection_metadata()
+            ))
+            self._bump_generation()
+    
+    def reclaimable_bytes(self) -> int:
+        """Returns the size of free pages in the SQLite file that VACUUM would release."""
+        db_path = self.persist_dir / "chroma.sqlite3"
+        if not db_path.exists():
+            return 0
+        with closing(sqlite3.connect(db_path, timeout=30)) as conn:
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return free_pages * page_size
+    
+    def compact(self, rebuild_index: bool = False) -> int:
+        """
+        Reclaims disk space left behind by deletes and upserts.
+        
+        Always VACUUMs the SQLite metadata/document store. HNSW segment files
+        never shrink on delete, so `rebuild_index` additionally copies all live
+        records into a fresh collection and swaps it in; this is O(collection)
+        and meant for the background CompactionJob.
+        
+        Compaction assumes a single writer per persist directory: writes
+        through ChromaStore instances in this process wait for it, but no
+        other process may write meanwhile (VACUUM then fails with "database
+        is locked" and the round is skipped). Only segment directories of
+        collections dropped by this store are deleted.
+        
+        Args:
+            rebuild_index: Also rebuild the HNSW index from live records.
+            
+        Returns:
+            Bytes reclaimed in the persist directory (may be negative if
+            other writes happened concurrently).
+        """
+        with self._write_lock:
+            before = self.disk_usage()
+            
+            if rebuild_index:
+                self._rebuild_collection()
+            
+            with closing(sqlite3.connect(self.persist_dir / "chroma.sqlite3", timeout=30)) as conn:
+                conn.execute("VACUUM")
+            
+            # Chroma leaves the segment directories of dropped collections on disk
+            for segment_id in self._dropped_segments:
+                path = self.persist_dir / segment_id
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+            self._dropped_segments.clear()
+            
+            return before - self.disk_usage()
+    
+    def _collection_names(self) -> set[str]:
+        # Older Chroma releases return names, newer ones Collection objects
+        return {c if isinstance(c, str) else c.name for c in self.client.list_collections()}
+    
+    def _segment_ids(self, collection_id) -> set[str]:
+        """Ids of a collection's segments, read from Chroma's catalog (read-only)."""
+        uri = f"{(self.persist_dir / 'chroma.sqlite3').as_uri()}?mode=ro"
+        with closing(sqlite3.connect(uri, uri=True, timeout=30)) as conn:
+            rows = conn.execute("SELECT id FROM segments WHERE collection = ?", (str(collection_id),))
+            return {row[0] for row in rows}
+    
+    def _drop_collection(self, name: str) -> None:
+        """Deletes a collection, remembering its segment directories for compact()."""
+        segment_ids = self._segment_ids(self.client.get_collection(name).id)
+        self.client.delete_collection(name)
+        for segment_id in segment_ids:
+            try:
+                self._dropped_segments.add(str(uuid.UUID(segment_id)))
+            except ValueError:
+                continue  # Not a segment directory name
+    
+    def _recover_rebuild(self, name: str) -> None:
+        """
+        Finishes or rolls back an index rebuild interrupted by a crash.
+        
+        The old collection is only renamed to the backup name once the copy
+        is complete, so a leftover backup means the compacting collection
+        holds every record.
+        """
+        names = self._collection_names()
+        backup, compacting = f"{name}{_BACKUP}", f"{name}{_COMPACTING}"
+        if backup in names and name not in names:
+            # Crashed between the two renames
+            restored = compacting if compacting in names else backup
+            self.client.get_collection(restored).modify(name=name)
+            names = self._collection_names()
+        for leftover in (backup, compacting):
+            if leftover in names:
+                self._drop_collection(leftover)
+    
+    def _rebuild_collection(self) -> None:
+        """
+        Copies live records into a new collection and replaces the old one with it.
+        
+        The old collection is kept under a backup name until the new one has
+        taken its name, so a crash at any point leaves a complete copy that
+        the next ChromaStore() recovers.
+        """
+        name = self._name
+        compacting = f"{name}{_COMPACTING}"
+        if compacting in self._collection_names():
+            self._drop_collection(compacting)  # Partial copy from an earlier attempt
+        fresh = self.client.create_collection(
+            name=compacting,
+            metadata=self._collection_metadata()
         )
+        batch_size = self.client.get_max_batch_size()
+        
+        offset = 0
+        while True:
+            page = self.collection.get(
+                limit=batch_size,
+                offset=offset,
+                include=["documents", "metadatas", "embeddings"]
+            )
+            if not page["ids"]:
+                break
+            fresh.add(
+                ids=page["ids"],
+                documents=page["documents"],
+                embeddings=page["embeddings"],
+                metadatas=page["metadatas"]
+            )
+            offset += len(page["ids"])
+        
+        self.collection.modify(name=f"{name}{_BACKUP}")
+        fresh.modify(name=name)
+        self._replace_collection(self.client.get_collection(name))
+        self._bump_generation()
+        self._drop_collection(f"{name}{_BACKUP}")
@@ -2,7 +2,11 @@
 Embedding Module
 Generates vector embeddings for text using sentence-transformers.
 """
+from concurrent.futures import Future
+from functools import lru_cache
+import threading
 from typing import Sequence
+import numpy as np
 import sys
 sys.path.append(str(__file__).rsplit("src", 1)[0])
 from config import EMBEDDING_MODEL
@@ -11,6 +15,11 @@ from config import EMBEDDING_MODEL
 # Lazy-loaded model to avoid loading on import
 _model = None
 
+# Queries being embedded right now -> their pending vector, so concurrent callers
+# (e.g. the router and retriever of one query) share a single model call
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
 
 def get_embedding_model():
     """Lazily loads the embedding model on first use."""
@@ -47,3 +56,48 @@ def embed_single(text: str) -> list[float]:
         Embedding vector as list of floats.
     """
     return embed_texts([text])[0]
+
+
+@lru_cache(maxsize=1024)
+def embed_query(query: str) -> tuple[float, ...]:
+    """
+    Embeds a search query, skipping the model entirely for verbatim repeats.
+    
+    Concurrent first calls for the same query wait for one model call
+    instead of each running their own.
+    
+    Args:
+        query: Query text to embed.
+        
+    Returns:
+        Embedding vector as an (immutable, cached) tuple of floats.
+    """
+    return _embed_once(query)
+
+
+def _embed_once(query: str) -> tuple[float, ...]:
+    """Embeds a query, joining an identical embedding already in flight."""
+    with _inflight_lock:
+        pending = _inflight.get(query)
+        owner = pending is None
+        if owner:
+            pending = _inflight[query] = Future()
+    if not owner:
+        return pending.result()
+    
+    try:
+        vector = tuple(embed_single(query))
+        pending.set_result(vector)
+        return vector
+    except BaseException as e:
+        pending.set_exception(e)
+        raise
+    finally:
+        with _inflight_lock:
+            del _inflight[query]
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalizes the last axis so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
@@ -0,0 +1,85 @@
+"""
+Vector Store Maintenance Module
+Background compaction that reclaims disk space after deletes and upserts.
+"""
+import logging
+import sqlite3
+import threading
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import COMPACTION_INTERVAL_S, COMPACTION_MIN_RECLAIMABLE_MB
+from .chroma_store import ChromaStore
+
+
+logger = logging.getLogger(__name__)
+
+
+class CompactionJob:
+    """
+    Periodically compacts a ChromaStore on a daemon thread.
+    
+    Each round checks how much space a VACUUM would release and only compacts
+    when it exceeds `min_reclaimable_mb`, so idle stores cost one PRAGMA per
+    interval.
+    """
+    
+    def __init__(
+        self,
+        store: ChromaStore | None = None,
+        interval_s: float = COMPACTION_INTERVAL_S,
+        min_reclaimable_mb: float = COMPACTION_MIN_RECLAIMABLE_MB,
+        rebuild_index: bool = False
+    ):
+        self.store = store or ChromaStore()
+        self.interval_s = interval_s
+        self.min_reclaimable_bytes = int(min_reclaimable_mb * 1e6)
+        self.rebuild_index = rebuild_index
+        self.runs = 0
+        self.bytes_reclaimed = 0
+        
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+    
+    def run_once(self, force: bool = False) -> int:
+        """
+        Compacts the store if enough space is reclaimable.
+        
+        Args:
+            force: Compact regardless of the reclaimable-space threshold.
+            
+        Returns:
+            Bytes reclaimed (0 if skipped).
+        """
+        if not force and self.store.reclaimable_bytes() < self.min_reclaimable_bytes:
+            return 0
+        
+        try:
+            reclaimed = self.store.compact(rebuild_index=self.rebuild_index)
+        except sqlite3.OperationalError as e:
+            # Database busy with another writer; try again next round
+            logger.warning("Compaction skipped: %s", e)
+            return 0
+        
+        self.runs += 1
+        self.bytes_reclaimed += max(reclaimed, 0)
+        logger.info("Compacted %s, reclaimed %.1f MB", self.store.persist_dir, reclaimed / 1e6)
+        return reclaimed
+    
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.run_once()
+    
+    def start(self) -> "CompactionJob":
+        """Starts the background thread. Returns self for chaining."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="chroma-compaction", daemon=True)
+            self._thread.start()
+        return self
+    
+    def stop(self, timeout: float | None = None) -> None:
+        """Signals the background thread to exit and waits for it."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
@@ -0,0 +1,139 @@
+"""
+Semantic Retrieval Cache
+Serves cached retrieval results for queries whose embeddings are close to a past query.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import threading
+import numpy as np
+import sys
+sys.path.append(str(__file__).rsplit("src", 1)[0])
+from config import EMBEDDING_DIMENSION, RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_THRESHOLD
+
+
+@dataclass
+class _CacheEntry:
+    """A cached result list and the scope it was retrieved under."""
+    scope: tuple
+    results: list
+
+
+class SemanticRetrievalCache:
+    """
+    In-memory LRU cache of retrieval results indexed by query embedding.
+    
+    Past query embeddings live in a preallocated matrix, so a lookup is one
+    matrix-vector product. Entries are partitioned by scope (store, k, options)
+    and dropped when the store's generation counter moves, i.e. after any
+    write to the collection.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = RETRIEVAL_CACHE_SIZE,
+        threshold: float = RETRIEVAL_CACHE_THRESHOLD,
+        dim: int = EMBEDDING_DIMENSION
+    ):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._entries: OrderedDict[int, _CacheEntry] = OrderedDict()  # slot -> entry, LRU order
+        self._generations: dict[tuple, int] = {}
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _normalize(embedding: list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+    
+    def _evict(self, slot: int) -> None:
+        del self._entries[slot]
+        self._free_slots.append(slot)
+    
+    def _sync_generation(self, scope: tuple, generation: int) -> bool:
+        """
+        Drops every entry of a scope's store once the store has been written to.
+        
+        Returns False for a generation older than the newest one seen: the
+        caller read it before a write that has since been recorded, so its
+        lookup or results are stale.
+        """
+        store_key = scope[0]
+        current = self._generations.get(store_key)
+        if current is not None and generation <= current:
+            return generation == current
+        for slot in [s for s, e in self._entries.items() if e.scope[0] == store_key]:
+            self._evict(slot)
+        self._generations[store_key] = generation
+        return True
+    
+    def get(self, query_embedding: list[float], scope: tuple, generation: int) -> list | None:
+        """
+        Looks up results for a query similar to a cached one.
+        
+        Args:
+            query_embedding: Embedding of the new query.
+            scope: Tuple whose first element identifies the store; results are
+                only shared between queries with an identical scope.
+            generation: The store's current generation counter.
+            
+        Returns:
+            A copy of the cached result list, or None on a miss.
+        """
+        vector = self._normalize(query_embedding)
+        
+        with self._lock:
+            best_slot, best_similarity = None, self.threshold
+            if self._sync_generation(scope, generation) and self._entries:
+                similarities = self._vectors @ vector
+                for slot, entry in self._entries.items():
+                    if entry.scope == scope and similarities[slot] >= best_similarity:
+                        best_slot, best_similarity = slot, float(similarities[slot])
+            
+            if best_slot is None:
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(best_slot)
+            self.hits += 1
+            return list(self._entries[best_slot].results)
+    
+    def put(self, query_embedding: list[float], scope: tuple, generation: int, results: list) -> None:
+        """
+        Caches results for a query, evicting the least recently used entry if full.
+        
+        Results retrieved under an outdated generation are not cached.
+        """
+        vector = self._normalize(query_embedding)
+        
+        with self._lock:
+            if not self._sync_generation(scope, generation):
+                return
+            
+            if not self._free_slots:
+                self._evict(next(iter(self._entries)))
+            
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = _CacheEntry(scope=scope, results=list(results))
+    
+    def clear(self) -> None:
+        """Removes all cached entries."""
+        with self._lock:
+            for slot in list(self._entries):
+                self._evict(slot)
+            self._generations.clear()
+    
+    def stats(self) -> dict:
+        """Returns hit/miss counters and current occupancy."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,117 @@
+"""
+Stream Parser Tests
+Checks that the incremental risk and clause parsers give the same result as
+parsing the whole response, however the response is split into chunks.
+"""
+import pytest
+from src.agents.clause_analyzer import ClauseStreamParser, parse_clause_response
+from src.agents.risk_assessor import RiskStreamParser, parse_risk_response
+
+
+RISK_RESPONSE = """RISK: Unlimited liability
+SEVERITY: high
+DESCRIPTION: The supplier's liability is not capped.
+RECOMMENDATION: Negotiate a cap of 12 months' fees.
+
+RISK: Auto-renewal
+RECOMMENDATION: Calendar the notice deadline.
+DESCRIPTION: The term renews for successive one-year periods.
+SEVERITY: MEDIUM
+
+OVERALL_RISK: HIGH
+SUMMARY: Two material risks need negotiation before signing."""
+
+CLAUSE_RESPONSE = """CLAUSE_TYPE: termination
+SUMMARY: Either party may terminate with 30 days' written notice.
+KEY_TERMS: 30 days, written notice, material breach
+PAGE_REFERENCE: Page 4"""
+
+
+def _chunks(text: str, size: int) -> list[str]:
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _stream_risks(text: str, size: int) -> tuple[list, list]:
+    """Feeds text in chunks of `size`, returning (risks emitted, final report risks)."""
+    parser = RiskStreamParser()
+    emitted = []
+    for chunk in _chunks(text, size):
+        emitted.extend(parser.feed(chunk))
+    report = parser.close(emitted.append)
+    return emitted, report.risks
+
+
+def test_risk_fields_after_recommendation_are_kept():
+    report = parse_risk_response(RISK_RESPONSE)
+    
+    assert [r.risk_title for r in report.risks] == ["Unlimited liability", "Auto-renewal"]
+    second = report.risks[1]
+    assert second.description == "The term renews for successive one-year periods."
+    assert second.severity == "MEDIUM"
+    assert second.recommendation == "Calendar the notice deadline."
+    assert report.overall_risk_level == "HIGH"
+    assert report.summary == "Two material risks need negotiation before signing."
+
+
+def test_risk_severity_is_normalized():
+    assert parse_risk_response(RISK_RESPONSE).risks[0].severity == "HIGH"
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64, 10_000])
+def test_risk_chunk_boundaries_do_not_change_the_report(size):
+    emitted, risks = _stream_risks(RISK_RESPONSE, size)
+    
+    assert risks == parse_risk_response(RISK_RESPONSE).risks
+    assert emitted == risks  # Every risk is emitted exactly once
+
+
+def test_risk_is_emitted_when_the_next_block_starts():
+    parser = RiskStreamParser()
+    first_block, rest = RISK_RESPONSE.split("\n\n", 1)
+    
+    assert parser.feed(first_block + "\n") == []  # Later fields may still follow
+    emitted = parser.feed("\n" + rest.split("\n", 1)[0] + "\n")
+    
+    assert [r.risk_title for r in emitted] == ["Unlimited liability"]
+
+
+def test_risk_last_block_is_emitted_on_close():
+    emitted, risks = _stream_risks(RISK_RESPONSE + "\nRISK: Late fees\nSEVERITY: LOW", 5)
+    
+    assert emitted[-1].risk_title == "Late fees"
+    assert emitted[-1].severity == "LOW"
+    assert len(risks) == 3
+
+
+def test_risk_empty_response_gives_defaults():
+    report = parse_risk_response("")
+    
+    assert report.risks == []
+    assert report.overall_risk_level == "MEDIUM"
+
+
+def test_clause_fields_in_any_order():
+    reordered = "\n".join(reversed(CLAUSE_RESPONSE.split("\n")))
+    
+    assert parse_clause_response(reordered, "termination") == parse_clause_response(CLAUSE_RESPONSE, "termination")
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64, 10_000])
+def test_clause_chunk_boundaries_do_not_change_the_result(size):
+    parser = ClauseStreamParser("termination")
+    fields = []
+    for chunk in _chunks(CLAUSE_RESPONSE, size):
+        fields.extend(parser.feed(chunk))
+    info = parser.close(lambda name, value: fields.append((name, value)))
+    
+    assert info == parse_clause_response(CLAUSE_RESPONSE, "termination")
+    assert [name for name, _ in fields] == ["clause_type", "summary", "key_terms", "page_reference"]
+    assert info.key_terms == ["30 days", "written notice", "material breach"]
+
+
+def test_clause_missing_fields_fall_back_to_defaults():
+    info = parse_clause_response("SUMMARY: Only a summary.", "payment")
+    
+    assert info.clause_type == "payment"
+    assert info.key_terms == []
+    assert info.page_reference == "Unknown"